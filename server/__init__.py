@@ -95,11 +95,67 @@ def create_app(config_name='default'):
     # Initialize notification queue
     try:
         from server.services.notification_queue import notification_queue
-        notification_queue.start()
+        notification_queue.init_app(app)
         print("✅ Notification queue started successfully")
     except Exception as e:
         print(f"⚠️  Warning: Could not start notification queue: {e}")
     
+    # Initialize write-behind view counter
+    try:
+        from server.services.view_counter import view_counter
+        view_counter.init_app(app)
+        print("✅ View counter started successfully")
+    except Exception as e:
+        print(f"⚠️  Warning: Could not start view counter: {e}")
+    
+    # Initialize periodic trending score refresh
+    try:
+        from server.services.trending_service import trending_service
+        trending_service.init_app(app)
+        print("✅ Trending refresher started successfully")
+    except Exception as e:
+        print(f"⚠️  Warning: Could not start trending refresher: {e}")
+    
+    # Initialize home timeline fan-out worker
+    try:
+        from server.services.timeline_service import timeline_service
+        timeline_service.init_app(app)
+        print("✅ Timeline fan-out worker started successfully")
+    except Exception as e:
+        print(f"⚠️  Warning: Could not start timeline fan-out worker: {e}")
+    
+    # Initialize background community deletion worker
+    try:
+        from server.services.community_deletion_service import community_deletion_service
+        community_deletion_service.init_app(app)
+        print("✅ Community deletion worker started successfully")
+    except Exception as e:
+        print(f"⚠️  Warning: Could not start community deletion worker: {e}")
+    
+    # Initialize follower notification fan-out worker
+    try:
+        from server.services.follow_service import follow_service
+        follow_service.init_app(app)
+        print("✅ Follower notification worker started successfully")
+    except Exception as e:
+        print(f"⚠️  Warning: Could not start follower notification worker: {e}")
+    
+    # Initialize in-memory follow graph
+    try:
+        from server.services.follow_graph import follow_graph
+        follow_graph.init_app(app)
+        print("✅ Follow graph loader started successfully")
+    except Exception as e:
+        print(f"⚠️  Warning: Could not start follow graph loader: {e}")
+    
+    # Initialize follow suggestion feature refresh
+    try:
+        from server.services.suggestion_service import suggestion_service
+        suggestion_service.init_app(app)
+        print("✅ Suggestion feature refresher started successfully")
+    except Exception as e:
+        print(f"⚠️  Warning: Could not start suggestion feature refresher: {e}")
+    
     @app.route('/')
     def index():
         return {'message': 'Agricultural Super App API', 'status': 'running'}
@@ -10,6 +10,38 @@ from datetime import datetime
 # Add the parent directory to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+def _add_missing_columns(conn, table_name, column_definitions):
+    """Add any columns from column_definitions ({name: ALTER TABLE statement}) missing on table_name."""
+    from server.database import db
+
+    result = conn.execute(db.text("""
+        SELECT column_name 
+        FROM information_schema.columns 
+        WHERE table_name = :table_name
+    """), {'table_name': table_name})
+    existing_columns = {row[0] for row in result}
+
+    added = []
+    for column, ddl in column_definitions.items():
+        if column in existing_columns:
+            continue
+        try:
+            conn.execute(db.text(ddl))
+            conn.commit()
+            added.append(column)
+            print(f"✅ Added column: {column} to {table_name}")
+        except Exception as e:
+            if "already exists" in str(e):
+                print(f"ℹ️  Column {column} already exists")
+            else:
+                print(f"❌ Failed to add column {column} to {table_name}: {e}")
+                conn.rollback()
+                return None
+
+    if not added:
+        print(f"✅ {table_name} columns already exist")
+    return added
+
 def auto_migrate():
     """Automatically apply comment tracking fields migration"""
     print("🔄 Auto-migration: Checking comment tracking fields...")
@@ -141,6 +173,230 @@ def auto_migrate():
             else:
                 print("✅ communities.image_url already exists")
 
+        # --- Denormalized like/comment counters on posts ---
+        with db.engine.connect() as conn:
+            print("🔄 Auto-migration: Checking posts counter columns...")
+            added = _add_missing_columns(conn, 'posts', {
+                'comment_count': "ALTER TABLE posts ADD COLUMN comment_count INTEGER DEFAULT 0 NOT NULL",
+                'like_count': "ALTER TABLE posts ADD COLUMN like_count INTEGER DEFAULT 0 NOT NULL"
+            })
+            if added is None:
+                return False
+            if added:
+                # Backfill the freshly added counters from the source tables
+                from server.services.post_counter_service import post_counter_service
+                result = post_counter_service.reconcile()
+                print(f"✅ Backfilled counters on {result['repaired']} posts")
+
+        # --- Full-text search vectors on posts and articles ---
+        with db.engine.connect() as conn:
+            print("🔄 Auto-migration: Checking full-text search columns...")
+            from server.utils.search import search_vector_sql
+            for table_name, vector_sql in [
+                ('posts', search_vector_sql('title', 'content', 'language')),
+                ('articles', search_vector_sql('title', 'content'))
+            ]:
+                added = _add_missing_columns(conn, table_name, {
+                    'search_vector': (
+                        f"ALTER TABLE {table_name} ADD COLUMN search_vector tsvector "
+                        f"GENERATED ALWAYS AS ({vector_sql}) STORED"
+                    )
+                })
+                if added is None:
+                    return False
+                try:
+                    conn.execute(db.text(
+                        f"CREATE INDEX IF NOT EXISTS ix_{table_name}_search_vector "
+                        f"ON {table_name} USING GIN (search_vector)"
+                    ))
+                    conn.commit()
+                except Exception as e:
+                    print(f"⚠️  Warning creating search index on {table_name}: {e}")
+
+        # --- Feed indexes used by keyset pagination ---
+        with db.engine.connect() as conn:
+            print("🔄 Auto-migration: Checking post feed indexes...")
+            try:
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_posts_status_published_at "
+                    "ON posts (status, published_at, post_id)"
+                ))
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_posts_status_popularity "
+                    "ON posts (status, view_count, like_count, post_id)"
+                ))
+                conn.commit()
+                print("✅ Post feed indexes are in place")
+            except Exception as e:
+                print(f"⚠️  Warning creating post feed indexes: {e}")
+
+        # --- Trending score columns and indexes ---
+        with db.engine.connect() as conn:
+            print("🔄 Auto-migration: Checking trending score columns...")
+            added = _add_missing_columns(conn, 'posts', {
+                'trending_score': "ALTER TABLE posts ADD COLUMN trending_score DOUBLE PRECISION DEFAULT 0 NOT NULL",
+                'trending_updated_at': "ALTER TABLE posts ADD COLUMN trending_updated_at TIMESTAMP WITH TIME ZONE",
+                'activity_at': "ALTER TABLE posts ADD COLUMN activity_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL"
+            })
+            if added is None:
+                return False
+            try:
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_posts_status_trending "
+                    "ON posts (status, trending_score, post_id)"
+                ))
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_posts_activity_at ON posts (activity_at)"
+                ))
+                conn.commit()
+                print("✅ Trending indexes are in place")
+            except Exception as e:
+                print(f"⚠️  Warning creating trending indexes: {e}")
+
+        # --- Home timeline fan-out support ---
+        with db.engine.connect() as conn:
+            print("🔄 Auto-migration: Checking home timeline columns...")
+            added = _add_missing_columns(conn, 'posts', {
+                'timeline_pull': "ALTER TABLE posts ADD COLUMN timeline_pull BOOLEAN DEFAULT false NOT NULL",
+                'fanned_out_at': "ALTER TABLE posts ADD COLUMN fanned_out_at TIMESTAMP WITH TIME ZONE"
+            })
+            if added is None:
+                return False
+            try:
+                if 'fanned_out_at' in added:
+                    # Posts published before timelines existed are reached through follow backfill
+                    conn.execute(db.text(
+                        "UPDATE posts SET fanned_out_at = now() WHERE status = 'published'"
+                    ))
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_posts_timeline_pull "
+                    "ON posts (author_id, published_at) WHERE timeline_pull"
+                ))
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_posts_pending_fan_out "
+                    "ON posts (published_at) WHERE fanned_out_at IS NULL AND status = 'published'"
+                ))
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_user_follows_following_follow_id "
+                    "ON user_follows (following_id, follow_id)"
+                ))
+                conn.commit()
+                print("✅ Home timeline indexes are in place")
+            except Exception as e:
+                print(f"⚠️  Warning creating home timeline indexes: {e}")
+
+        # --- Denormalized community member counts ---
+        with db.engine.connect() as conn:
+            print("🔄 Auto-migration: Checking community member_count column...")
+            added = _add_missing_columns(conn, 'communities', {
+                'member_count': "ALTER TABLE communities ADD COLUMN member_count INTEGER DEFAULT 0 NOT NULL"
+            })
+            if added is None:
+                return False
+            if added:
+                from server.services.community_service import community_service
+                result = community_service.reconcile_member_counts()
+                print(f"✅ Backfilled member counts on {result['repaired']} communities")
+
+        # --- Community deletion support ---
+        with db.engine.connect() as conn:
+            print("🔄 Auto-migration: Checking community deletion columns...")
+            added = _add_missing_columns(conn, 'communities', {
+                'deleting': "ALTER TABLE communities ADD COLUMN deleting BOOLEAN DEFAULT false NOT NULL"
+            })
+            if added is None:
+                return False
+            try:
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_community_posts_community_created "
+                    "ON community_posts (community_id, created_at, post_id)"
+                ))
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_post_comments_post_created "
+                    "ON post_comments (post_id, created_at)"
+                ))
+                conn.commit()
+                print("✅ Community deletion indexes are in place")
+            except Exception as e:
+                print(f"⚠️  Warning creating community deletion indexes: {e}")
+
+        # --- Denormalized follower / following counts ---
+        with db.engine.connect() as conn:
+            print("🔄 Auto-migration: Checking user follow count columns...")
+            added = _add_missing_columns(conn, 'users', {
+                'follower_count': "ALTER TABLE users ADD COLUMN follower_count INTEGER DEFAULT 0 NOT NULL",
+                'following_count': "ALTER TABLE users ADD COLUMN following_count INTEGER DEFAULT 0 NOT NULL"
+            })
+            if added is None:
+                return False
+            if added:
+                from server.services.follow_service import follow_service
+                result = follow_service.reconcile_counts()
+                print(f"✅ Backfilled follow counts on {result['repaired']} users")
+
+        # --- Follower / following list indexes ---
+        with db.engine.connect() as conn:
+            print("🔄 Auto-migration: Checking follow list indexes...")
+            try:
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_user_follows_following_created "
+                    "ON user_follows (following_id, created_at, follow_id)"
+                ))
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_user_follows_follower_created "
+                    "ON user_follows (follower_id, created_at, follow_id)"
+                ))
+                conn.commit()
+                print("✅ Follow list indexes are in place")
+            except Exception as e:
+                print(f"⚠️  Warning creating follow list indexes: {e}")
+
+        # --- Notification queue leases ---
+        with db.engine.connect() as conn:
+            print("🔄 Auto-migration: Checking notification lease columns...")
+            added = _add_missing_columns(conn, 'notifications', {
+                'lease_owner': "ALTER TABLE notifications ADD COLUMN lease_owner VARCHAR(100)",
+                'leased_until': "ALTER TABLE notifications ADD COLUMN leased_until TIMESTAMP WITH TIME ZONE",
+                'attempts': "ALTER TABLE notifications ADD COLUMN attempts INTEGER DEFAULT 0 NOT NULL"
+            })
+            if added is None:
+                return False
+            try:
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_notifications_pending_claim "
+                    "ON notifications (priority, created_at) WHERE status = 'pending'"
+                ))
+                conn.commit()
+                print("✅ Notification claim index is in place")
+            except Exception as e:
+                print(f"⚠️  Warning creating notification claim index: {e}")
+
+        # --- Scheduled notification index ---
+        with db.engine.connect() as conn:
+            print("🔄 Auto-migration: Checking scheduled notification index...")
+            try:
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_notifications_status_scheduled "
+                    "ON notifications (status, scheduled_at)"
+                ))
+                conn.commit()
+                print("✅ Scheduled notification index is in place")
+            except Exception as e:
+                print(f"⚠️  Warning creating scheduled notification index: {e}")
+
+        # --- Comment tree index used by paginated comment loading ---
+        with db.engine.connect() as conn:
+            print("🔄 Auto-migration: Checking comment tree index...")
+            try:
+                conn.execute(db.text(
+                    "CREATE INDEX IF NOT EXISTS ix_comments_post_parent_created "
+                    "ON comments (post_id, parent_comment_id, created_at, comment_id)"
+                ))
+                conn.commit()
+                print("✅ Comment tree index is in place")
+            except Exception as e:
+                print(f"⚠️  Warning creating comment tree index: {e}")
+
         print("✅ All auto-migrations completed")
         return True
                 
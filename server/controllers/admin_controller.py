@@ -174,7 +174,9 @@ def delete_user(current_user, user_id):
         from server.models.crop import UserCrop
         from server.models.payment import Payment, TransactionLog
         from server.models.notifications import Notification, NotificationPreferences, NotificationDelivery
-        from server.models.user import UserExpertise, UserFollow
+        from server.models.user import UserExpertise
+        from server.services.follow_service import follow_service
+        from server.services.follow_graph import follow_graph
         
         # Delete in correct order to avoid foreign key constraint violations
         
@@ -215,8 +217,7 @@ def delete_user(current_user, user_id):
         
         # 10. Delete user's expertise and follows
         UserExpertise.query.filter_by(user_id=user_uuid).delete()
-        UserFollow.query.filter_by(follower_id=user_uuid).delete()
-        UserFollow.query.filter_by(following_id=user_uuid).delete()
+        follow_service.remove_all_follows(user_uuid)  # Also decrements the other users' follow counts
         
         # 11. Delete community post likes and comments by user
         PostLike.query.filter_by(user_id=user_uuid).delete()
@@ -266,6 +267,7 @@ def delete_user(current_user, user_id):
         
         # Commit all deletions
         db.session.commit()
+        follow_graph.remove_user(user_uuid)
         
         current_app.logger.info(f"User {user_id} and all related data permanently deleted by admin {current_user.user_id}")
         
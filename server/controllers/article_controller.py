@@ -8,9 +8,12 @@ import bleach
 from sqlalchemy.orm import joinedload, subqueryload, aliased
 
 from server.models.article import Article
-from server.models.post import Category, Tag
+from server.models.post import Category
 from server.database import db
 from server.utils.auth import token_required
+from server.utils.search import build_tsquery, search_filter, search_rank
+from server.services.view_counter import view_counter
+from server.services.tag_service import tag_service
 
 def get_articles():
     """
@@ -68,17 +71,22 @@ def get_articles():
         if location_list:
             query = query.filter(Article.applicable_locations.op('&&')(location_list))
     
-    if search:
-        query = query.filter(
-            (Article.title.ilike(f'%{search}%')) | 
-            (Article.content.ilike(f'%{search}%'))
-        )
+    # Full-text search over the GIN-indexed search_vector (title weighted above content)
+    tsquery = None
+    if search and search.strip():
+        tsquery = build_tsquery(search.strip())
+        query = query.filter(search_filter(Article.search_vector, tsquery))
     
     # Apply sorting
+    if sort_by == 'relevance' and tsquery is None:
+        sort_by = 'date'
+    
     if sort_by == 'date':
         query = query.order_by(Article.published_at.desc())
     elif sort_by == 'popularity':
         query = query.order_by(Article.view_count.desc())
+    elif sort_by == 'relevance':
+        query = query.order_by(search_rank(Article.search_vector, tsquery).desc(), Article.published_at.desc())
     
     # Paginate results
     articles_page = query.paginate(page=page, per_page=per_page, error_out=False)
@@ -180,17 +188,8 @@ def create_article(current_user):
     # Add tags if provided
     tags_list = data.get('tags', [])
     if tags_list:
-        for tag_name in tags_list:
-            # Check if tag exists
-            tag = Tag.query.filter_by(name=tag_name).first()
-            if not tag:
-                # Create new tag
-                tag = Tag(name=tag_name)
-                db.session.add(tag)
-                db.session.flush()
-            
-            # Add tag to article
-            article.tags.append(tag)
+        # Resolve all tags in two statements regardless of how many were submitted
+        article.tags = tag_service.resolve_tags(tags_list)
     
     db.session.commit()
     
@@ -218,11 +217,12 @@ def get_article(article_id):
     if article.status != 'published':
         return jsonify({'message': 'Article not found'}), 404
 
-    # Increment view count
-    article.view_count += 1
-    db.session.commit()
+    # Increment view count (buffered and flushed in batches)
+    view_counter.increment('articles', article.article_id)
 
-    return jsonify(article.to_dict()), 200
+    article_data = article.to_dict()
+    article_data['view_count'] = (article.view_count or 0) + view_counter.pending('articles', article.article_id)
+    return jsonify(article_data), 200
 
 
 @token_required
@@ -284,22 +284,8 @@ def update_article(current_user, article_id):
     
     # Update tags if provided
     if 'tags' in data:
-        tags_list = data.get('tags', [])
-        # Clear existing tags
-        article.tags = []
-        
-        # Add new tags
-        for tag_name in tags_list:
-            # Check if tag exists
-            tag = Tag.query.filter_by(name=tag_name).first()
-            if not tag:
-                # Create new tag
-                tag = Tag(name=tag_name)
-                db.session.add(tag)
-                db.session.flush()
-            
-            # Add tag to article
-            article.tags.append(tag)
+        # Replace existing tags, resolving them in two statements
+        article.tags = tag_service.resolve_tags(data.get('tags', []))
     
     db.session.commit()
     
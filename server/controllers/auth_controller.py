@@ -11,6 +11,8 @@ from server.utils.auth import token_required
 from server.utils.validators import validate_agricultural_data, sanitize_html_content
 from server.utils.error_handlers import create_error_response, create_success_response
 from server.utils.rate_limiter import rate_limit_auth
+from server.utils.fragment_cache import post_fragment_cache
+from server.utils.response_cache import feed_cache
 
 @rate_limit_auth
 def register():
@@ -233,6 +235,10 @@ def update_profile(current_user):
     user.updated_at = datetime.utcnow()
     db.session.commit()
     
+    # Author name/avatar/role are embedded in cached post fragments and feed pages
+    post_fragment_cache.invalidate_owner(user.user_id)
+    feed_cache.bump()
+    
     return create_success_response(
         data={'user': user.to_dict()},
         message='Profile updated successfully'
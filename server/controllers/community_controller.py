@@ -1,5 +1,8 @@
+import uuid
 from flask import request, jsonify, current_app
 from datetime import datetime
+from sqlalchemy import and_
+from sqlalchemy.orm import joinedload
 
 from server.models.community import Community, CommunityMember, CommunityPost, PostLike, PostComment
 from server.database import db
@@ -7,6 +10,13 @@ from server.utils.auth import token_required, resource_owner_required, admin_req
 from server.utils.validators import sanitize_html_content, validate_string_length, validate_required_fields
 from server.utils.error_handlers import create_error_response, create_success_response
 from server.utils.rate_limiter import rate_limit_moderate, rate_limit_lenient
+from server.utils.pagination import keyset_page, parse_bool_arg, InvalidCursorError
+from server.services.community_service import community_service
+from server.services.community_deletion_service import community_deletion_service
+
+COMMUNITY_MEMBER_ROLES = ('admin', 'moderator', 'member')
+COMMUNITY_MEMBER_STATUSES = ('active', 'pending', 'banned')
+
 
 @token_required
 def get_communities(current_user):
@@ -27,8 +37,22 @@ def get_communities(current_user):
     community_type = request.args.get('community_type')
     country = request.args.get('country')
     
-    # Base query
-    query = Community.query
+    # Base query: each community with the caller's membership (if any) in one LEFT JOIN;
+    # member counts come from the denormalized Community.member_count
+    query = db.session.query(
+        Community,
+        CommunityMember.role,
+        CommunityMember.status
+    ).outerjoin(
+        CommunityMember,
+        and_(
+            CommunityMember.community_id == Community.community_id,
+            CommunityMember.user_id == current_user.user_id
+        )
+    )
+    
+    # Communities being deleted in the background are hidden
+    query = query.filter(Community.deleting.is_(False))
     
     # Apply filters
     if search:
@@ -38,29 +62,23 @@ def get_communities(current_user):
         )
     
     if community_type:
-        query = query.filter_by(community_type=community_type)
+        query = query.filter(Community.community_type == community_type)
     
     if country:
-        query = query.filter_by(location_country=country)
+        query = query.filter(Community.location_country == country)
     
     # Paginate results
-    communities_page = query.paginate(page=page, per_page=per_page, error_out=False)
+    communities_page = query.order_by(Community.created_at.desc(), Community.community_id).paginate(
+        page=page, per_page=per_page, error_out=False
+    )
     
     # Format response
     communities = []
-    for community in communities_page.items:
+    for community, member_role, member_status in communities_page.items:
         community_dict = community.to_dict()
-        
-        # Add member count
-        community_dict['member_count'] = CommunityMember.query.filter_by(community_id=community.community_id).count()
-        
-        # Check if user is a member
-        member = CommunityMember.query.filter_by(
-            community_id=community.community_id,
-            user_id=current_user.user_id
-        ).first()
-        community_dict['is_member'] = bool(member)
-        
+        community_dict['is_member'] = member_role is not None
+        community_dict['member_role'] = member_role
+        community_dict['member_status'] = member_status
         communities.append(community_dict)
     
     return create_success_response(
@@ -102,7 +120,8 @@ def create_community(current_user):
         location_country=data.get('location_country'),
         image_url=data.get('image_url'),
         is_private=data.get('is_private', False),
-        created_by=current_user.user_id
+        created_by=current_user.user_id,
+        member_count=1  # The creator joins as admin below
     )
     
     db.session.add(community)
@@ -132,26 +151,22 @@ def get_community(current_user, community_id):
     """
     community = Community.query.get(community_id)
     
-    if not community:
+    if not community or community.deleting:
         return jsonify({'message': 'Community not found'}), 404
     
-    # Get community data
+    # Get community data (member_count is denormalized onto the community)
     community_data = community.to_dict()
     
-    # Add member count
-    community_data['member_count'] = CommunityMember.query.filter_by(community_id=community_id).count()
-    
     # Check if user is a member
-    member = CommunityMember.query.filter_by(
-        community_id=community_id,
-        user_id=current_user.user_id
-    ).first()
-    community_data['is_member'] = bool(member)
-    community_data['member_role'] = member.role if member else None
+    access = community_service.get_access(community_id, current_user.user_id)
+    community_data['is_member'] = access.is_member
+    community_data['member_role'] = access.role
     
-    # Get recent posts
-    posts = CommunityPost.query.filter_by(community_id=community_id).order_by(CommunityPost.created_at.desc()).limit(5).all()
-    community_data['recent_posts'] = [post.to_dict() for post in posts]
+    # Get recent posts (only for users allowed to read the community's posts)
+    posts = []
+    if access.can_view:
+        posts = CommunityPost.query.filter_by(community_id=community_id).order_by(CommunityPost.created_at.desc()).limit(5).all()
+    community_data['recent_posts'] = community_service.serialize_posts(posts, viewer_id=current_user.user_id)
     
     return jsonify(community_data), 200
 
@@ -170,17 +185,13 @@ def update_community(current_user, community_id):
     """
     community = Community.query.get(community_id)
     
-    if not community:
+    if not community or community.deleting:
         return jsonify({'message': 'Community not found'}), 404
     
     # Check if user is admin
-    member = CommunityMember.query.filter_by(
-        community_id=community_id,
-        user_id=current_user.user_id,
-        role='admin'
-    ).first()
+    access = community_service.get_access(community_id, current_user.user_id)
     
-    if not member and current_user.role != 'admin':
+    if access.role != 'admin' and current_user.role != 'admin':
         return jsonify({'message': 'Unauthorized'}), 403
     
     data = request.get_json()
@@ -193,6 +204,9 @@ def update_community(current_user, community_id):
     
     db.session.commit()
     
+    # Privacy is part of every cached access lookup for this community
+    community_service.invalidate_access(community_id)
+    
     return jsonify({
         'message': 'Community updated successfully',
         'community': community.to_dict()
@@ -204,50 +218,48 @@ def delete_community(current_user, community_id):
     """
     Delete a community with complete cascade deletion.
     """
-    try:
-        community = Community.query.get(community_id)
-        
-        if not community:
-            return create_error_response('COMMUNITY_NOT_FOUND', 'Community not found', status_code=404)
-        
-        # Check if user is community admin or system admin
-        member = CommunityMember.query.filter_by(
-            community_id=community_id,
-            user_id=current_user.user_id,
-            role='admin'
-        ).first()
-        
-        if not member and current_user.role != 'admin':
-            return create_error_response('FORBIDDEN', 'Unauthorized', status_code=403)
-        
-        # Complete cascade deletion
-        from server.models.community import CommunityPost, PostLike, PostComment
-        
-        # Get all community posts
-        community_posts = CommunityPost.query.filter_by(community_id=community_id).all()
-        
-        # Delete all post-related data
-        for post in community_posts:
-            # Delete post likes
-            PostLike.query.filter_by(post_id=post.post_id).delete()
-            # Delete post comments
-            PostComment.query.filter_by(post_id=post.post_id).delete()
-            # Delete the post
-            db.session.delete(post)
-        
-        # Delete community members
-        CommunityMember.query.filter_by(community_id=community_id).delete()
-        
-        # Delete the community
-        db.session.delete(community)
-        db.session.commit()
-        
-        return create_success_response(message='Community and all related data deleted successfully')
-        
-    except Exception as e:
-        db.session.rollback()
-        current_app.logger.error(f"Error deleting community {community_id}: {str(e)}")
+    community = Community.query.get(community_id)
+    
+    if not community:
+        return create_error_response('COMMUNITY_NOT_FOUND', 'Community not found', status_code=404)
+    
+    # Check if user is community admin or system admin
+    access = community_service.get_access(community_id, current_user.user_id)
+    
+    if access.role != 'admin' and current_user.role != 'admin':
+        return create_error_response('FORBIDDEN', 'Unauthorized', status_code=403)
+    
+    # Set-based cascade deletion; large communities are deleted by a background job
+    result = community_deletion_service.delete_community(community_id, requested_by=current_user.user_id)
+    
+    if not result['success']:
+        current_app.logger.error(f"Error deleting community {community_id}: {result['message']}")
         return create_error_response('SERVER_ERROR', 'Failed to delete community', status_code=500)
+    
+    if 'job' in result:
+        return create_success_response(
+            data={'job': result['job']},
+            message=result['message'],
+            status_code=202
+        )
+    
+    return create_success_response(message=result['message'])
+
+
+@token_required
+def get_community_deletion_job(current_user, job_id):
+    """
+    Get the progress of a background community deletion.
+    """
+    job = community_deletion_service.get_job(job_id)
+    
+    if not job:
+        return create_error_response('JOB_NOT_FOUND', 'Deletion job not found', status_code=404)
+    
+    if job.requested_by != current_user.user_id and current_user.role != 'admin':
+        return create_error_response('FORBIDDEN', 'Unauthorized', status_code=403)
+    
+    return create_success_response(data={'job': job.to_dict()})
 
 
 @token_required
@@ -257,7 +269,7 @@ def join_community(current_user, community_id):
     """
     community = Community.query.get(community_id)
     
-    if not community:
+    if not community or community.deleting:
         return jsonify({'message': 'Community not found'}), 404
     
     # Check if user is already a member
@@ -281,58 +293,181 @@ def join_community(current_user, community_id):
     )
     
     db.session.add(member)
+    member_count = community_service.adjust_member_count(community_id, 1)
     db.session.commit()
+    community_service.invalidate_access(community_id, current_user.user_id)
     
     return jsonify({
         'message': 'Successfully joined community' if status == 'active' else 'Join request submitted',
-        'status': status
+        'status': status,
+        'member_count': member_count
     }), 200
 
 
 @token_required
-def get_community_posts(current_user, community_id):
+def leave_community(current_user, community_id):
     """
-    Get posts for a specific community.
-    
-    Query Parameters:
-    - page: int (default=1)
-    - per_page: int (default=10)
+    Leave a community (or withdraw a pending join request).
     """
-    # Check if community exists
     community = Community.query.get(community_id)
     
-    if not community:
+    if not community or community.deleting:
         return jsonify({'message': 'Community not found'}), 404
     
-    # Check if user is a member
     member = CommunityMember.query.filter_by(
         community_id=community_id,
         user_id=current_user.user_id
     ).first()
     
-    if not member and community.is_private:
+    if not member:
+        return jsonify({'message': 'Not a member of this community'}), 400
+    
+    if member.status == 'banned':
+        return jsonify({'message': 'Banned members cannot leave a community'}), 403
+    
+    # A community must keep at least one admin while it has other members
+    if member.role == 'admin':
+        other_admins = CommunityMember.query.filter(
+            CommunityMember.community_id == community_id,
+            CommunityMember.user_id != current_user.user_id,
+            CommunityMember.role == 'admin'
+        ).count()
+        if not other_admins and (community.member_count or 0) > 1:
+            return jsonify({'message': 'Assign another admin before leaving this community'}), 400
+    
+    db.session.delete(member)
+    member_count = community_service.adjust_member_count(community_id, -1)
+    db.session.commit()
+    community_service.invalidate_access(community_id, current_user.user_id)
+    
+    return jsonify({
+        'message': 'Successfully left community',
+        'member_count': member_count
+    }), 200
+
+
+@token_required
+def update_community_member(current_user, community_id, user_id):
+    """
+    Change a member's role or status (community admins only).
+    
+    Request Body:
+    {
+        "role": "moderator",  # Optional: admin, moderator, member
+        "status": "banned"    # Optional: active, pending, banned
+    }
+    """
+    access = community_service.get_access(community_id, current_user.user_id)
+    
+    if not access.exists:
+        return jsonify({'message': 'Community not found'}), 404
+    
+    if access.role != 'admin' and current_user.role != 'admin':
+        return jsonify({'message': 'Unauthorized'}), 403
+    
+    data = request.get_json() or {}
+    role = data.get('role')
+    status = data.get('status')
+    
+    if role is None and status is None:
+        return jsonify({'message': 'role or status is required'}), 400
+    if role is not None and role not in COMMUNITY_MEMBER_ROLES:
+        return jsonify({'message': f"role must be one of: {', '.join(COMMUNITY_MEMBER_ROLES)}"}), 400
+    if status is not None and status not in COMMUNITY_MEMBER_STATUSES:
+        return jsonify({'message': f"status must be one of: {', '.join(COMMUNITY_MEMBER_STATUSES)}"}), 400
+    if user_id == current_user.user_id and (role not in (None, 'admin') or status not in (None, 'active')):
+        return jsonify({'message': 'Admins cannot demote or ban themselves'}), 400
+    
+    member = community_service.update_member(community_id, user_id, role=role, status=status)
+    
+    if not member:
+        return jsonify({'message': 'Member not found'}), 404
+    
+    db.session.commit()
+    community_service.invalidate_access(community_id, user_id)
+    
+    return jsonify({
+        'message': 'Member updated successfully',
+        'member': member.to_dict()
+    }), 200
+
+
+@token_required
+def get_community_posts(current_user, community_id):
+    """
+    Get posts for a specific community.
+    
+    Query Parameters:
+    - page: int (default=1)
+    - per_page: int (default=10)
+    - cursor: string (switches to keyset pagination on (created_at, post_id); send it
+      empty for the first page and then pass back next_cursor. 'page' is ignored)
+    - include_total: bool (default=true in page mode, false in cursor mode)
+    - compact: bool (default=false - author snapshot, counts and truncated content)
+    """
+    # Check if community exists (also loads the user's membership)
+    access = community_service.get_access(community_id, current_user.user_id)
+    
+    if not access.exists:
+        return jsonify({'message': 'Community not found'}), 404
+    
+    if not access.can_view:
         return jsonify({'message': 'Not a member of this community'}), 403
     
     # Get query parameters
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 10, type=int)
-    
-    # Get posts
-    posts_page = CommunityPost.query.filter_by(community_id=community_id).order_by(
-        CommunityPost.created_at.desc()
-    ).paginate(page=page, per_page=per_page, error_out=False)
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 10, type=int), 1), 100)
+    cursor = request.args.get('cursor')
+    include_total = parse_bool_arg(request.args.get('include_total'), default=cursor is None)
+    compact = parse_bool_arg(request.args.get('compact'))
+    
+    query = CommunityPost.query.filter_by(community_id=community_id)
+    
+    if cursor is not None:
+        # Keyset pagination on (created_at, post_id): no OFFSET scan
+        try:
+            items, next_cursor = keyset_page(
+                query, 'community_posts',
+                [CommunityPost.created_at, CommunityPost.post_id], [datetime, uuid.UUID],
+                cursor, per_page,
+                key_of=lambda post: [post.created_at, post.post_id]
+            )
+        except InvalidCursorError as e:
+            return jsonify({'message': 'Invalid pagination cursor', 'details': str(e)}), 400
+        pagination = {
+            'per_page': per_page,
+            'next_cursor': next_cursor,
+            'has_next': next_cursor is not None
+        }
+        if include_total:
+            pagination['total_items'] = query.count()
+    else:
+        ordered = query.order_by(CommunityPost.created_at.desc(), CommunityPost.post_id.desc())
+        if include_total:
+            posts_page = ordered.paginate(page=page, per_page=per_page, error_out=False)
+            items = posts_page.items
+            pagination = {
+                'page': page,
+                'per_page': per_page,
+                'total_pages': posts_page.pages,
+                'total_items': posts_page.total
+            }
+        else:
+            # Skip the COUNT query; one extra row tells whether another page exists
+            items = ordered.offset((page - 1) * per_page).limit(per_page + 1).all()
+            pagination = {
+                'page': page,
+                'per_page': per_page,
+                'has_next': len(items) > per_page
+            }
+            items = items[:per_page]
     
     # Format response
-    posts = [post.to_dict() for post in posts_page.items]
+    posts = community_service.serialize_posts(items, viewer_id=current_user.user_id, compact=compact)
     
     return jsonify({
         'posts': posts,
-        'pagination': {
-            'page': page,
-            'per_page': per_page,
-            'total_pages': posts_page.pages,
-            'total_items': posts_page.total
-        }
+        'pagination': pagination
     }), 200
 
 
@@ -347,20 +482,14 @@ def create_community_post(current_user, community_id):
         "image_url": "https://example.com/image.jpg"  # Optional
     }
     """
-    # Check if community exists
-    community = Community.query.get(community_id)
+    # Check if community exists (also loads the user's membership)
+    access = community_service.get_access(community_id, current_user.user_id)
     
-    if not community:
+    if not access.exists:
         return jsonify({'message': 'Community not found'}), 404
     
-    # Check if user is a member
-    member = CommunityMember.query.filter_by(
-        community_id=community_id,
-        user_id=current_user.user_id,
-        status='active'
-    ).first()
-    
-    if not member:
+    # Check if user is an active member
+    if not access.is_active_member:
         return jsonify({'message': 'Not an active member of this community'}), 403
     
     data = request.get_json()
@@ -378,28 +507,21 @@ def create_community_post(current_user, community_id):
     
     return jsonify({
         'message': 'Post created successfully',
-        'post': post.to_dict()
+        'post': community_service.serialize_posts([post], viewer_id=current_user.user_id)[0]
     }), 201
 @token_required
 def get_community_post(current_user, community_id, post_id):
     """
     Get a specific post with comments.
     """
-    # Check if community exists
-    community = Community.query.get(community_id)
+    # Check community exists and, if private, that the user is a member
+    access = community_service.get_access(community_id, current_user.user_id)
     
-    if not community:
+    if not access.exists:
         return jsonify({'message': 'Community not found'}), 404
     
-    # Check if user is a member for private communities
-    if community.is_private:
-        member = CommunityMember.query.filter_by(
-            community_id=community_id,
-            user_id=current_user.user_id
-        ).first()
-        
-        if not member:
-            return jsonify({'message': 'Not a member of this community'}), 403
+    if not access.can_view:
+        return jsonify({'message': 'Not a member of this community'}), 403
     
     # Get post
     post = CommunityPost.query.filter_by(
@@ -410,15 +532,10 @@ def get_community_post(current_user, community_id, post_id):
     if not post:
         return jsonify({'message': 'Post not found'}), 404
     
-    # Check if user has liked the post
-    user_like = PostLike.query.filter_by(
-        post_id=post_id,
-        user_id=current_user.user_id
-    ).first()
-    
-    # Get post with comments and likes
-    post_data = post.to_dict(include_comments=True)
-    post_data['user_has_liked'] = bool(user_like)
+    # Get post with comments and the caller's like
+    post_data = community_service.serialize_posts(
+        [post], viewer_id=current_user.user_id, include_comments=True
+    )[0]
     
     return jsonify(post_data), 200
 
@@ -434,10 +551,10 @@ def update_community_post(current_user, community_id, post_id):
         "image_url": "https://example.com/new-image.jpg"  # Optional
     }
     """
-    # Check if community exists
-    community = Community.query.get(community_id)
+    # Check if community exists (also loads the user's membership)
+    access = community_service.get_access(community_id, current_user.user_id)
     
-    if not community:
+    if not access.exists:
         return jsonify({'message': 'Community not found'}), 404
     
     # Get post
@@ -452,12 +569,7 @@ def update_community_post(current_user, community_id, post_id):
     # Check if user is the author or a community admin/moderator
     is_author = post.user_id == current_user.user_id
     
-    member = CommunityMember.query.filter_by(
-        community_id=community_id,
-        user_id=current_user.user_id
-    ).first()
-    
-    is_admin_or_mod = member and member.role in ['admin', 'moderator']
+    is_admin_or_mod = access.is_admin_or_mod
     
     if not (is_author or is_admin_or_mod or current_user.role == 'admin'):
         return jsonify({'message': 'Unauthorized to update this post'}), 403
@@ -475,7 +587,7 @@ def update_community_post(current_user, community_id, post_id):
     
     return jsonify({
         'message': 'Post updated successfully',
-        'post': post.to_dict()
+        'post': community_service.serialize_posts([post], viewer_id=current_user.user_id)[0]
     }), 200
 
 
@@ -485,10 +597,10 @@ def delete_community_post(current_user, community_id, post_id):
     Delete a community post with complete cascade deletion.
     """
     try:
-        # Check if community exists
-        community = Community.query.get(community_id)
+        # Check if community exists (also loads the user's membership)
+        access = community_service.get_access(community_id, current_user.user_id)
         
-        if not community:
+        if not access.exists:
             return jsonify({'message': 'Community not found'}), 404
         
         # Get post
@@ -503,25 +615,13 @@ def delete_community_post(current_user, community_id, post_id):
         # Check if user is the author or a community admin/moderator
         is_author = post.user_id == current_user.user_id
         
-        member = CommunityMember.query.filter_by(
-            community_id=community_id,
-            user_id=current_user.user_id
-        ).first()
-        
-        is_admin_or_mod = member and member.role in ['admin', 'moderator']
+        is_admin_or_mod = access.is_admin_or_mod
         
         if not (is_author or is_admin_or_mod or current_user.role == 'admin'):
             return jsonify({'message': 'Unauthorized to delete this post'}), 403
         
-        # Complete cascade deletion
-        # Delete post likes
-        PostLike.query.filter_by(post_id=post_id).delete()
-        
-        # Delete post comments
-        PostComment.query.filter_by(post_id=post_id).delete()
-        
-        # Delete the post
-        db.session.delete(post)
+        # Set-based cascade deletion of the post's likes and comments
+        community_deletion_service.delete_posts([post.post_id])
         db.session.commit()
         
         return jsonify({'message': 'Post and all related data deleted successfully'}), 200
@@ -537,21 +637,14 @@ def like_community_post(current_user, community_id, post_id):
     """
     Like or unlike a community post.
     """
-    # Check if community exists
-    community = Community.query.get(community_id)
+    # Check community exists and, if private, that the user is a member
+    access = community_service.get_access(community_id, current_user.user_id)
     
-    if not community:
+    if not access.exists:
         return jsonify({'message': 'Community not found'}), 404
     
-    # Check if user is a member for private communities
-    if community.is_private:
-        member = CommunityMember.query.filter_by(
-            community_id=community_id,
-            user_id=current_user.user_id
-        ).first()
-        
-        if not member:
-            return jsonify({'message': 'Not a member of this community'}), 403
+    if not access.can_view:
+        return jsonify({'message': 'Not a member of this community'}), 403
     
     # Get post
     post = CommunityPost.query.filter_by(
@@ -604,21 +697,14 @@ def get_post_likes(current_user, community_id, post_id):
     - page: int (default=1)
     - per_page: int (default=20)
     """
-    # Check if community exists
-    community = Community.query.get(community_id)
+    # Check community exists and, if private, that the user is a member
+    access = community_service.get_access(community_id, current_user.user_id)
     
-    if not community:
+    if not access.exists:
         return jsonify({'message': 'Community not found'}), 404
     
-    # Check if user is a member for private communities
-    if community.is_private:
-        member = CommunityMember.query.filter_by(
-            community_id=community_id,
-            user_id=current_user.user_id
-        ).first()
-        
-        if not member:
-            return jsonify({'message': 'Not a member of this community'}), 403
+    if not access.can_view:
+        return jsonify({'message': 'Not a member of this community'}), 403
     
     # Get post
     post = CommunityPost.query.filter_by(
@@ -634,7 +720,9 @@ def get_post_likes(current_user, community_id, post_id):
     per_page = request.args.get('per_page', 20, type=int)
     
     # Get likes with pagination
-    likes_page = PostLike.query.filter_by(post_id=post_id).paginate(
+    likes_page = PostLike.query.options(joinedload(PostLike.user)).filter_by(post_id=post_id).order_by(
+        PostLike.created_at.desc(), PostLike.user_id
+    ).paginate(
         page=page, per_page=per_page, error_out=False
     )
     
@@ -660,22 +748,18 @@ def get_post_comments(current_user, community_id, post_id):
     Query Parameters:
     - page: int (default=1)
     - per_page: int (default=20)
+    - cursor: string (switches to keyset pagination on (created_at, comment_id); send
+      it empty for the first page and then pass back next_cursor. 'page' is ignored)
+    - include_total: bool (default=true in page mode, false in cursor mode)
     """
-    # Check if community exists
-    community = Community.query.get(community_id)
+    # Check community exists and, if private, that the user is a member
+    access = community_service.get_access(community_id, current_user.user_id)
     
-    if not community:
+    if not access.exists:
         return jsonify({'message': 'Community not found'}), 404
     
-    # Check if user is a member for private communities
-    if community.is_private:
-        member = CommunityMember.query.filter_by(
-            community_id=community_id,
-            user_id=current_user.user_id
-        ).first()
-        
-        if not member:
-            return jsonify({'message': 'Not a member of this community'}), 403
+    if not access.can_view:
+        return jsonify({'message': 'Not a member of this community'}), 403
     
     # Get post
     post = CommunityPost.query.filter_by(
@@ -687,25 +771,61 @@ def get_post_comments(current_user, community_id, post_id):
         return jsonify({'message': 'Post not found'}), 404
     
     # Get query parameters
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    
-    # Get comments with pagination
-    comments_page = PostComment.query.filter_by(post_id=post_id).order_by(
-        PostComment.created_at.asc()
-    ).paginate(page=page, per_page=per_page, error_out=False)
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+    cursor = request.args.get('cursor')
+    include_total = parse_bool_arg(request.args.get('include_total'), default=cursor is None)
+    
+    query = PostComment.query.filter_by(post_id=post_id)
+    
+    if cursor is not None:
+        # Keyset pagination on (created_at, comment_id), oldest first
+        try:
+            items, next_cursor = keyset_page(
+                query.options(joinedload(PostComment.user)), 'community_comments',
+                [PostComment.created_at, PostComment.comment_id], [datetime, uuid.UUID],
+                cursor, per_page,
+                key_of=lambda comment: [comment.created_at, comment.comment_id],
+                descending=False
+            )
+        except InvalidCursorError as e:
+            return jsonify({'message': 'Invalid pagination cursor', 'details': str(e)}), 400
+        pagination = {
+            'per_page': per_page,
+            'next_cursor': next_cursor,
+            'has_next': next_cursor is not None
+        }
+        if include_total:
+            pagination['total_items'] = query.count()
+    else:
+        ordered = query.options(joinedload(PostComment.user)).order_by(
+            PostComment.created_at.asc(), PostComment.comment_id.asc()
+        )
+        if include_total:
+            comments_page = ordered.paginate(page=page, per_page=per_page, error_out=False)
+            items = comments_page.items
+            pagination = {
+                'page': page,
+                'per_page': per_page,
+                'total_pages': comments_page.pages,
+                'total_items': comments_page.total
+            }
+        else:
+            # Skip the COUNT query; one extra row tells whether another page exists
+            items = ordered.offset((page - 1) * per_page).limit(per_page + 1).all()
+            pagination = {
+                'page': page,
+                'per_page': per_page,
+                'has_next': len(items) > per_page
+            }
+            items = items[:per_page]
     
     # Format response
-    comments = [comment.to_dict() for comment in comments_page.items]
+    comments = [comment.to_dict() for comment in items]
     
     return jsonify({
         'comments': comments,
-        'pagination': {
-            'page': page,
-            'per_page': per_page,
-            'total_pages': comments_page.pages,
-            'total_items': comments_page.total
-        }
+        'pagination': pagination
     }), 200
 
 
@@ -719,20 +839,14 @@ def create_post_comment(current_user, community_id, post_id):
         "content": "This is my comment..."
     }
     """
-    # Check if community exists
-    community = Community.query.get(community_id)
+    # Check if community exists (also loads the user's membership)
+    access = community_service.get_access(community_id, current_user.user_id)
     
-    if not community:
+    if not access.exists:
         return jsonify({'message': 'Community not found'}), 404
     
-    # Check if user is a member
-    member = CommunityMember.query.filter_by(
-        community_id=community_id,
-        user_id=current_user.user_id,
-        status='active'
-    ).first()
-    
-    if not member and community.is_private:
+    # Private communities only accept comments from active members
+    if access.is_banned or (access.is_private and not access.is_active_member):
         return jsonify({'message': 'Not an active member of this community'}), 403
     
     # Get post
@@ -776,10 +890,10 @@ def update_post_comment(current_user, community_id, post_id, comment_id):
         "content": "Updated comment content..."
     }
     """
-    # Check if community exists
-    community = Community.query.get(community_id)
+    # Check if community exists (also loads the user's membership)
+    access = community_service.get_access(community_id, current_user.user_id)
     
-    if not community:
+    if not access.exists:
         return jsonify({'message': 'Community not found'}), 404
     
     # Get post
@@ -803,12 +917,7 @@ def update_post_comment(current_user, community_id, post_id, comment_id):
     # Check if user is the comment author or a community admin/moderator
     is_author = comment.user_id == current_user.user_id
     
-    member = CommunityMember.query.filter_by(
-        community_id=community_id,
-        user_id=current_user.user_id
-    ).first()
-    
-    is_admin_or_mod = member and member.role in ['admin', 'moderator']
+    is_admin_or_mod = access.is_admin_or_mod
     
     if not (is_author or is_admin_or_mod or current_user.role == 'admin'):
         return jsonify({'message': 'Unauthorized to update this comment'}), 403
@@ -835,10 +944,10 @@ def delete_post_comment(current_user, community_id, post_id, comment_id):
     Delete a comment with complete cascade deletion.
     """
     try:
-        # Check if community exists
-        community = Community.query.get(community_id)
+        # Check if community exists (also loads the user's membership)
+        access = community_service.get_access(community_id, current_user.user_id)
         
-        if not community:
+        if not access.exists:
             return jsonify({'message': 'Community not found'}), 404
         
         # Get post
@@ -862,12 +971,7 @@ def delete_post_comment(current_user, community_id, post_id, comment_id):
         # Check if user is the comment author or a community admin/moderator
         is_author = comment.user_id == current_user.user_id
         
-        member = CommunityMember.query.filter_by(
-            community_id=community_id,
-            user_id=current_user.user_id
-        ).first()
-        
-        is_admin_or_mod = member and member.role in ['admin', 'moderator']
+        is_admin_or_mod = access.is_admin_or_mod
         
         if not (is_author or is_admin_or_mod or current_user.role == 'admin'):
             return jsonify({'message': 'Unauthorized to delete this comment'}), 403
@@ -5,6 +5,7 @@ from sqlalchemy.orm import joinedload
 from server.models.crop import Crop, UserCrop
 from server.database import db
 from server.utils.auth import token_required
+from server.services.suggestion_service import suggestion_service
 
 def get_crops():
     """
@@ -303,6 +304,7 @@ def create_user_crop(current_user):
     
     db.session.add(user_crop)
     db.session.commit()
+    suggestion_service.invalidate(current_user.user_id)
     
     return jsonify({
         'message': 'Crop record created successfully',
@@ -370,6 +372,7 @@ def update_user_crop(current_user, user_crop_id):
         return jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400
     
     db.session.commit()
+    suggestion_service.invalidate(current_user.user_id)
     
     return jsonify({
         'message': 'Crop record updated successfully',
@@ -392,5 +395,6 @@ def delete_user_crop(current_user, user_crop_id):
     
     db.session.delete(user_crop)
     db.session.commit()
+    suggestion_service.invalidate(current_user.user_id)
     
     return jsonify({'message': 'Crop record deleted successfully'}), 200
\ No newline at end of file
@@ -7,6 +7,7 @@ from server.models.user import User
 from server.database import db
 from server.utils.auth import token_required, role_required
 from server.utils.error_handlers import create_error_response, create_success_response
+from server.services.suggestion_service import suggestion_service
 
 @token_required
 def get_experts(current_user):
@@ -134,6 +135,7 @@ def create_expert_profile(current_user):
                 setattr(expert, field, data[field])
         
         db.session.commit()
+        suggestion_service.invalidate(current_user.user_id)
         
         return jsonify({
             'message': 'Expert profile updated successfully',
@@ -161,6 +163,7 @@ def create_expert_profile(current_user):
         current_user.role = 'expert'
         
         db.session.commit()
+        suggestion_service.invalidate(current_user.user_id)
         
         return jsonify({
             'message': 'Expert profile created successfully',
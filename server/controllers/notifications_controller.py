@@ -12,6 +12,7 @@ import asyncio
 from server.database import db
 from server.models.notifications import Notification, NotificationPreferences
 from server.services.notification_service import notification_service
+from server.services.notification_queue import notification_queue
 from server.utils.error_handlers import handle_error
 
 
@@ -57,7 +58,9 @@ class NotificationController:
             db.session.commit()
             
             # Send notification immediately if not scheduled
-            if not scheduled_at:
+            if scheduled_at:
+                notification_queue.schedule(notification)
+            else:
                 try:
                     results = asyncio.run(notification_service.send_notification(notification))
                     current_app.logger.info(f"Notification {notification.notification_id} sent with results: {results}")
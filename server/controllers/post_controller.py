@@ -2,7 +2,7 @@ from flask import request, jsonify, current_app
 from datetime import datetime
 import json
 import uuid, math, os
-from sqlalchemy import func, any_, case, column
+from sqlalchemy import func, any_, column, tuple_
 from werkzeug.utils import secure_filename
 import bleach
 from sqlalchemy.orm import joinedload, subqueryload, aliased
@@ -11,10 +11,21 @@ from sqlalchemy.orm import joinedload, subqueryload, aliased
 from server.models.post import Post, Category, Tag, Comment, ArticlePostLike as PostLike, post_tags
 from server.database import db
 from server.models.crop import Crop
+from server.models.user import User
 from server.utils.auth import token_required, resource_owner_required, admin_required
 from server.utils.validators import validate_agricultural_data, sanitize_html_content, validate_business_rules
 from server.utils.error_handlers import create_error_response, create_success_response
 from server.utils.rate_limiter import rate_limit_moderate, rate_limit_lenient
+from server.services.post_counter_service import post_counter_service
+from server.services.view_counter import view_counter
+from server.services.comment_service import comment_service
+from server.services.timeline_service import timeline_service
+from server.services.tag_service import tag_service
+from server.services.trending_service import trending_service
+from server.utils.response_cache import feed_cache, make_query_key
+from server.utils.fragment_cache import post_fragment_cache
+from server.utils.search import build_tsquery, search_filter, search_rank
+from server.utils.pagination import encode_cursor, decode_cursor, parse_bool_arg, InvalidCursorError
 
 def get_posts(current_user=None):
     """
@@ -28,8 +39,35 @@ def get_posts(current_user=None):
     - season: string (spring, summer, fall, winter)
     - tags: string (case-insensitive tag filtering)
     - search: string
-    - sort_by: string (date, popularity, relevance)
+    - sort_by: string (date, popularity, trending, relevance)
+    - cursor: string (switches to keyset pagination; send it empty for the first page
+      and then pass back the returned next_cursor. 'page' is ignored in this mode)
+    - include_total: bool (cursor mode only, default=false - also count all matching posts)
+
+    Anonymous pages are the same for every caller, so they are served from the feed
+    cache (FEED_CACHE_TTL seconds, invalidated by writes that change the feed).
     """
+    cache_ttl = current_app.config.get('FEED_CACHE_TTL', 30)
+    if current_user is None and cache_ttl > 0:
+        body, status_code = feed_cache.get_or_build(
+            make_query_key(request.args),
+            lambda: _render_cached_response(_get_posts(None)),
+            ttl=cache_ttl,
+            should_cache=lambda page: page[1] == 200
+        )
+        return current_app.response_class(body, status=status_code, mimetype='application/json')
+
+    return _get_posts(current_user)
+
+
+def _render_cached_response(result):
+    """Turn a (response, status_code) controller result into a cacheable (body, status_code)."""
+    response, status_code = result
+    return response.get_data(), status_code
+
+
+def _get_posts(current_user=None):
+    """Build the get_posts response for the current request's query parameters."""
     # Get query parameters
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
@@ -40,32 +78,15 @@ def get_posts(current_user=None):
     tags = request.args.get('tags', type=str)
     search = request.args.get('search')
     sort_by = request.args.get('sort_by', 'date')
+    cursor = request.args.get('cursor')
+    include_total = parse_bool_arg(request.args.get('include_total'))
     
     # Base query
-    # --- Performance Fix: Use subqueries to get counts and avoid N+1 queries ---
-    comment_count_sq = db.session.query(
-        Comment.post_id,
-        func.count(Comment.comment_id).label('comment_count')
-    ).group_by(Comment.post_id).subquery()
+    # --- Performance Fix: comment and like counts are denormalized onto Post ---
+    comment_count_expr = Post.comment_count.label('comment_count')
+    like_count_expr = Post.like_count.label('like_count')
 
-
-    like_count_sq = db.session.query(
-        PostLike.post_id,
-        func.count(PostLike.user_id).label('like_count')
-    ).group_by(PostLike.post_id).subquery()
-
-
-    comment_count_expr = func.coalesce(comment_count_sq.c.comment_count, 0).label('comment_count')
-    like_count_expr = func.coalesce(like_count_sq.c.like_count, 0).label('like_count')
-
-    # --- Base query with joins to subqueries and preloading of relationships ---
-    query = db.session.query(
-        Post,
-        comment_count_expr,
-        like_count_expr
-    ).outerjoin(comment_count_sq, Post.post_id == comment_count_sq.c.post_id) \
-     .outerjoin(like_count_sq, Post.post_id == like_count_sq.c.post_id) \
-     .filter(Post.status == 'published')
+    query = db.session.query(Post).filter(Post.status == 'published')
     
     # Apply filters
     # --- Filtering Fix: Handle string-based filters from the frontend ---
@@ -97,17 +118,29 @@ def get_posts(current_user=None):
             # Use case-insensitive filtering with ILIKE to handle capitalization differences
             query = query.filter(Post.tags.any(Tag.name.ilike(f'%{tag_name}%')))
     
-    if search:
-        query = query.filter(
-            (Post.title.ilike(f'%{search}%')) | 
-            (Post.content.ilike(f'%{search}%'))
-        )
+    # Full-text search over the GIN-indexed search_vector (title weighted above content)
+    tsquery = None
+    if search and search.strip():
+        tsquery = build_tsquery(search.strip())
+        query = query.filter(search_filter(Post.search_vector, tsquery))
+    
+    # Relevance only means something when there is a search term to rank against
+    if sort_by == 'relevance' and tsquery is None:
+        sort_by = 'date'
+    
+    # Keyset pagination: no COUNT(*) (unless asked for) and no OFFSET scan
+    if cursor is not None:
+        return _get_posts_by_cursor(query, cursor, sort_by, per_page, include_total, current_user, tsquery)
     
     # Apply sorting
     if sort_by == 'date':
         query = query.order_by(Post.published_at.desc())
     elif sort_by == 'popularity':
-        query = query.order_by(Post.view_count.desc(), like_count_expr.desc())
+        query = query.order_by(Post.view_count.desc(), Post.like_count.desc())
+    elif sort_by == 'trending':
+        query = query.order_by(Post.trending_score.desc(), Post.post_id.desc())
+    elif sort_by == 'relevance':
+        query = query.order_by(search_rank(Post.search_vector, tsquery).desc(), Post.published_at.desc())
     
     # --- Stability Fix: Use a "Paginate-by-IDs" approach for maximum stability ---
     # This pattern avoids complex queries with .paginate() by first paginating only the
@@ -139,37 +172,8 @@ def get_posts(current_user=None):
             }
         )
 
-    # 5. Fetch the full Post objects for the IDs on the current page, preserving the original sort order.
-    order_logic = case({pid: i for i, pid in enumerate(post_ids_on_page)}, value=Post.post_id)
-    posts_on_page = db.session.query(Post).filter(
-        Post.post_id.in_(post_ids_on_page)
-    ).order_by(order_logic).options(
-        joinedload(Post.author),
-        joinedload(Post.category),
-        subqueryload(Post.tags)
-    ).all()
-
-    # 6. Format the response, combining the Post objects with their counts from the map.
-    posts = []
-    for post in posts_on_page:
-        counts = counts_map.get(post.post_id, {})
-        post_dict = post.to_dict(
-            include_content=False,
-            comment_count=counts.get('comment_count', 0),
-            like_count=counts.get('like_count', 0)
-        )
-        
-        # Add is_following status for the post author
-        if current_user and post.author:
-            from server.services.follow_service import follow_service
-            is_following = follow_service.is_following(
-                follower_id=str(current_user.user_id),
-                following_id=str(post.author.user_id)
-            )
-            if post_dict['author']:
-                post_dict['author']['is_following'] = is_following
-        
-        posts.append(post_dict)
+    # 5-6. Fetch the full Post objects and format the response.
+    posts = _serialize_post_page(post_ids_on_page, counts_map, current_user)
     
     return create_success_response(
         data=posts,
@@ -182,6 +186,187 @@ def get_posts(current_user=None):
     )
 
 
+def _get_posts_by_cursor(query, cursor, sort_by, per_page, include_total, current_user, tsquery=None):
+    """
+    Keyset-paginate an already filtered post query.
+    
+    Date ordering is keyed on (published_at, post_id), popularity ordering on
+    (view_count, like_count, post_id), trending ordering on (trending_score, post_id)
+    and relevance ordering on (ts_rank, post_id).
+    The cursor holds the key of the last row returned, so each page is a bounded
+    index range scan instead of an OFFSET.
+    """
+    if sort_by == 'popularity':
+        kind = 'popularity'
+        sort_columns = [func.coalesce(Post.view_count, 0), Post.like_count, Post.post_id]
+        key_types = [int, int, uuid.UUID]
+    elif sort_by == 'trending':
+        kind = 'trending'
+        sort_columns = [Post.trending_score, Post.post_id]
+        key_types = [float, uuid.UUID]
+    elif sort_by == 'relevance' and tsquery is not None:
+        kind = 'relevance'
+        sort_columns = [search_rank(Post.search_vector, tsquery), Post.post_id]
+        key_types = [float, uuid.UUID]
+    else:
+        kind = 'date'
+        # Rows without a publish date cannot take part in a keyset comparison
+        query = query.filter(Post.published_at.isnot(None))
+        sort_columns = [Post.published_at, Post.post_id]
+        key_types = [datetime, uuid.UUID]
+    
+    # Only count when the client explicitly asks for it
+    total_items = None
+    if include_total:
+        total_items = query.count()
+    
+    if cursor:
+        try:
+            after = decode_cursor(cursor, kind, key_types)
+        except InvalidCursorError as e:
+            return create_error_response('INVALID_CURSOR', 'Invalid pagination cursor', details=str(e), status_code=400)
+        query = query.filter(tuple_(*sort_columns) < tuple(after))
+    
+    # Fetch one extra row to know whether another page exists
+    sort_keys = [sort_column.label(f'sort_key_{i}') for i, sort_column in enumerate(sort_columns)]
+    rows = query.with_entities(
+        Post.post_id,
+        Post.comment_count,
+        Post.like_count,
+        *sort_keys
+    ).order_by(*[sort_column.desc() for sort_column in sort_columns]).limit(per_page + 1).all()
+    
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    
+    next_cursor = None
+    if has_next:
+        last = rows[-1]
+        next_cursor = encode_cursor(kind, [getattr(last, key.name) for key in sort_keys])
+    
+    counts_map = {row.post_id: {'comment_count': row.comment_count, 'like_count': row.like_count} for row in rows}
+    posts = _serialize_post_page([row.post_id for row in rows], counts_map, current_user)
+    
+    pagination = {
+        'per_page': per_page,
+        'next_cursor': next_cursor,
+        'has_next': has_next
+    }
+    if total_items is not None:
+        pagination['total_items'] = total_items
+    
+    return create_success_response(data=posts, pagination=pagination)
+
+
+@token_required
+def get_following_feed(current_user):
+    """
+    Get the current user's following feed: posts from followed authors, newest first.
+    
+    Query Parameters:
+    - per_page: int (default=10, max=50)
+    - cursor: string (next_cursor from the previous page)
+    """
+    per_page = min(max(request.args.get('per_page', 10, type=int), 1), 50)
+    
+    result = timeline_service.get_timeline(
+        current_user.user_id,
+        cursor=request.args.get('cursor'),
+        limit=per_page
+    )
+    
+    if not result['success']:
+        if result['error'] == 'invalid_cursor':
+            return create_error_response('INVALID_CURSOR', 'Invalid pagination cursor', details=result['message'], status_code=400)
+        return create_error_response('SERVER_ERROR', 'Failed to load following feed', status_code=500)
+    
+    rows = result['rows']
+    counts_map = {row.post_id: {'comment_count': row.comment_count, 'like_count': row.like_count} for row in rows}
+    posts = _serialize_post_page([row.post_id for row in rows], counts_map, current_user)
+    
+    return create_success_response(
+        data=posts,
+        pagination={
+            'per_page': per_page,
+            'next_cursor': result['next_cursor'],
+            'has_next': result['has_next']
+        }
+    )
+
+
+def _serialize_post_page(post_ids_on_page, counts_map, current_user=None):
+    """
+    Convert one page of posts to list-view dicts in the given order.
+    
+    The static part of each post comes from post_fragment_cache, keyed on the post's
+    and its author's updated_at, so only cache misses load posts with their author,
+    category and tags. Live counters and follow status are spliced in per request.
+    """
+    if not post_ids_on_page:
+        return []
+    
+    # Version stamps and live view counts for every post on the page
+    stamps = db.session.query(
+        Post.post_id,
+        Post.author_id,
+        Post.updated_at,
+        Post.view_count,
+        User.user_id.label('author_user_id'),
+        User.updated_at.label('author_updated_at')
+    ).outerjoin(
+        User, User.user_id == Post.author_id
+    ).filter(Post.post_id.in_(post_ids_on_page)).all()
+    stamps_by_id = {row.post_id: row for row in stamps}
+    cache_keys = {row.post_id: (row.post_id, row.updated_at, row.author_updated_at) for row in stamps}
+    
+    fragments = post_fragment_cache.get_many(cache_keys.values())
+    missing_ids = [post_id for post_id, key in cache_keys.items() if key not in fragments]
+    if missing_ids:
+        missing_posts = db.session.query(Post).filter(
+            Post.post_id.in_(missing_ids)
+        ).options(
+            joinedload(Post.author),
+            joinedload(Post.category),
+            subqueryload(Post.tags)
+        ).all()
+        for post in missing_posts:
+            key = cache_keys[post.post_id]
+            fragments[key] = post.to_dict(include_content=False)
+            post_fragment_cache.set(key, fragments[key], owner=post.author_id)
+
+    # Resolve follow status for every author on the page in a single query
+    followed_author_ids = set()
+    if current_user:
+        from server.services.follow_service import follow_service
+        followed_author_ids = follow_service.following_set(
+            follower_id=str(current_user.user_id),
+            candidate_ids={row.author_id for row in stamps}
+        )
+
+    # Splice the live counters into copies of the cached fragments
+    posts = []
+    for post_id in post_ids_on_page:
+        row = stamps_by_id.get(post_id)
+        fragment = fragments.get(cache_keys[post_id]) if row else None
+        if fragment is None:
+            continue  # Deleted while the page was being built
+        
+        counts = counts_map.get(post_id, {})
+        post_dict = dict(fragment)
+        post_dict['view_count'] = row.view_count
+        post_dict['comment_count'] = counts.get('comment_count', 0)
+        post_dict['like_count'] = counts.get('like_count', 0)
+        
+        # Add is_following status for the post author
+        if current_user and row.author_user_id and post_dict['author']:
+            post_dict['author'] = dict(post_dict['author'])
+            post_dict['author']['is_following'] = str(row.author_id) in followed_author_ids
+        
+        posts.append(post_dict)
+    
+    return posts
+
+
 @token_required
 @rate_limit_moderate
 def create_post(current_user):
@@ -316,24 +501,22 @@ def create_post(current_user):
     # Add tags if provided
     tags_list = data.get('tags', [])
     if tags_list:
-        for tag_name in tags_list:
-            if tag_name.strip():  # Skip empty tags
-                # Check if tag exists
-                tag = Tag.query.filter_by(name=tag_name.strip()).first()
-                if not tag:
-                    # Create new tag
-                    tag = Tag(name=tag_name.strip())
-                    db.session.add(tag)
-                    db.session.flush()
-                
-                # Add tag to post if not already added
-                if tag not in post.tags:
-                    post.tags.append(tag)
+        # Resolve all tags in two statements regardless of how many were submitted
+        post.tags = tag_service.resolve_tags(tags_list)
+    
+    if post.status == 'published':
+        trending_service.seed_score(post.post_id)
     
     db.session.commit()
+    feed_cache.bump()
     
     # Notify followers if post is published
     if post.status == 'published':
+        try:
+            timeline_service.publish(post.post_id)
+        except Exception as e:
+            current_app.logger.error(f"Error scheduling timeline fan-out: {str(e)}")
+        
         try:
             from server.services.follow_service import follow_service
             follow_service.notify_followers(
@@ -359,6 +542,9 @@ def create_post(current_user):
 def get_post(post_id, current_user=None):
     """
     Get a single post with full details, optimized to prevent N+1 queries.
+    
+    Includes the first page of top-level comments; later pages and deeper replies
+    come from get_comments using the returned comments_pagination.next_cursor.
     """
     try:
         # Convert string post_id to UUID
@@ -378,39 +564,23 @@ def get_post(post_id, current_user=None):
         if not post:
             return create_error_response('POST_NOT_FOUND', 'Post not found', status_code=404)
 
-        # Only increment view count for published posts
+        # Only count views for published posts; increments are flushed in batches
         if post.status == 'published':
-            post.view_count += 1
-            db.session.commit()
+            view_counter.increment('posts', post.post_id)
 
-        # --- Performance Fix: Fetch all comments and build tree in memory ---
-        all_comments = Comment.query.options(
-            joinedload(Comment.user)
-        ).filter_by(post_id=post_id).order_by(Comment.created_at.asc()).all()
+        # --- Performance Fix: Load only the first page of the comment tree ---
+        comment_page = comment_service.get_comment_tree(post.post_id)
+        if not comment_page['success']:
+            raise Exception(comment_page['message'])
 
-        comment_map = {comment.comment_id: comment.to_dict(include_replies=False) for comment in all_comments}
-        
-        # Initialize replies list for each comment
-        for comment_data in comment_map.values():
-            comment_data['replies'] = []
-
-        top_level_comments = []
-        for comment in all_comments:
-            comment_data = comment_map[comment.comment_id]
-            if comment.parent_comment_id:
-                parent = comment_map.get(comment.parent_comment_id)
-                if parent:
-                    parent['replies'].append(comment_data)
-            else:
-                top_level_comments.append(comment_data)
-
-        # Get like count
-        like_count = PostLike.query.filter_by(post_id=post_id).count()
-
-        # Combine all data
+        # Combine all data (like_count comes from the denormalized counter)
         post_data = post.to_dict(include_content=True)
-        post_data['comments'] = top_level_comments
-        post_data['like_count'] = like_count
+        post_data['view_count'] = (post.view_count or 0) + view_counter.pending('posts', post.post_id)
+        post_data['comments'] = comment_page['comments']
+        post_data['comments_pagination'] = {
+            'next_cursor': comment_page['next_cursor'],
+            'has_next': comment_page['has_next']
+        }
         
         # Add is_following status for the post author
         if current_user and post.author:
@@ -520,32 +690,28 @@ def update_post(current_user, post_id, resource=None):
         post.applicable_locations = data.get('applicable_locations', [])
     
     # Update published_at if status changed to published
+    newly_published = False
     if 'status' in data and data['status'] == 'published' and not post.published_at:
         post.published_at = datetime.utcnow()
+        newly_published = True
     
     # Update tags if provided
     if 'tags' in data:
-        tags_list = data.get('tags', [])
-        # Clear existing tags
-        post.tags = []
-        
-        # Add new tags
-        for tag_name in tags_list:
-            if tag_name.strip():  # Skip empty tags
-                # Check if tag exists
-                tag = Tag.query.filter_by(name=tag_name.strip()).first()
-                if not tag:
-                    # Create new tag
-                    tag = Tag(name=tag_name.strip())
-                    db.session.add(tag)
-                    db.session.flush()
-                
-                # Add tag to post if not already added
-                if tag not in post.tags:
-                    post.tags.append(tag)
+        # Replace existing tags, resolving them in two statements
+        post.tags = tag_service.resolve_tags(data.get('tags', []))
     
     post.updated_at = datetime.utcnow()
+    post.activity_at = func.now()
+    if newly_published:
+        trending_service.seed_score(post.post_id)
     db.session.commit()
+    feed_cache.bump()
+    
+    if newly_published:
+        try:
+            timeline_service.publish(post.post_id)
+        except Exception as e:
+            current_app.logger.error(f"Error scheduling timeline fan-out: {str(e)}")
     
     return create_success_response(
         data={'post': post.to_dict()},
@@ -588,6 +754,7 @@ def delete_post(current_user, post_id):
             # Delete the post itself
             db.session.delete(post)
             db.session.commit()
+            feed_cache.bump()
             
             return create_success_response(message='Post permanently deleted successfully')
         
@@ -596,6 +763,7 @@ def delete_post(current_user, post_id):
             post.status = 'archived'
             post.updated_at = datetime.utcnow()
             db.session.commit()
+            feed_cache.bump()
             
             return create_success_response(message='Post archived successfully')
             
@@ -607,7 +775,13 @@ def delete_post(current_user, post_id):
 
 def get_comments(post_id):
     """
-    Get comments for a post (no authentication required).
+    Get a page of comments for a post (no authentication required).
+    
+    Query Parameters:
+    - cursor: string (next_cursor from the previous page)
+    - per_page: int (default=20, max=100)
+    - replies: int (direct replies included under each comment, default=3, max=20)
+    - parent_id: string (page through the replies of this comment instead of top-level comments)
     """
     try:
         # Convert string post_id to UUID
@@ -616,33 +790,41 @@ def get_comments(post_id):
     except ValueError:
         return create_error_response('INVALID_POST_ID', 'Invalid post ID format', status_code=400)
     
+    parent_id = request.args.get('parent_id')
+    try:
+        parent_id = uuid.UUID(parent_id) if parent_id else None
+    except ValueError:
+        return create_error_response('INVALID_COMMENT_ID', 'Invalid parent comment ID format', status_code=400)
+    
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+    replies_limit = min(max(request.args.get('replies', 3, type=int), 0), 20)
+    
     post = Post.query.get(post_id)
     
     if not post:
         return create_error_response('POST_NOT_FOUND', 'Post not found', status_code=404)
     
-    # Get comments for the post
-    all_comments = Comment.query.options(
-        joinedload(Comment.user)
-    ).filter_by(post_id=post_id).order_by(Comment.created_at.asc()).all()
-
-    comment_map = {comment.comment_id: comment.to_dict(include_replies=False) for comment in all_comments}
+    result = comment_service.get_comment_tree(
+        post_id,
+        parent_id=parent_id,
+        cursor=request.args.get('cursor'),
+        limit=per_page,
+        replies_limit=replies_limit
+    )
     
-    # Initialize replies list for each comment
-    for comment_data in comment_map.values():
-        comment_data['replies'] = []
-
-    top_level_comments = []
-    for comment in all_comments:
-        comment_data = comment_map[comment.comment_id]
-        if comment.parent_comment_id:
-            parent = comment_map.get(comment.parent_comment_id)
-            if parent:
-                parent['replies'].append(comment_data)
-        else:
-            top_level_comments.append(comment_data)
-
-    return create_success_response(data=top_level_comments)
+    if not result['success']:
+        if result['error'] == 'invalid_cursor':
+            return create_error_response('INVALID_CURSOR', 'Invalid pagination cursor', details=result['message'], status_code=400)
+        return create_error_response('SERVER_ERROR', 'Failed to load comments', status_code=500)
+    
+    return create_success_response(
+        data=result['comments'],
+        pagination={
+            'per_page': per_page,
+            'next_cursor': result['next_cursor'],
+            'has_next': result['has_next']
+        }
+    )
 
 
 @token_required
@@ -696,7 +878,9 @@ def add_comment(current_user, post_id):
     )
     
     db.session.add(comment)
+    post_counter_service.adjust(post_id, comments=1)
     db.session.commit()
+    feed_cache.bump()
     
     # Send notification to post author (if not commenting on own post)
     if str(post.author_id) != str(current_user.user_id):
@@ -765,18 +949,22 @@ def toggle_like(current_user, post_id):
     if like:
         # Unlike
         db.session.delete(like)
+        counters = post_counter_service.adjust(post_id, likes=-1)
         db.session.commit()
-        like_count = PostLike.query.filter_by(post_id=post_id).count()
+        feed_cache.bump()
         return create_success_response(
-            data={'liked': False, 'like_count': like_count},
+            data={'liked': False, 'like_count': counters['like_count']},
             message='Post unliked successfully'
         )
     else:
         # Like
         like = PostLike(post_id=post_id, user_id=current_user.user_id)
         db.session.add(like)
+        db.session.flush()
+        counters = post_counter_service.adjust(post_id, likes=1)
         db.session.commit()
-        like_count = PostLike.query.filter_by(post_id=post_id).count()
+        feed_cache.bump()
+        like_count = counters['like_count']
         return create_success_response(
             data={'liked': True, 'like_count': like_count},
             message='Post liked successfully',
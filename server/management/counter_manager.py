@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Denormalized counter management CLI tool.
+Provides commands for backfilling and reconciling counters that are maintained incrementally,
+for refreshing the derived post trending scores, and for re-running lost timeline fan-outs.
+"""
+
+import sys
+import os
+import argparse
+import logging
+from datetime import timedelta
+
+# Add the project root directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from server import create_app
+from server.services.post_counter_service import post_counter_service
+from server.services.trending_service import trending_service
+from server.services.timeline_service import timeline_service
+from server.services.community_service import community_service
+from server.services.follow_service import follow_service
+
+
+def setup_logging(verbose=False):
+    """Setup logging configuration."""
+    level = logging.DEBUG if verbose else logging.INFO
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[logging.StreamHandler(sys.stdout)]
+    )
+
+
+def reconcile_post_counters(args):
+    """Recompute post like/comment counters and repair drift."""
+    print("Reconciling post like/comment counters...")
+
+    try:
+        post_ids = args.post_ids.split(',') if args.post_ids else None
+        result = post_counter_service.reconcile(post_ids=post_ids, batch_size=args.batch_size)
+        print(f"✅ Checked {result['checked']} posts, repaired {result['repaired']}")
+        return True
+    except Exception as e:
+        print(f"❌ Error reconciling post counters: {str(e)}")
+        return False
+
+
+def reconcile_community_counters(args):
+    """Recompute community member counts and repair drift."""
+    print("Reconciling community member counts...")
+    
+    try:
+        community_ids = args.community_ids.split(',') if args.community_ids else None
+        result = community_service.reconcile_member_counts(community_ids=community_ids, batch_size=args.batch_size)
+        print(f"✅ Checked {result['checked']} communities, repaired {result['repaired']}")
+        return True
+    except Exception as e:
+        print(f"❌ Error reconciling community member counts: {str(e)}")
+        return False
+
+
+def reconcile_follow_counters(args):
+    """Recompute user follower/following counts and repair drift."""
+    print("Reconciling user follower/following counts...")
+    
+    try:
+        user_ids = args.user_ids.split(',') if args.user_ids else None
+        result = follow_service.reconcile_counts(user_ids=user_ids, batch_size=args.batch_size)
+        print(f"✅ Checked {result['checked']} users, repaired {result['repaired']}")
+        return True
+    except Exception as e:
+        print(f"❌ Error reconciling follow counts: {str(e)}")
+        return False
+
+
+def refresh_trending_scores(args):
+    """Recompute post trending scores."""
+    print("Refreshing post trending scores...")
+    
+    try:
+        result = trending_service.refresh(full=args.full)
+        print(f"✅ Refreshed {result['refreshed']} posts")
+        return True
+    except Exception as e:
+        print(f"❌ Error refreshing trending scores: {str(e)}")
+        return False
+
+
+def backfill_timelines(args):
+    """Fan out published posts whose timeline fan-out never completed."""
+    print("Backfilling pending timeline fan-outs...")
+
+    try:
+        result = timeline_service.fan_out_pending(grace=timedelta(minutes=args.grace_minutes), limit=args.limit)
+        print(f"✅ Fanned out {result['fanned_out']} posts, {result['failed']} failed")
+        return result['failed'] == 0
+    except Exception as e:
+        print(f"❌ Error backfilling timelines: {str(e)}")
+        return False
+
+
+def main():
+    """Main CLI entry point."""
+    parser = argparse.ArgumentParser(description='Counter Management CLI')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose logging')
+    parser.add_argument('--config', default='development', help='Configuration environment')
+
+    subparsers = parser.add_subparsers(dest='command', help='Available commands')
+
+    # Reconcile post counters
+    posts_parser = subparsers.add_parser('reconcile-posts', help='Backfill/reconcile post like and comment counters')
+    posts_parser.add_argument('--post-ids', help='Comma-separated list of post IDs (default: all posts)')
+    posts_parser.add_argument('--batch-size', type=int, default=1000, help='Posts recomputed per statement')
+    posts_parser.set_defaults(func=reconcile_post_counters)
+    
+    # Reconcile community member counts
+    communities_parser = subparsers.add_parser('reconcile-communities', help='Backfill/reconcile community member counts')
+    communities_parser.add_argument('--community-ids', help='Comma-separated list of community IDs (default: all communities)')
+    communities_parser.add_argument('--batch-size', type=int, default=1000, help='Communities recomputed per statement')
+    communities_parser.set_defaults(func=reconcile_community_counters)
+    
+    # Reconcile user follow counts
+    follows_parser = subparsers.add_parser('reconcile-follows', help='Backfill/reconcile user follower/following counts')
+    follows_parser.add_argument('--user-ids', help='Comma-separated list of user IDs (default: all users)')
+    follows_parser.add_argument('--batch-size', type=int, default=1000, help='Users recomputed per statement')
+    follows_parser.set_defaults(func=reconcile_follow_counters)
+    
+    # Refresh trending scores
+    trending_parser = subparsers.add_parser('refresh-trending', help='Recompute post trending scores')
+    trending_parser.add_argument('--full', action='store_true', help='Rescore every published post, not just recently active ones')
+    trending_parser.set_defaults(func=refresh_trending_scores)
+
+    # Backfill lost timeline fan-outs
+    timelines_parser = subparsers.add_parser('backfill-timelines', help='Fan out published posts missing from follower timelines')
+    timelines_parser.add_argument('--grace-minutes', type=int, default=0, help='Skip posts published more recently than this')
+    timelines_parser.add_argument('--limit', type=int, help='Maximum number of posts to fan out')
+    timelines_parser.set_defaults(func=backfill_timelines)
+
+    args = parser.parse_args()
+
+    if not args.command:
+        parser.print_help()
+        return 1
+
+    # Setup logging
+    setup_logging(args.verbose)
+
+    # Create Flask app context
+    app = create_app(args.config)
+
+    with app.app_context():
+        try:
+            success = args.func(args)
+            return 0 if success else 1
+        except KeyboardInterrupt:
+            print("\n⚠️  Operation cancelled by user")
+            return 1
+        except Exception as e:
+            print(f"❌ Unexpected error: {str(e)}")
+            if args.verbose:
+                import traceback
+                traceback.print_exc()
+            return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,20 +2,22 @@ from .user import User, UserExpertise, UserFollow
 from .location import Country, StateProvince, Location
 from .crop import Crop, Livestock, UserCrop
 from .post import Category, Tag, Post, Comment, CommentEdit, ArticlePostLike
-from .community import Community, CommunityMember, CommunityPost, PostLike, PostComment
+from .community import Community, CommunityMember, CommunityPost, PostLike, PostComment, CommunityDeletionJob
 from .expert import ExpertProfile, Consultation, ExpertReview
 from .article import Article
 from .payment import Payment, TransactionLog
 from .notifications import Notification, NotificationPreferences, NotificationDelivery
+from .timeline import HomeTimelineEntry
 
 __all__ = [
     "User", "UserExpertise", "UserFollow",
     "Country", "StateProvince", "Location", 
     "Crop", "Livestock", "UserCrop",
     "Category", "Tag", "Post", "Comment", "CommentEdit", "ArticlePostLike",
-    "Community", "CommunityMember", "CommunityPost", "PostLike", "PostComment",
+    "Community", "CommunityMember", "CommunityPost", "PostLike", "PostComment", "CommunityDeletionJob",
     "ExpertProfile", "Consultation", "ExpertReview",
     "Article",
     "Payment", "TransactionLog",
-    "Notification", "NotificationPreferences", "NotificationDelivery"
+    "Notification", "NotificationPreferences", "NotificationDelivery",
+    "HomeTimelineEntry"
 ]
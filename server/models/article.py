@@ -1,9 +1,10 @@
 from datetime import datetime
 import uuid
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, TSVECTOR
 
 from server.database import db
 from server.models.post import Tag
+from server.utils.search import search_vector_sql
 
 # Association table for article tags
 article_tags = db.Table('article_tags',
@@ -35,6 +36,12 @@ class Article(db.Model):
     read_time = db.Column(db.Integer)  # estimated read time in minutes
     is_featured = db.Column(db.Boolean, default=False)
     
+    # Full-text search document, maintained by PostgreSQL
+    search_vector = db.Column(
+        TSVECTOR,
+        db.Computed(search_vector_sql('title', 'content'), persisted=True)
+    )
+    
     # Timestamps
     published_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -45,6 +52,10 @@ class Article(db.Model):
     category = db.relationship('Category', backref=db.backref('articles', lazy=True))
     tags = db.relationship('Tag', secondary=article_tags, backref=db.backref('articles', lazy=True))
     
+    __table_args__ = (
+        db.Index('ix_articles_search_vector', 'search_vector', postgresql_using='gin'),
+    )
+    
     def to_dict(self):
         """Convert article to dictionary."""
         return {
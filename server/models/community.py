@@ -18,6 +18,10 @@ class Community(db.Model):
     image_url = db.Column(db.String(255), nullable=True)
     is_private = db.Column(db.Boolean, default=False)
     created_by = db.Column(UUID(as_uuid=True), db.ForeignKey('users.user_id'), nullable=False)
+    # Denormalized count of community_members rows, maintained by community_service
+    member_count = db.Column(db.Integer, default=0, nullable=False)
+    # Set while a background deletion job removes the community; hides it from every endpoint
+    deleting = db.Column(db.Boolean, default=False, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -38,6 +42,7 @@ class Community(db.Model):
             },
             'image_url': self.image_url,
             'is_private': self.is_private,
+            'member_count': self.member_count or 0,
             'created_by': str(self.created_by),
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
@@ -85,23 +90,40 @@ class CommunityPost(db.Model):
     community = db.relationship('Community', backref=db.backref('posts', lazy=True))
     user = db.relationship('User', backref=db.backref('community_posts', lazy=True))
     
-    def to_dict(self, include_likes=False, include_comments=False):
-        """Convert community post to dictionary."""
+    __table_args__ = (
+        # Backs community post listing and chunked community deletion
+        db.Index('ix_community_posts_community_created', 'community_id', 'created_at', 'post_id'),
+    )
+    
+    def to_dict(self, include_likes=False, include_comments=False, like_count=None, comment_count=None,
+                author=None):
+        """
+        Convert community post to dictionary.
+        
+        Counts and the author are queried when not supplied; list views should go through
+        community_service.serialize_posts, which resolves them for a whole page at once.
+        """
+        user = author if author is not None else self.user
+        if like_count is None:
+            like_count = PostLike.query.filter_by(post_id=self.post_id).count()
+        if comment_count is None:
+            comment_count = PostComment.query.filter_by(post_id=self.post_id).count()
+        
         post_dict = {
             'post_id': str(self.post_id),
             'community_id': str(self.community_id),
             'user': {
-                'user_id': str(self.user.user_id),
-                'name': f"{self.user.first_name} {self.user.last_name}",
-                'avatar_url': self.user.avatar_url,
-                'role': self.user.role
-            } if self.user else None,
+                'user_id': str(user.user_id),
+                'name': f"{user.first_name} {user.last_name}",
+                'avatar_url': user.avatar_url,
+                'role': user.role
+            } if user else None,
             'content': self.content,
             'image_url': self.image_url,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
-            'like_count': PostLike.query.filter_by(post_id=self.post_id).count(),
-            'comment_count': PostComment.query.filter_by(post_id=self.post_id).count()
+            'like_count': like_count,
+            'comment_count': comment_count
         }
         
         if include_likes:
@@ -155,6 +177,11 @@ class PostComment(db.Model):
     post = db.relationship('CommunityPost', backref=db.backref('comments', lazy=True))
     user = db.relationship('User', backref=db.backref('post_comments', lazy=True))
     
+    __table_args__ = (
+        # Backs comment listing and set-based deletes by post
+        db.Index('ix_post_comments_post_created', 'post_id', 'created_at'),
+    )
+    
     def to_dict(self):
         """Convert comment to dictionary."""
         return {
@@ -170,4 +197,37 @@ class PostComment(db.Model):
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
             'is_edited': self.created_at != self.updated_at
-        }
\ No newline at end of file
+        }
+
+
+class CommunityDeletionJob(db.Model):
+    """Progress record of a background deletion of a large community."""
+    __tablename__ = 'community_deletion_jobs'
+    
+    job_id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Not a foreign key: the community row is gone once the job completes
+    community_id = db.Column(UUID(as_uuid=True), nullable=False, index=True)
+    requested_by = db.Column(UUID(as_uuid=True), db.ForeignKey('users.user_id', ondelete='SET NULL'), nullable=True)
+    status = db.Column(db.String(20), default='queued', nullable=False)  # queued, running, completed, failed
+    total_posts = db.Column(db.Integer, default=0, nullable=False)
+    deleted_posts = db.Column(db.Integer, default=0, nullable=False)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = db.Column(db.DateTime, nullable=True)
+    
+    def to_dict(self):
+        """Convert deletion job to dictionary."""
+        return {
+            'job_id': str(self.job_id),
+            'community_id': str(self.community_id),
+            'status': self.status,
+            'total_posts': self.total_posts,
+            'deleted_posts': self.deleted_posts,
+            'progress': round(self.deleted_posts / self.total_posts, 4) if self.total_posts else (
+                1.0 if self.status == 'completed' else 0.0
+            ),
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
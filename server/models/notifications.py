@@ -22,6 +22,18 @@ class Notification(db.Model):
     read_at = db.Column(db.DateTime, nullable=True)
     expires_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # Worker lease used by the database-backed notification queue
+    lease_owner = db.Column(db.String(100), nullable=True)
+    leased_until = db.Column(db.DateTime(timezone=True), nullable=True)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    
+    __table_args__ = (
+        # Backs claiming due pending notifications lane by lane, oldest first
+        db.Index('ix_notifications_pending_claim', 'priority', 'created_at',
+                 postgresql_where=db.text("status = 'pending'")),
+        # Backs the scheduler's incremental refill of upcoming scheduled notifications
+        db.Index('ix_notifications_status_scheduled', 'status', 'scheduled_at'),
+    )
     
     # Relationships
     user = db.relationship('User', backref=db.backref('notifications', lazy=True))
@@ -1,8 +1,9 @@
 from datetime import datetime, timezone
 import uuid
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, TSVECTOR
 
 from server.database import db
+from server.utils.search import search_vector_sql
 
 class Category(db.Model):
     """Category model for posts."""
@@ -76,10 +77,28 @@ class Post(db.Model):
     # Post metadata
     status = db.Column(db.String(20), default='draft')  # draft, published, archived
     view_count = db.Column(db.Integer, default=0)
+    # Denormalized counters maintained by post_counter_service
+    comment_count = db.Column(db.Integer, default=0, nullable=False)
+    like_count = db.Column(db.Integer, default=0, nullable=False)
+    # Time-decayed engagement score refreshed in the background by trending_service
+    trending_score = db.Column(db.Float, default=0, nullable=False)
+    trending_updated_at = db.Column(db.DateTime(timezone=True), nullable=True)
+    # Last time views/likes/comments changed; lets trending refreshes skip idle posts
+    activity_at = db.Column(db.DateTime(timezone=True), server_default=db.func.now(), nullable=False)
+    # Set when the author had too many followers to fan the post out; timelines pull it at read time
+    timeline_pull = db.Column(db.Boolean, default=False, nullable=False)
+    # Set once the post has been written into follower timelines; NULL while a fan-out is pending
+    fanned_out_at = db.Column(db.DateTime(timezone=True), nullable=True)
     read_time = db.Column(db.Integer, nullable=True)
     is_featured = db.Column(db.Boolean, default=False)
     language = db.Column(db.String(10), default='en')
     
+    # Full-text search document, maintained by PostgreSQL
+    search_vector = db.Column(
+        TSVECTOR,
+        db.Computed(search_vector_sql('title', 'content', 'language'), persisted=True)
+    )
+    
     # Timestamps
     published_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -90,6 +109,23 @@ class Post(db.Model):
     category = db.relationship('Category', backref=db.backref('posts', lazy=True))
     tags = db.relationship('Tag', secondary=post_tags, backref=db.backref('posts', lazy=True))
     
+    __table_args__ = (
+        # Backs keyset pagination of the feed ordered by (published_at, post_id)
+        db.Index('ix_posts_status_published_at', 'status', 'published_at', 'post_id'),
+        # Backs sort_by=popularity now that like_count is a real column
+        db.Index('ix_posts_status_popularity', 'status', 'view_count', 'like_count', 'post_id'),
+        db.Index('ix_posts_search_vector', 'search_vector', postgresql_using='gin'),
+        # Backs sort_by=trending and the incremental trending refresh
+        db.Index('ix_posts_status_trending', 'status', 'trending_score', 'post_id'),
+        db.Index('ix_posts_activity_at', 'activity_at'),
+        # Backs the fan-out-on-read half of home timelines
+        db.Index('ix_posts_timeline_pull', 'author_id', 'published_at',
+                 postgresql_where=db.text('timeline_pull')),
+        # Backs the sweep re-running fan-outs lost to a restart
+        db.Index('ix_posts_pending_fan_out', 'published_at',
+                 postgresql_where=db.text("fanned_out_at IS NULL AND status = 'published'")),
+    )
+    
     def to_dict(self, include_content=True, **kwargs):
         author_info = { 'name': 'Unknown Author', 'avatar_url': None, 'role': None }
         if self.author:
@@ -122,8 +158,8 @@ class Post(db.Model):
             'applicable_locations': self.applicable_locations or [],
             'season_relevance': self.season_relevance,
             'view_count': self.view_count,
-            'comment_count': kwargs.get('comment_count', 0),
-            'like_count': kwargs.get('like_count', 0),
+            'comment_count': kwargs.get('comment_count', self.comment_count or 0),
+            'like_count': kwargs.get('like_count', self.like_count or 0),
             'published_at': self.published_at.isoformat() if self.published_at else None,
             'tags': [tag.name for tag in self.tags],
             'read_time': self.read_time
@@ -160,6 +196,11 @@ class Comment(db.Model):
     user = db.relationship('User', backref=db.backref('comments', lazy=True))
     parent_comment = db.relationship('Comment', remote_side=[comment_id], backref=db.backref('replies', lazy=True))
     
+    __table_args__ = (
+        # Backs keyset paging of top-level comments/replies and the reply-count recursive CTE
+        db.Index('ix_comments_post_parent_created', 'post_id', 'parent_comment_id', 'created_at', 'comment_id'),
+    )
+    
     def to_dict(self, include_replies=True):
         """Convert comment to dictionary with proper UTC timestamps."""
         comment_dict = {
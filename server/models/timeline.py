@@ -0,0 +1,25 @@
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import UUID
+from server.database import db
+
+
+class HomeTimelineEntry(db.Model):
+    """Precomputed entry of a user's following feed, written when a followed author publishes."""
+    __tablename__ = 'home_timeline_entries'
+
+    user_id = db.Column(UUID(as_uuid=True), db.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    post_id = db.Column(UUID(as_uuid=True), db.ForeignKey('posts.post_id', ondelete='CASCADE'), primary_key=True)
+    author_id = db.Column(UUID(as_uuid=True), nullable=False)
+    # Copied from the post so a timeline page is a single index range scan
+    published_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # Backs keyset pagination of a user's timeline on (published_at, post_id)
+        db.Index('ix_home_timeline_user_published', 'user_id', 'published_at', 'post_id'),
+        # Backs removing an author's posts from a timeline on unfollow
+        db.Index('ix_home_timeline_user_author', 'user_id', 'author_id'),
+    )
+
+    def __repr__(self):
+        return f'<HomeTimelineEntry {self.user_id} - {self.post_id}>'
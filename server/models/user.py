@@ -48,6 +48,10 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # Denormalized user_follows counts, maintained by follow_service
+    follower_count = db.Column(db.Integer, default=0, nullable=False)
+    following_count = db.Column(db.Integer, default=0, nullable=False)
+    
     def __init__(self, email, password, first_name, last_name, role, **kwargs):
         self.email = email
         self.password_hash = generate_password_hash(password)
@@ -83,7 +87,9 @@ class User(db.Model):
             'farming_type': self.farming_type,
             'is_verified': self.is_verified,
             'join_date': self.join_date.isoformat() if self.join_date else None,
-            'last_login': self.last_login.isoformat() if self.last_login else None
+            'last_login': self.last_login.isoformat() if self.last_login else None,
+            'follower_count': self.follower_count or 0,
+            'following_count': self.following_count or 0
         }
     
     def __repr__(self):
@@ -142,4 +148,9 @@ class UserFollow(db.Model):
     
     __table_args__ = (
         db.UniqueConstraint('follower_id', 'following_id', name='unique_follow'),
+        # Backs walking an author's followers in follow_id order (timeline fan-out)
+        db.Index('ix_user_follows_following_follow_id', 'following_id', 'follow_id'),
+        # Back keyset pagination of follower / following lists on (created_at, follow_id)
+        db.Index('ix_user_follows_following_created', 'following_id', 'created_at', 'follow_id'),
+        db.Index('ix_user_follows_follower_created', 'follower_id', 'created_at', 'follow_id'),
     )
\ No newline at end of file
@@ -1,7 +1,8 @@
 from flask import Blueprint
 from server.controllers.community_controller import (
     get_communities, create_community, get_community, 
-    update_community, delete_community, join_community,
+    update_community, delete_community, join_community, leave_community,
+    update_community_member, get_community_deletion_job,
     get_community_posts, create_community_post,
     get_community_post, update_community_post, delete_community_post,
     like_community_post, get_post_likes,
@@ -16,7 +17,10 @@ community_bp.route('', methods=['POST'])(create_community)
 community_bp.route('/<uuid:community_id>', methods=['GET'])(get_community)
 community_bp.route('/<uuid:community_id>', methods=['PUT'])(update_community)
 community_bp.route('/<uuid:community_id>', methods=['DELETE'])(delete_community)
+community_bp.route('/deletions/<uuid:job_id>', methods=['GET'])(get_community_deletion_job)
 community_bp.route('/<uuid:community_id>/join', methods=['POST'])(join_community)
+community_bp.route('/<uuid:community_id>/leave', methods=['POST'])(leave_community)
+community_bp.route('/<uuid:community_id>/members/<uuid:user_id>', methods=['PUT'])(update_community_member)
 
 # Community posts routes
 community_bp.route('/<uuid:community_id>/posts', methods=['GET'])(get_community_posts)
@@ -5,14 +5,22 @@ Follow routes for user follow system.
 from flask import Blueprint, request, jsonify
 
 from server.services.follow_service import follow_service
+from server.services.suggestion_service import suggestion_service
 from server.utils.auth import token_required
 from server.utils.validators import validate_uuid
 from server.utils.error_handlers import create_error_response, create_success_response
+from server.utils.pagination import parse_bool_arg
 
 
 follow_bp = Blueprint('follow', __name__, url_prefix='/api/follow')
 
 
+def _include_total_arg():
+    """include_total query flag; None lets the service pick its default for the paging mode."""
+    value = request.args.get('include_total')
+    return None if value is None else parse_bool_arg(value)
+
+
 @follow_bp.route('/users/<user_id>/follow', methods=['POST'])
 @token_required
 def follow_user(current_user, user_id):
@@ -105,11 +113,15 @@ def get_followers(current_user, user_id):
         result = follow_service.get_followers(
             user_id=user_id,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            cursor=request.args.get('cursor'),
+            include_total=_include_total_arg()
         )
         
         if result['success']:
             return create_success_response(data=result)
+        elif result.get('error') == 'invalid_cursor':
+            return create_error_response('INVALID_CURSOR', 'Invalid pagination cursor', details=result['message'], status_code=400)
         else:
             return create_error_response('GET_FOLLOWERS_FAILED', result.get('message', 'Failed to get followers'), status_code=400)
             
@@ -134,11 +146,15 @@ def get_following(current_user, user_id):
         result = follow_service.get_following(
             user_id=user_id,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            cursor=request.args.get('cursor'),
+            include_total=_include_total_arg()
         )
         
         if result['success']:
             return create_success_response(data=result)
+        elif result.get('error') == 'invalid_cursor':
+            return create_error_response('INVALID_CURSOR', 'Invalid pagination cursor', details=result['message'], status_code=400)
         else:
             return create_error_response('GET_FOLLOWING_FAILED', result.get('message', 'Failed to get following'), status_code=400)
             
@@ -228,6 +244,69 @@ def update_notification_preference(current_user, user_id):
         return create_error_response('INTERNAL_ERROR', f'Internal server error: {str(e)}', status_code=500)
 
 
+@follow_bp.route('/users/<user_id>/followed-by-following', methods=['GET'])
+@token_required
+def get_followed_by_following(current_user, user_id):
+    """Get followers of the specified user that the current user follows."""
+    try:
+        # Validate user ID
+        if not validate_uuid(user_id):
+            return create_error_response('INVALID_USER_ID', 'Invalid user ID format', status_code=400)
+        
+        limit = min(request.args.get('limit', 3, type=int), 100)
+        
+        result = follow_service.get_followed_by_following(
+            viewer_id=str(current_user.user_id),
+            user_id=user_id,
+            limit=limit
+        )
+        
+        if result['success']:
+            return create_success_response(data=result)
+        else:
+            return create_error_response('GET_FOLLOWED_BY_FAILED', result.get('message', 'Failed to get followers you follow'), status_code=400)
+            
+    except Exception as e:
+        return create_error_response('INTERNAL_ERROR', f'Internal server error: {str(e)}', status_code=500)
+
+
+@follow_bp.route('/my-mutuals', methods=['GET'])
+@token_required
+def get_my_mutuals(current_user):
+    """Get users the current user follows who follow them back."""
+    try:
+        limit = min(request.args.get('limit', 50, type=int), 100)
+        
+        result = follow_service.get_mutual_follows(str(current_user.user_id), limit=limit)
+        
+        if result['success']:
+            return create_success_response(data=result)
+        else:
+            return create_error_response('GET_MUTUALS_FAILED', result.get('message', 'Failed to get mutual follows'), status_code=400)
+            
+    except Exception as e:
+        return create_error_response('INTERNAL_ERROR', f'Internal server error: {str(e)}', status_code=500)
+
+
+@follow_bp.route('/suggestions', methods=['GET'])
+@token_required
+def get_suggestions(current_user):
+    """Get farmers and experts suggested for the current user to follow."""
+    try:
+        limit = min(request.args.get('limit', 20, type=int), 100)
+        refresh = parse_bool_arg(request.args.get('refresh'), default=False)
+        
+        result = suggestion_service.get_suggestions(str(current_user.user_id), limit=limit, refresh=refresh)
+        
+        if result['success']:
+            return create_success_response(data=result)
+        else:
+            return create_error_response('GET_SUGGESTIONS_FAILED', result.get('message', 'Failed to get suggestions'), status_code=400)
+            
+    except Exception as e:
+        return create_error_response('INTERNAL_ERROR', f'Internal server error: {str(e)}', status_code=500)
+
+
 @follow_bp.route('/my-followers', methods=['GET'])
 @token_required
 def get_my_followers(current_user):
@@ -243,11 +322,15 @@ def get_my_followers(current_user):
         result = follow_service.get_followers(
             user_id=current_user_id,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            cursor=request.args.get('cursor'),
+            include_total=_include_total_arg()
         )
         
         if result['success']:
             return create_success_response(data=result)
+        elif result.get('error') == 'invalid_cursor':
+            return create_error_response('INVALID_CURSOR', 'Invalid pagination cursor', details=result['message'], status_code=400)
         else:
             return create_error_response('GET_FOLLOWERS_FAILED', result.get('message', 'Failed to get followers'), status_code=400)
             
@@ -270,11 +353,15 @@ def get_my_following(current_user):
         result = follow_service.get_following(
             user_id=current_user_id,
             page=page,
-            per_page=per_page
+            per_page=per_page,
+            cursor=request.args.get('cursor'),
+            include_total=_include_total_arg()
         )
         
         if result['success']:
             return create_success_response(data=result)
+        elif result.get('error') == 'invalid_cursor':
+            return create_error_response('INVALID_CURSOR', 'Invalid pagination cursor', details=result['message'], status_code=400)
         else:
             return create_error_response('GET_FOLLOWING_FAILED', result.get('message', 'Failed to get following'), status_code=400)
             
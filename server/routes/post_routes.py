@@ -1,7 +1,8 @@
 from flask import Blueprint, request
 from server.controllers.post_controller import (
     get_posts, create_post, get_post, update_post, 
-    delete_post, add_comment, get_comments, toggle_like
+    delete_post, add_comment, get_comments, toggle_like,
+    get_following_feed
 )
 from server.utils.auth import get_current_user_optional
 
@@ -14,6 +15,7 @@ def get_posts_route():
     current_user = get_current_user_optional()
     return get_posts(current_user)
 post_bp.route('', methods=['POST'])(create_post)
+post_bp.route('/following', methods=['GET'])(get_following_feed)
 @post_bp.route('/<string:post_id>', methods=['GET'])
 def get_post_route(post_id):
     """Get single post with optional authentication for follow status."""
@@ -3,14 +3,21 @@ Comment service for managing comment edit/delete functionality with history trac
 """
 
 import logging
+import uuid
 from typing import List, Dict, Optional, Any
 from datetime import datetime, timedelta, timezone
 
+from sqlalchemy import func, literal, tuple_, Integer
+from sqlalchemy.orm import aliased, joinedload
+
 from server.database import db
 from server.models.post import Comment, CommentEdit
 from server.models.user import User
 from server.models.notifications import Notification
 from server.services.notification_service import notification_service
+from server.services.post_counter_service import post_counter_service
+from server.utils.response_cache import feed_cache
+from server.utils.pagination import encode_cursor, decode_cursor, InvalidCursorError
 
 
 class CommentService:
@@ -176,7 +183,9 @@ class CommentService:
                 self.logger.info(f"Comment {comment_id} soft deleted by user {user_id}")
                 message = 'Comment deleted successfully'
             
+            post_counter_service.adjust(comment.post_id, comments=-1)
             db.session.commit()
+            feed_cache.bump()
             
             # Send notification to post author if comment was deleted
             self._send_comment_delete_notification(comment, user_id)
@@ -237,7 +246,9 @@ class CommentService:
             setattr(comment, 'deleted_at', None)
             comment.updated_at = datetime.utcnow()
             
+            post_counter_service.adjust(comment.post_id, comments=1)
             db.session.commit()
+            feed_cache.bump()
             
             self.logger.info(f"Comment {comment_id} restored by user {user_id}")
             
@@ -421,6 +432,158 @@ class CommentService:
                 'error': 'get_comment_failed'
             }
     
+    def get_comment_tree(self, post_id, parent_id=None, cursor: str = None, limit: int = 20,
+                         replies_limit: int = 3) -> Dict[str, Any]:
+        """
+        Load one page of a post's comment tree in a fixed number of queries.
+        
+        Returns the comments directly under parent_id (top-level comments by default),
+        oldest first, each with its first replies_limit direct replies. Every comment
+        carries reply_count (all descendants) and has_more_replies; deeper levels are
+        loaded by calling again with parent_id set to the comment being expanded.
+        
+        Args:
+            post_id: ID of the post
+            parent_id: Comment whose replies to page through (None for top-level comments)
+            cursor: next_cursor returned with the previous page
+            limit: Number of comments per page
+            replies_limit: Number of direct replies to include under each comment
+            
+        Returns:
+            Dict with comments, next_cursor and has_next
+        """
+        try:
+            after = decode_cursor(cursor, 'comments', [datetime, uuid.UUID]) if cursor else None
+        except InvalidCursorError as e:
+            return {
+                'success': False,
+                'message': str(e),
+                'error': 'invalid_cursor'
+            }
+        
+        try:
+            # 1. The requested page, keyset paginated on (created_at, comment_id)
+            query = Comment.query.options(joinedload(Comment.user)).filter(Comment.post_id == post_id)
+            if parent_id is None:
+                query = query.filter(Comment.parent_comment_id.is_(None))
+            else:
+                query = query.filter(Comment.parent_comment_id == parent_id)
+            if after:
+                query = query.filter(tuple_(Comment.created_at, Comment.comment_id) > tuple(after))
+            
+            page = query.order_by(Comment.created_at.asc(), Comment.comment_id.asc()).limit(limit + 1).all()
+            has_next = len(page) > limit
+            page = page[:limit]
+            
+            if not page:
+                return {
+                    'success': True,
+                    'comments': [],
+                    'next_cursor': None,
+                    'has_next': False
+                }
+            
+            page_ids = [comment.comment_id for comment in page]
+            
+            # 2. The first replies_limit direct replies of every comment on the page
+            replies = []
+            if replies_limit > 0:
+                ranked = db.session.query(
+                    Comment.comment_id,
+                    func.row_number().over(
+                        partition_by=Comment.parent_comment_id,
+                        order_by=(Comment.created_at.asc(), Comment.comment_id.asc())
+                    ).label('position')
+                ).filter(
+                    Comment.post_id == post_id,
+                    Comment.parent_comment_id.in_(page_ids)
+                ).subquery()
+                
+                replies = Comment.query.options(
+                    joinedload(Comment.user)
+                ).join(
+                    ranked, ranked.c.comment_id == Comment.comment_id
+                ).filter(
+                    ranked.c.position <= replies_limit
+                ).order_by(Comment.created_at.asc(), Comment.comment_id.asc()).all()
+            
+            # 3. Reply counts for everything returned, in one recursive query
+            reply_counts = self._count_replies(post_id, page_ids + [reply.comment_id for reply in replies])
+            
+            replies_by_parent = {}
+            for reply in replies:
+                replies_by_parent.setdefault(reply.parent_comment_id, []).append(
+                    self._comment_tree_node(reply, reply_counts, [])
+                )
+            
+            comments = [
+                self._comment_tree_node(comment, reply_counts, replies_by_parent.get(comment.comment_id, []))
+                for comment in page
+            ]
+            
+            next_cursor = None
+            if has_next:
+                last = page[-1]
+                next_cursor = encode_cursor('comments', [last.created_at, last.comment_id])
+            
+            return {
+                'success': True,
+                'comments': comments,
+                'next_cursor': next_cursor,
+                'has_next': has_next
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error in get_comment_tree: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Failed to load comments: {str(e)}',
+                'error': 'get_comments_failed'
+            }
+    
+    def _count_replies(self, post_id, comment_ids: List[Any]) -> Dict[Any, Dict[str, int]]:
+        """
+        Count the descendants of each comment with a recursive CTE over parent_comment_id.
+        
+        Returns:
+            Dict mapping comment_id to {'total': all descendants, 'direct': direct replies}
+        """
+        seed = db.session.query(
+            Comment.comment_id.label('root_id'),
+            Comment.comment_id.label('comment_id'),
+            literal(0, type_=Integer).label('depth')
+        ).filter(Comment.comment_id.in_(comment_ids)).cte('reply_tree', recursive=True)
+        
+        child = aliased(Comment)
+        reply_tree = seed.union_all(
+            db.session.query(
+                seed.c.root_id,
+                child.comment_id,
+                seed.c.depth + 1
+            ).filter(
+                child.post_id == post_id,
+                child.parent_comment_id == seed.c.comment_id
+            )
+        )
+        
+        rows = db.session.query(
+            reply_tree.c.root_id,
+            func.count().label('total'),
+            func.count().filter(reply_tree.c.depth == 1).label('direct')
+        ).filter(reply_tree.c.depth > 0).group_by(reply_tree.c.root_id).all()
+        
+        return {row.root_id: {'total': row.total, 'direct': row.direct} for row in rows}
+    
+    def _comment_tree_node(self, comment: Comment, reply_counts: Dict[Any, Dict[str, int]],
+                           replies: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Serialize a comment for get_comment_tree with its reply preview and counts."""
+        counts = reply_counts.get(comment.comment_id, {})
+        comment_data = comment.to_dict(include_replies=False)
+        comment_data['replies'] = replies
+        comment_data['reply_count'] = counts.get('total', 0)
+        comment_data['has_more_replies'] = counts.get('direct', 0) > len(replies)
+        return comment_data
+    
     def _is_within_edit_time_limit(self, comment: Comment) -> bool:
         """Check if comment is within the edit time limit."""
         if not comment.created_at:
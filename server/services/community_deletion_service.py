@@ -0,0 +1,292 @@
+"""
+Community deletion service.
+
+Community posts, their likes and their comments are removed with set-based
+DELETE ... WHERE post_id IN (...) statements instead of row by row. Communities
+with more than sync_max_posts posts are deleted by a background job, a chunk of
+posts per transaction, whose progress is recorded in community_deletion_jobs.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import delete, func, select, update
+
+from server.database import db
+from server.models.community import (
+    Community, CommunityMember, CommunityPost, PostLike, PostComment, CommunityDeletionJob
+)
+from server.services.community_service import community_service
+
+
+class CommunityDeletionService:
+    """Service deleting communities and community posts with set-based statements."""
+
+    def __init__(self, sync_max_posts=1000, batch_size=500):
+        self.sync_max_posts = sync_max_posts
+        self.batch_size = batch_size
+        self.app = None
+        self.run_async = True
+        self.running = False
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._jobs = queue.Queue()
+        self._thread = None
+
+    def init_app(self, app):
+        """Bind the service to an app and start the background deletion worker."""
+        if self.running:
+            return
+
+        self.app = app
+        self.sync_max_posts = app.config.get('COMMUNITY_DELETE_SYNC_MAX_POSTS', self.sync_max_posts)
+        self.batch_size = app.config.get('COMMUNITY_DELETE_BATCH_SIZE', self.batch_size)
+        self.run_async = app.config.get('COMMUNITY_DELETE_ASYNC', True)
+        if not self.run_async:
+            return
+
+        self.running = True
+        self._thread = threading.Thread(
+            target=self._worker,
+            name="CommunityDeletion",
+            daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+        self.logger.info("Community deletion worker started")
+
+    def stop(self):
+        """Stop the deletion worker; an interrupted job resumes on the next start."""
+        if not self.running:
+            return
+        self.running = False
+        self._jobs.put(None)
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=10)
+
+    def delete_posts(self, post_ids: List[Any]) -> int:
+        """
+        Delete community posts together with their likes and comments.
+
+        Runs inside the caller's transaction.
+
+        Args:
+            post_ids: IDs of the posts to delete
+
+        Returns:
+            Number of posts deleted
+        """
+        if not post_ids:
+            return 0
+
+        db.session.execute(delete(PostLike).where(PostLike.post_id.in_(post_ids)))
+        db.session.execute(delete(PostComment).where(PostComment.post_id.in_(post_ids)))
+        result = db.session.execute(
+            delete(CommunityPost).where(CommunityPost.post_id.in_(post_ids))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount or 0
+
+    def delete_community(self, community_id, requested_by=None) -> Dict[str, Any]:
+        """
+        Delete a community with its members, posts, likes and comments.
+
+        Small communities are deleted in one transaction of set-based statements.
+        Larger ones are hidden immediately and handed to the background worker.
+
+        Args:
+            community_id: ID of the community to delete
+            requested_by: ID of the user requesting the deletion
+
+        Returns:
+            Dict with success status; 'job' holds the deletion job when run in the background
+        """
+        try:
+            community = Community.query.get(community_id)
+            if not community:
+                return {
+                    'success': False,
+                    'message': 'Community not found',
+                    'error': 'community_not_found'
+                }
+
+            if community.deleting:
+                # Already being deleted: report the job, retrying it if it failed
+                job = CommunityDeletionJob.query.filter_by(community_id=community_id).order_by(
+                    CommunityDeletionJob.created_at.desc()
+                ).first()
+                if job and job.status == 'failed':
+                    job.status = 'queued'
+                    job.error = None
+                    db.session.commit()
+                    self._enqueue(job.job_id)
+                return {
+                    'success': True,
+                    'message': 'Community deletion in progress',
+                    'job': job.to_dict() if job else None
+                }
+
+            total_posts = db.session.query(func.count(CommunityPost.post_id)).filter(
+                CommunityPost.community_id == community_id
+            ).scalar()
+
+            if self.run_async and self.running and total_posts > self.sync_max_posts:
+                community.deleting = True
+                job = CommunityDeletionJob(
+                    community_id=community_id,
+                    requested_by=requested_by,
+                    total_posts=total_posts
+                )
+                db.session.add(job)
+                db.session.commit()
+                community_service.invalidate_access(community_id)
+
+                self._enqueue(job.job_id)
+                return {
+                    'success': True,
+                    'message': 'Community deletion started',
+                    'job': job.to_dict()
+                }
+
+            post_ids = select(CommunityPost.post_id).where(
+                CommunityPost.community_id == community_id
+            ).scalar_subquery()
+            db.session.execute(delete(PostLike).where(PostLike.post_id.in_(post_ids)))
+            db.session.execute(delete(PostComment).where(PostComment.post_id.in_(post_ids)))
+            db.session.execute(delete(CommunityPost).where(CommunityPost.community_id == community_id))
+            self._delete_community_row(community_id)
+            db.session.commit()
+            community_service.invalidate_access(community_id)
+
+            return {
+                'success': True,
+                'message': 'Community and all related data deleted successfully',
+                'deleted_posts': total_posts
+            }
+
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Error deleting community {community_id}: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Failed to delete community: {str(e)}',
+                'error': 'delete_community_failed'
+            }
+
+    def run_job(self, job_id) -> Dict[str, Any]:
+        """
+        Run (or resume) a deletion job, committing after every chunk of posts.
+
+        Each chunk only deletes rows that still exist, so a job interrupted by a
+        restart, or picked up by two workers, converges to the same result.
+        """
+        job = CommunityDeletionJob.query.get(job_id)
+        if not job or job.status == 'completed':
+            return {'success': True, 'message': 'Nothing to do'}
+
+        try:
+            job.status = 'running'
+            db.session.commit()
+
+            while True:
+                post_ids = db.session.scalars(
+                    select(CommunityPost.post_id)
+                    .where(CommunityPost.community_id == job.community_id)
+                    .limit(self.batch_size)
+                ).all()
+                if not post_ids:
+                    break
+
+                deleted = self.delete_posts(post_ids)
+                db.session.execute(
+                    update(CommunityDeletionJob)
+                    .where(CommunityDeletionJob.job_id == job.job_id)
+                    .values(
+                        deleted_posts=CommunityDeletionJob.deleted_posts + deleted,
+                        updated_at=datetime.utcnow()
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+
+            self._delete_community_row(job.community_id)
+            db.session.refresh(job)
+            job.status = 'completed'
+            job.completed_at = datetime.utcnow()
+            db.session.commit()
+            community_service.invalidate_access(job.community_id)
+
+            self.logger.info(f"Deleted community {job.community_id} ({job.deleted_posts} posts)")
+            return {'success': True, 'message': 'Community deleted', 'job': job.to_dict()}
+
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Community deletion job {job_id} failed: {str(e)}")
+            CommunityDeletionJob.query.filter_by(job_id=job_id).update(
+                {'status': 'failed', 'error': str(e)}, synchronize_session=False
+            )
+            db.session.commit()
+            return {
+                'success': False,
+                'message': f'Community deletion failed: {str(e)}',
+                'error': 'deletion_job_failed'
+            }
+
+    def _enqueue(self, job_id):
+        """Hand a job to the background worker, or run it inline when there is none."""
+        if self.run_async and self.running:
+            self._jobs.put(str(job_id))
+        else:
+            self.run_job(job_id)
+
+    def get_job(self, job_id):
+        """Return a deletion job, or None if it does not exist."""
+        return CommunityDeletionJob.query.get(job_id)
+
+    def _delete_community_row(self, community_id):
+        """Delete a community's members and the community itself. Caller commits."""
+        db.session.execute(delete(CommunityMember).where(CommunityMember.community_id == community_id))
+        db.session.execute(
+            delete(Community).where(Community.community_id == community_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    def _worker(self):
+        """Background thread running queued deletion jobs."""
+        # Resume jobs left unfinished by a previous process
+        try:
+            with self.app.app_context():
+                try:
+                    pending = db.session.scalars(
+                        select(CommunityDeletionJob.job_id)
+                        .where(CommunityDeletionJob.status.in_(['queued', 'running']))
+                    ).all()
+                finally:
+                    db.session.remove()
+            for job_id in pending:
+                self._jobs.put(str(job_id))
+        except Exception as e:
+            self.logger.error(f"Could not load pending community deletion jobs: {str(e)}")
+
+        while True:
+            job_id = self._jobs.get()
+            if job_id is None:
+                break
+            try:
+                with self.app.app_context():
+                    try:
+                        self.run_job(job_id)
+                    finally:
+                        db.session.remove()
+            except Exception as e:
+                self.logger.error(f"Community deletion error for job {job_id}: {str(e)}")
+            finally:
+                self._jobs.task_done()
+
+
+# Global community deletion service instance
+community_deletion_service = CommunityDeletionService()
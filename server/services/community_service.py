@@ -0,0 +1,366 @@
+"""
+Community service for membership bookkeeping, authorization lookups and post
+serialization shared by the community endpoints.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from flask import current_app, g, has_app_context, has_request_context
+from sqlalchemy import and_, func, update
+from sqlalchemy.orm import joinedload
+
+from server.database import db
+from server.models.community import Community, CommunityMember, CommunityPost, PostLike, PostComment
+from server.models.user import User
+
+
+@dataclass(frozen=True)
+class CommunityAccess:
+    """A user's standing in a community, as needed for authorization checks."""
+    exists: bool
+    is_private: bool = False
+    role: Optional[str] = None
+    status: Optional[str] = None
+
+    @property
+    def is_member(self) -> bool:
+        """Whether the user has a membership row (in any status)."""
+        return self.role is not None
+
+    @property
+    def is_active_member(self) -> bool:
+        return self.status == 'active'
+
+    @property
+    def is_banned(self) -> bool:
+        return self.status == 'banned'
+
+    @property
+    def can_view(self) -> bool:
+        """Whether the user may read and like posts: not banned, and an active member of private communities."""
+        if self.is_banned:
+            return False
+        return self.is_active_member or not self.is_private
+
+    @property
+    def is_admin_or_mod(self) -> bool:
+        return self.role in ('admin', 'moderator')
+
+
+class CommunityService:
+    """Service for community membership, authorization lookups and batched post serialization."""
+
+    # Bound on cached (community, user) lookups held per process
+    MAX_ACCESS_ENTRIES = 10000
+    # Content length kept by the compact post representation
+    COMPACT_CONTENT_LENGTH = 280
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._access_cache = OrderedDict()  # (community_id, user_id) -> (expires_at, CommunityAccess)
+        self._access_lock = threading.Lock()
+
+    def get_access(self, community_id, user_id) -> CommunityAccess:
+        """
+        Look up whether a community exists, its privacy and the user's role/status in it.
+
+        Both are fetched with one LEFT JOIN and memoized for the rest of the request
+        (flask.g) and for COMMUNITY_ACCESS_CACHE_TTL seconds in a process-wide cache.
+        Membership writes on this process invalidate immediately; other workers
+        converge within the TTL.
+
+        Args:
+            community_id: ID of the community
+            user_id: ID of the user being authorized
+
+        Returns:
+            CommunityAccess for the pair
+        """
+        key = (str(community_id), str(user_id))
+
+        request_cache = None
+        if has_request_context():
+            request_cache = g.setdefault('community_access', {})
+            if key in request_cache:
+                return request_cache[key]
+
+        ttl = current_app.config.get('COMMUNITY_ACCESS_CACHE_TTL', 30) if has_app_context() else 0
+        access = None
+        if ttl > 0:
+            with self._access_lock:
+                entry = self._access_cache.get(key)
+                if entry and entry[0] > time.monotonic():
+                    self._access_cache.move_to_end(key)
+                    access = entry[1]
+
+        if access is None:
+            access = self._load_access(community_id, user_id)
+            if ttl > 0:
+                with self._access_lock:
+                    self._access_cache[key] = (time.monotonic() + ttl, access)
+                    self._access_cache.move_to_end(key)
+                    while len(self._access_cache) > self.MAX_ACCESS_ENTRIES:
+                        self._access_cache.popitem(last=False)
+
+        if request_cache is not None:
+            request_cache[key] = access
+        return access
+
+    def _load_access(self, community_id, user_id) -> CommunityAccess:
+        """Fetch the community's privacy and the user's membership in one query."""
+        row = db.session.query(
+            Community.is_private,
+            Community.deleting,
+            CommunityMember.role,
+            CommunityMember.status
+        ).outerjoin(
+            CommunityMember,
+            and_(
+                CommunityMember.community_id == Community.community_id,
+                CommunityMember.user_id == user_id
+            )
+        ).filter(Community.community_id == community_id).first()
+
+        if row is None or row.deleting:
+            return CommunityAccess(exists=False)
+        return CommunityAccess(
+            exists=True,
+            is_private=bool(row.is_private),
+            role=row.role,
+            status=row.status
+        )
+
+    def invalidate_access(self, community_id, user_id=None):
+        """
+        Drop cached access for one member, or for every user of a community when
+        user_id is omitted (privacy changes, deletion). Call after committing a
+        membership write so a concurrent request cannot re-cache the old row.
+        """
+        community_key = str(community_id)
+        user_key = str(user_id) if user_id is not None else None
+
+        def matches(key):
+            return key[0] == community_key and (user_key is None or key[1] == user_key)
+
+        with self._access_lock:
+            for key in [key for key in self._access_cache if matches(key)]:
+                del self._access_cache[key]
+
+        if has_request_context():
+            request_cache = g.get('community_access')
+            if request_cache:
+                for key in [key for key in request_cache if matches(key)]:
+                    del request_cache[key]
+
+    def clear_access_cache(self):
+        """Drop all cached access lookups."""
+        with self._access_lock:
+            self._access_cache.clear()
+
+    def update_member(self, community_id, user_id, role: Optional[str] = None,
+                      status: Optional[str] = None) -> Optional[CommunityMember]:
+        """
+        Change a member's role and/or status (e.g. promote, approve, ban).
+
+        Banned members are not counted in member_count, so moving into or out of
+        'banned' adjusts it. Runs inside the caller's transaction; call
+        invalidate_access after committing.
+
+        Returns:
+            The updated CommunityMember, or None if the user is not a member
+        """
+        member = CommunityMember.query.filter_by(community_id=community_id, user_id=user_id).first()
+        if not member:
+            return None
+
+        if role is not None:
+            member.role = role
+        if status is not None and status != member.status:
+            if status == 'banned':
+                self.adjust_member_count(community_id, -1)
+            elif member.status == 'banned':
+                self.adjust_member_count(community_id, 1)
+            member.status = status
+
+        return member
+
+    def adjust_member_count(self, community_id, delta: int) -> Optional[int]:
+        """
+        Atomically shift a community's member_count.
+
+        Runs inside the caller's transaction so the counter commits (or rolls back)
+        together with the membership row it mirrors.
+
+        Args:
+            community_id: ID of the community
+            delta: Change to apply to member_count
+
+        Returns:
+            The new member_count, or None if the community does not exist
+        """
+        row = db.session.execute(
+            update(Community).where(Community.community_id == community_id).values(
+                member_count=func.greatest(Community.member_count + delta, 0),
+                # Membership changes are not edits of the community itself
+                updated_at=Community.updated_at
+            ).returning(Community.member_count)
+            .execution_options(synchronize_session=False)
+        ).first()
+        return row.member_count if row else None
+
+    def reconcile_member_counts(self, community_ids: Optional[List[Any]] = None,
+                                batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Recompute member counts from community_members and repair any drift.
+
+        Args:
+            community_ids: Restrict the run to these communities (default: all communities)
+            batch_size: Number of communities to recompute per statement
+
+        Returns:
+            Dict with the number of communities checked and repaired
+        """
+        member_count_sq = db.session.query(
+            func.count(CommunityMember.user_id)
+        ).filter(
+            CommunityMember.community_id == Community.community_id,
+            CommunityMember.status != 'banned'
+        ).scalar_subquery()
+
+        if community_ids is None:
+            community_ids = [row.community_id for row in db.session.query(Community.community_id).all()]
+
+        checked = 0
+        repaired = 0
+        try:
+            for i in range(0, len(community_ids), batch_size):
+                batch = community_ids[i:i + batch_size]
+                result = db.session.execute(
+                    update(Community).where(
+                        Community.community_id.in_(batch),
+                        Community.member_count != member_count_sq
+                    ).values(
+                        member_count=member_count_sq,
+                        updated_at=Community.updated_at
+                    ).execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+                checked += len(batch)
+                repaired += result.rowcount or 0
+
+            self.logger.info(f"Reconciled community member counts: {repaired} of {checked} communities repaired")
+            return {'checked': checked, 'repaired': repaired}
+
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Error in reconcile_member_counts: {str(e)}")
+            raise
+
+    def serialize_posts(self, posts: List[CommunityPost], viewer_id=None,
+                        include_comments: bool = False, compact: bool = False) -> List[Dict[str, Any]]:
+        """
+        Serialize a page of community posts in a fixed number of queries.
+
+        Like counts, comment counts, the viewer's likes and the authors are each
+        resolved with one grouped/IN query for the whole page instead of per post.
+
+        Args:
+            posts: Community posts to serialize
+            viewer_id: ID of the requesting user, used for user_has_liked
+            include_comments: Also embed each post's comments (one extra query)
+            compact: Use the list representation: author snapshot, counts and
+                content truncated to COMPACT_CONTENT_LENGTH characters
+
+        Returns:
+            List of post dicts in the order given
+        """
+        if not posts:
+            return []
+
+        post_ids = [post.post_id for post in posts]
+
+        like_counts = dict(
+            db.session.query(PostLike.post_id, func.count())
+            .filter(PostLike.post_id.in_(post_ids))
+            .group_by(PostLike.post_id).all()
+        )
+        comment_counts = dict(
+            db.session.query(PostComment.post_id, func.count())
+            .filter(PostComment.post_id.in_(post_ids))
+            .group_by(PostComment.post_id).all()
+        )
+
+        liked_ids = set()
+        if viewer_id:
+            liked_ids = {
+                row.post_id for row in db.session.query(PostLike.post_id).filter(
+                    PostLike.post_id.in_(post_ids),
+                    PostLike.user_id == viewer_id
+                ).all()
+            }
+
+        authors = {
+            user.user_id: user
+            for user in User.query.filter(User.user_id.in_({post.user_id for post in posts})).all()
+        }
+
+        comments_by_post = {}
+        if include_comments:
+            comments = PostComment.query.options(joinedload(PostComment.user)).filter(
+                PostComment.post_id.in_(post_ids)
+            ).order_by(PostComment.created_at, PostComment.comment_id).all()
+            for comment in comments:
+                comments_by_post.setdefault(comment.post_id, []).append(comment.to_dict())
+
+        serialized = []
+        for post in posts:
+            if compact:
+                post_dict = self._compact_post_dict(
+                    post,
+                    like_count=like_counts.get(post.post_id, 0),
+                    comment_count=comment_counts.get(post.post_id, 0),
+                    author=authors.get(post.user_id)
+                )
+            else:
+                post_dict = post.to_dict(
+                    like_count=like_counts.get(post.post_id, 0),
+                    comment_count=comment_counts.get(post.post_id, 0),
+                    author=authors.get(post.user_id)
+                )
+            if viewer_id:
+                post_dict['user_has_liked'] = post.post_id in liked_ids
+            if include_comments:
+                post_dict['comments'] = comments_by_post.get(post.post_id, [])
+            serialized.append(post_dict)
+
+        return serialized
+
+    def _compact_post_dict(self, post: CommunityPost, like_count: int, comment_count: int,
+                           author: Optional[User]) -> Dict[str, Any]:
+        """List representation of a community post."""
+        content = post.content or ''
+        truncated = len(content) > self.COMPACT_CONTENT_LENGTH
+        return {
+            'post_id': str(post.post_id),
+            'community_id': str(post.community_id),
+            'user': {
+                'user_id': str(author.user_id),
+                'name': f"{author.first_name} {author.last_name}",
+                'avatar_url': author.avatar_url
+            } if author else None,
+            'content': content[:self.COMPACT_CONTENT_LENGTH].rstrip() + '…' if truncated else content,
+            'content_truncated': truncated,
+            'image_url': post.image_url,
+            'created_at': post.created_at.isoformat(),
+            'like_count': like_count,
+            'comment_count': comment_count
+        }
+
+
+# Global community service instance
+community_service = CommunityService()
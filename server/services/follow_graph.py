@@ -0,0 +1,339 @@
+"""
+In-memory follow graph for two-hop follow queries.
+
+Every user seen in user_follows gets a dense integer id, and the graph keeps,
+per integer id, a sorted array('i') of the users they follow and of their
+followers. Mutual follows and "followed by people you follow" are then sorted
+array intersections, and second-degree suggestions a count over the arrays of
+the people a user follows, instead of self-joins on user_follows.
+
+The graph is built from the database on first use (and in the background at
+worker start), updated in place by follow_service after each follow/unfollow
+commit, and rebuilt every refresh_interval seconds so follows made on other
+workers show up.
+"""
+
+import atexit
+import logging
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from server.database import db
+from server.models.user import UserFollow
+
+
+_EMPTY = array('i')
+
+
+def _intersect(a, b) -> List[int]:
+    """Intersect two sorted integer arrays."""
+    if len(a) > len(b):
+        a, b = b, a
+    if not a:
+        return []
+
+    result = []
+    if len(b) > 8 * len(a):
+        # Very unequal sizes: binary search the short side into the long one
+        lo = 0
+        for value in a:
+            lo = bisect_left(b, value, lo)
+            if lo == len(b):
+                break
+            if b[lo] == value:
+                result.append(value)
+        return result
+
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i] == b[j]:
+            result.append(a[i])
+            i += 1
+            j += 1
+        elif a[i] < b[j]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def _insert_sorted(arr, value) -> bool:
+    """Insert value into a sorted array unless present. Returns True if inserted."""
+    pos = bisect_left(arr, value)
+    if pos < len(arr) and arr[pos] == value:
+        return False
+    arr.insert(pos, value)
+    return True
+
+
+def _remove_sorted(arr, value) -> bool:
+    """Remove value from a sorted array if present. Returns True if removed."""
+    pos = bisect_left(arr, value)
+    if pos < len(arr) and arr[pos] == value:
+        del arr[pos]
+        return True
+    return False
+
+
+class FollowGraph:
+    """Compact adjacency index of user_follows kept in process memory."""
+
+    def __init__(self, refresh_interval=600, load_chunk_size=10000):
+        self.refresh_interval = refresh_interval
+        self.load_chunk_size = load_chunk_size
+        self.app = None
+        self.running = False
+        self.loaded = False
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._lock = threading.Lock()
+        self._build_lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        # Edge events seen while a rebuild is reading the table, replayed onto the new graph
+        self._replay = None
+        self._reset()
+
+    def _reset(self):
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._following: List[array] = []
+        self._followers: List[array] = []
+        self.edge_count = 0
+
+    def init_app(self, app):
+        """Bind the graph to an app, dropping any graph built for a previous app."""
+        with self._lock:
+            self._reset()
+            self.loaded = False
+
+        self.app = app
+        self.refresh_interval = app.config.get('FOLLOW_GRAPH_REFRESH_INTERVAL', self.refresh_interval)
+        self.load_chunk_size = app.config.get('FOLLOW_GRAPH_LOAD_CHUNK_SIZE', self.load_chunk_size)
+        if self.running or not self.refresh_interval:
+            return
+
+        self.running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._worker,
+            name="FollowGraph",
+            daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+        self.logger.info(f"Follow graph loader started (rebuild every {self.refresh_interval}s)")
+
+    def stop(self):
+        """Stop the periodic rebuild."""
+        if not self.running:
+            return
+        self.running = False
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def rebuild(self) -> Dict[str, int]:
+        """
+        Rebuild the graph from user_follows.
+
+        Rows are streamed on a dedicated connection; the new graph is swapped in
+        under the lock once built, after replaying follow events that happened
+        while it was being read.
+
+        Returns:
+            Dict with the number of users and edges loaded
+        """
+        with self._build_lock:
+            with self._lock:
+                self._replay = []
+
+            try:
+                ids: List[str] = []
+                index: Dict[str, int] = {}
+                following: List[array] = []
+                followers: List[array] = []
+
+                def intern(user_id):
+                    key = str(user_id)
+                    node = index.get(key)
+                    if node is None:
+                        node = index[key] = len(ids)
+                        ids.append(key)
+                        following.append(array('i'))
+                        followers.append(array('i'))
+                    return node
+
+                edges = 0
+                rows = select(UserFollow.follower_id, UserFollow.following_id)
+                with db.engine.connect() as stream_conn:
+                    result = stream_conn.execution_options(yield_per=self.load_chunk_size).execute(rows)
+                    for partition in result.partitions():
+                        for follower_id, following_id in partition:
+                            a = intern(follower_id)
+                            b = intern(following_id)
+                            following[a].append(b)
+                            followers[b].append(a)
+                            edges += 1
+
+                following = [array('i', sorted(arr)) for arr in following]
+                followers = [array('i', sorted(arr)) for arr in followers]
+
+                with self._lock:
+                    self._ids, self._index = ids, index
+                    self._following, self._followers = following, followers
+                    self.edge_count = edges
+                    for added, follower_id, following_id in self._replay:
+                        self._apply(added, follower_id, following_id)
+                    self.loaded = True
+
+                self.logger.info(f"Follow graph loaded: {len(ids)} users, {self.edge_count} edges")
+                return {'users': len(ids), 'edges': self.edge_count}
+
+            finally:
+                with self._lock:
+                    self._replay = None
+
+    def ensure_loaded(self):
+        """Build the graph now if it has not been built for this app yet."""
+        if self.loaded:
+            return
+        with self._build_lock:
+            if not self.loaded:
+                self.rebuild()
+
+    def add_edge(self, follower_id, following_id):
+        """Record a committed follow."""
+        self._record(True, str(follower_id), str(following_id))
+
+    def remove_edge(self, follower_id, following_id):
+        """Record a committed unfollow."""
+        self._record(False, str(follower_id), str(following_id))
+
+    def remove_user(self, user_id):
+        """Drop every edge from and to a deleted user."""
+        user_id = str(user_id)
+        with self._lock:
+            node = self._index.get(user_id)
+            if node is None:
+                return
+            edges = [(user_id, self._ids[other]) for other in self._following[node]]
+            edges += [(self._ids[other], user_id) for other in self._followers[node]]
+        for follower_id, following_id in edges:
+            self._record(False, follower_id, following_id)
+
+    def _record(self, added: bool, follower_id: str, following_id: str):
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((added, follower_id, following_id))
+            if self.loaded:
+                self._apply(added, follower_id, following_id)
+
+    def _apply(self, added: bool, follower_id: str, following_id: str):
+        """Apply one edge change. Caller holds the lock."""
+        if added:
+            a = self._intern(follower_id)
+            b = self._intern(following_id)
+            if _insert_sorted(self._following[a], b):
+                _insert_sorted(self._followers[b], a)
+                self.edge_count += 1
+        else:
+            a = self._index.get(follower_id)
+            b = self._index.get(following_id)
+            if a is None or b is None:
+                return
+            if _remove_sorted(self._following[a], b):
+                _remove_sorted(self._followers[b], a)
+                self.edge_count -= 1
+
+    def _intern(self, user_id: str) -> int:
+        node = self._index.get(user_id)
+        if node is None:
+            node = self._index[user_id] = len(self._ids)
+            self._ids.append(user_id)
+            self._following.append(array('i'))
+            self._followers.append(array('i'))
+        return node
+
+    def _neighbours(self, user_id, adjacency: List[array]) -> array:
+        node = self._index.get(str(user_id))
+        return _EMPTY if node is None else adjacency[node]
+
+    def following(self, user_id) -> List[str]:
+        """Users that user_id follows."""
+        self.ensure_loaded()
+        with self._lock:
+            return [self._ids[node] for node in self._neighbours(user_id, self._following)]
+
+    def mutual_follows(self, user_id) -> List[str]:
+        """Users that user_id follows and who follow user_id back."""
+        self.ensure_loaded()
+        with self._lock:
+            nodes = _intersect(
+                self._neighbours(user_id, self._following),
+                self._neighbours(user_id, self._followers)
+            )
+            return [self._ids[node] for node in nodes]
+
+    def followed_by_following(self, viewer_id, target_id) -> List[str]:
+        """Followers of target_id that viewer_id follows."""
+        self.ensure_loaded()
+        with self._lock:
+            nodes = _intersect(
+                self._neighbours(viewer_id, self._following),
+                self._neighbours(target_id, self._followers)
+            )
+            return [self._ids[node] for node in nodes]
+
+    def second_degree(self, user_id, limit: Optional[int] = None,
+                      max_hub_following: int = 5000) -> List[Tuple[str, int]]:
+        """
+        Users followed by the people user_id follows, with the number of such paths.
+
+        Excludes user_id and users it already follows. People following more than
+        max_hub_following users are skipped; they say little about any one of them.
+
+        Returns:
+            (user_id, path count) pairs, most paths first
+        """
+        self.ensure_loaded()
+        with self._lock:
+            node = self._index.get(str(user_id))
+            if node is None:
+                return []
+            direct = self._following[node]
+            counts = Counter()
+            for friend in direct:
+                friend_following = self._following[friend]
+                if len(friend_following) <= max_hub_following:
+                    counts.update(friend_following)
+
+            counts.pop(node, None)
+            for followed in direct:
+                counts.pop(followed, None)
+
+            ranked = counts.most_common(limit)
+            return [(self._ids[other], paths) for other, paths in ranked]
+
+    def _worker(self):
+        """Background thread building the graph at start and rebuilding it periodically."""
+        while True:
+            try:
+                with self.app.app_context():
+                    try:
+                        self.rebuild()
+                    finally:
+                        db.session.remove()
+            except Exception as e:
+                self.logger.error(f"Follow graph rebuild error: {str(e)}")
+            if self._stop_event.wait(self.refresh_interval):
+                break
+
+
+# Global follow graph instance
+follow_graph = FollowGraph()
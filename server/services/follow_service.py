@@ -2,22 +2,68 @@
 User follow service for managing follow relationships and notifications.
 """
 
+import atexit
 import logging
-from typing import List, Dict, Optional, Any
+import queue
+import threading
+import uuid
+from typing import List, Dict, Optional, Any, Iterable, Set
 from datetime import datetime
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.exc import IntegrityError
 
 from server.database import db
 from server.models.user import User, UserFollow
 from server.models.notifications import Notification
 from server.services.notification_service import notification_service
+from server.services.notification_queue import notification_queue
+from server.services.timeline_service import timeline_service
+from server.services.follow_graph import follow_graph
+from server.utils.pagination import keyset_page, InvalidCursorError
 
 
 class FollowService:
     """Service for managing user follow relationships."""
     
-    def __init__(self):
+    def __init__(self, notify_chunk_size=2000):
+        self.notify_chunk_size = notify_chunk_size
+        self.app = None
+        self.run_async = True
+        self.running = False
         self.logger = logging.getLogger(self.__class__.__name__)
+        
+        self._jobs = queue.Queue()
+        self._thread = None
+    
+    def init_app(self, app):
+        """Bind the service to an app and start the follower notification fan-out worker."""
+        if self.running:
+            return
+        
+        self.app = app
+        self.notify_chunk_size = app.config.get('FOLLOWER_NOTIFY_CHUNK_SIZE', self.notify_chunk_size)
+        self.run_async = app.config.get('FOLLOWER_NOTIFY_ASYNC', True)
+        if not self.run_async:
+            return
+        
+        self.running = True
+        self._thread = threading.Thread(
+            target=self._worker,
+            name="FollowerNotifications",
+            daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+        self.logger.info("Follower notification worker started")
+    
+    def stop(self):
+        """Stop the fan-out worker after it finishes the queued jobs."""
+        if not self.running:
+            return
+        self.running = False
+        self._jobs.put(None)
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=10)
     
     def follow_user(self, follower_id: str, following_id: str, notification_enabled: bool = True) -> Dict[str, Any]:
         """
@@ -79,7 +125,13 @@ class FollowService:
             )
             
             db.session.add(follow)
+            db.session.flush()
+            self._adjust_follow_counts(follower_id, following_id, 1)
             db.session.commit()
+            follow_graph.add_edge(follower_id, following_id)
+            
+            # Seed the follower's home timeline with the author's recent posts
+            timeline_service.on_follow(follower_id, following_id)
             
             # Send notification to the followed user
             self._send_follow_notification(follower, following)
@@ -136,7 +188,12 @@ class FollowService:
             
             # Remove follow relationship
             db.session.delete(follow)
+            db.session.flush()
+            self._adjust_follow_counts(follower_id, following_id, -1)
             db.session.commit()
+            follow_graph.remove_edge(follower_id, following_id)
+            
+            timeline_service.on_unfollow(follower_id, following_id)
             
             self.logger.info(f"User {follower_id} unfollowed {following_id}")
             
@@ -154,55 +211,129 @@ class FollowService:
                 'error': 'unfollow_failed'
             }
     
-    def get_followers(self, user_id: str, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+    def _adjust_follow_counts(self, follower_id, following_id, delta: int):
+        """
+        Shift the follower's following_count and the followed user's follower_count.
+        
+        Runs inside the caller's transaction, so the counters commit (or roll back)
+        together with the user_follows row. Rows are updated in user_id order so two
+        users following each other concurrently cannot deadlock.
+        """
+        changes = {
+            str(follower_id): {'following_count': func.greatest(User.following_count + delta, 0)},
+            str(following_id): {'follower_count': func.greatest(User.follower_count + delta, 0)}
+        }
+        for user_id in sorted(changes):
+            db.session.execute(
+                update(User).where(User.user_id == user_id).values(
+                    # Follows are not profile edits; keep updated_at from its onupdate
+                    updated_at=User.updated_at,
+                    **changes[user_id]
+                ).execution_options(synchronize_session=False)
+            )
+    
+    def remove_all_follows(self, user_id):
+        """
+        Delete every follow from and to a user (account deletion), decrementing the
+        counters of the users on the other side. Runs inside the caller's transaction.
+        """
+        followed_ids = select(UserFollow.following_id).where(UserFollow.follower_id == user_id)
+        follower_ids = select(UserFollow.follower_id).where(UserFollow.following_id == user_id)
+        
+        db.session.execute(
+            update(User).where(User.user_id.in_(followed_ids)).values(
+                follower_count=func.greatest(User.follower_count - 1, 0),
+                updated_at=User.updated_at
+            ).execution_options(synchronize_session=False)
+        )
+        db.session.execute(
+            update(User).where(User.user_id.in_(follower_ids)).values(
+                following_count=func.greatest(User.following_count - 1, 0),
+                updated_at=User.updated_at
+            ).execution_options(synchronize_session=False)
+        )
+        UserFollow.query.filter(
+            (UserFollow.follower_id == user_id) | (UserFollow.following_id == user_id)
+        ).delete(synchronize_session=False)
+    
+    def reconcile_counts(self, user_ids: Optional[List[Any]] = None, batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Recompute follower/following counts from user_follows and repair any drift.
+        
+        Args:
+            user_ids: Restrict the run to these users (default: all users)
+            batch_size: Number of users to recompute per statement
+            
+        Returns:
+            Dict with the number of users checked and repaired
+        """
+        follower_count_sq = db.session.query(
+            func.count(UserFollow.follow_id)
+        ).filter(UserFollow.following_id == User.user_id).scalar_subquery()
+        
+        following_count_sq = db.session.query(
+            func.count(UserFollow.follow_id)
+        ).filter(UserFollow.follower_id == User.user_id).scalar_subquery()
+        
+        if user_ids is None:
+            user_ids = [row.user_id for row in db.session.query(User.user_id).all()]
+        
+        checked = 0
+        repaired = 0
+        try:
+            for i in range(0, len(user_ids), batch_size):
+                batch = user_ids[i:i + batch_size]
+                result = db.session.execute(
+                    update(User).where(
+                        User.user_id.in_(batch),
+                        (User.follower_count != follower_count_sq) | (User.following_count != following_count_sq)
+                    ).values(
+                        follower_count=follower_count_sq,
+                        following_count=following_count_sq,
+                        updated_at=User.updated_at
+                    ).execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+                checked += len(batch)
+                repaired += result.rowcount or 0
+            
+            self.logger.info(f"Reconciled follow counts: {repaired} of {checked} users repaired")
+            return {'checked': checked, 'repaired': repaired}
+            
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Error in reconcile_counts: {str(e)}")
+            raise
+    
+    def get_followers(self, user_id: str, page: int = 1, per_page: int = 20,
+                      cursor: Optional[str] = None, include_total: Optional[bool] = None) -> Dict[str, Any]:
         """
         Get list of users following the specified user.
         
         Args:
             user_id: ID of the user whose followers to get
-            page: Page number for pagination
+            page: Page number for pagination (ignored when a cursor is given)
             per_page: Number of followers per page
+            cursor: Keyset cursor on (created_at, follow_id); '' for the first page
+            include_total: Also count all followers (default: only in page mode)
             
         Returns:
             Dict with followers list and pagination info
         """
         try:
-            # Query followers with pagination
-            followers_query = db.session.query(User).join(
-                UserFollow, User.user_id == UserFollow.follower_id
-            ).filter(UserFollow.following_id == user_id)
-            
-            paginated = followers_query.paginate(
-                page=page, per_page=per_page, error_out=False
-            )
-            
-            followers = []
-            for user in paginated.items:
-                follower_data = user.to_dict()
-                # Add follow date
-                follow = UserFollow.query.filter_by(
-                    follower_id=user.user_id,
-                    following_id=user_id
-                ).first()
-                if follow:
-                    follower_data['followed_at'] = follow.created_at.isoformat()
-                    follower_data['notification_enabled'] = follow.notification_enabled
-                
-                followers.append(follower_data)
-            
+            result = self._list_follows(user_id, 'followers', page, per_page, cursor, include_total)
             return {
                 'success': True,
-                'followers': followers,
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': paginated.total,
-                    'pages': paginated.pages,
-                    'has_next': paginated.has_next,
-                    'has_prev': paginated.has_prev
-                }
+                'followers': result['users'],
+                'pagination': result['pagination']
             }
             
+        except InvalidCursorError as e:
+            return {
+                'success': False,
+                'message': str(e),
+                'error': 'invalid_cursor'
+            }
         except Exception as e:
             self.logger.error(f"Error in get_followers: {str(e)}")
             return {
@@ -211,55 +342,35 @@ class FollowService:
                 'error': 'get_followers_failed'
             }
     
-    def get_following(self, user_id: str, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+    def get_following(self, user_id: str, page: int = 1, per_page: int = 20,
+                      cursor: Optional[str] = None, include_total: Optional[bool] = None) -> Dict[str, Any]:
         """
         Get list of users that the specified user is following.
         
         Args:
             user_id: ID of the user whose following list to get
-            page: Page number for pagination
+            page: Page number for pagination (ignored when a cursor is given)
             per_page: Number of following per page
+            cursor: Keyset cursor on (created_at, follow_id); '' for the first page
+            include_total: Also count all followed users (default: only in page mode)
             
         Returns:
             Dict with following list and pagination info
         """
         try:
-            # Query following with pagination
-            following_query = db.session.query(User).join(
-                UserFollow, User.user_id == UserFollow.following_id
-            ).filter(UserFollow.follower_id == user_id)
-            
-            paginated = following_query.paginate(
-                page=page, per_page=per_page, error_out=False
-            )
-            
-            following = []
-            for user in paginated.items:
-                following_data = user.to_dict()
-                # Add follow date and notification settings
-                follow = UserFollow.query.filter_by(
-                    follower_id=user_id,
-                    following_id=user.user_id
-                ).first()
-                if follow:
-                    following_data['followed_at'] = follow.created_at.isoformat()
-                    following_data['notification_enabled'] = follow.notification_enabled
-                
-                following.append(following_data)
-            
+            result = self._list_follows(user_id, 'following', page, per_page, cursor, include_total)
             return {
                 'success': True,
-                'following': following,
-                'pagination': {
-                    'page': page,
-                    'per_page': per_page,
-                    'total': paginated.total,
-                    'pages': paginated.pages,
-                    'has_next': paginated.has_next,
-                    'has_prev': paginated.has_prev
-                }
+                'following': result['users'],
+                'pagination': result['pagination']
             }
             
+        except InvalidCursorError as e:
+            return {
+                'success': False,
+                'message': str(e),
+                'error': 'invalid_cursor'
+            }
         except Exception as e:
             self.logger.error(f"Error in get_following: {str(e)}")
             return {
@@ -268,6 +379,78 @@ class FollowService:
                 'error': 'get_following_failed'
             }
     
+    def _list_follows(self, user_id: str, direction: str, page: int, per_page: int,
+                      cursor: Optional[str], include_total: Optional[bool]) -> Dict[str, Any]:
+        """
+        Page through one side of a user's follow graph, newest follows first.
+        
+        Each User is selected together with its UserFollow row, so a page costs one
+        query, plus one COUNT when include_total is set.
+        
+        Raises:
+            InvalidCursorError: If the cursor cannot be decoded
+        """
+        if direction == 'followers':
+            query = db.session.query(User, UserFollow).join(
+                UserFollow, User.user_id == UserFollow.follower_id
+            ).filter(UserFollow.following_id == user_id)
+        else:
+            query = db.session.query(User, UserFollow).join(
+                UserFollow, User.user_id == UserFollow.following_id
+            ).filter(UserFollow.follower_id == user_id)
+        
+        page = max(page, 1)
+        if include_total is None:
+            include_total = cursor is None
+        
+        if cursor is not None:
+            # Rows without a follow date cannot take part in a keyset comparison
+            query = query.filter(UserFollow.created_at.isnot(None))
+            rows, next_cursor = keyset_page(
+                query, f'follow_{direction}',
+                [UserFollow.created_at, UserFollow.follow_id], [datetime, int],
+                cursor, per_page,
+                key_of=lambda row: [row.UserFollow.created_at, row.UserFollow.follow_id]
+            )
+            pagination = {
+                'per_page': per_page,
+                'next_cursor': next_cursor,
+                'has_next': next_cursor is not None
+            }
+            if include_total:
+                pagination['total'] = query.count()
+        else:
+            ordered = query.order_by(UserFollow.created_at.desc(), UserFollow.follow_id.desc())
+            if include_total:
+                paginated = ordered.paginate(page=page, per_page=per_page, error_out=False)
+                rows = paginated.items
+                pagination = {
+                    'page': page,
+                    'per_page': per_page,
+                    'total': paginated.total,
+                    'pages': paginated.pages,
+                    'has_next': paginated.has_next,
+                    'has_prev': paginated.has_prev
+                }
+            else:
+                rows = ordered.offset((page - 1) * per_page).limit(per_page + 1).all()
+                pagination = {
+                    'page': page,
+                    'per_page': per_page,
+                    'has_next': len(rows) > per_page,
+                    'has_prev': page > 1
+                }
+                rows = rows[:per_page]
+        
+        users = []
+        for user, follow in rows:
+            user_data = user.to_dict()
+            user_data['followed_at'] = follow.created_at.isoformat() if follow.created_at else None
+            user_data['notification_enabled'] = follow.notification_enabled
+            users.append(user_data)
+        
+        return {'users': users, 'pagination': pagination}
+    
     def get_follow_stats(self, user_id: str) -> Dict[str, Any]:
         """
         Get follow statistics for a user.
@@ -279,8 +462,12 @@ class FollowService:
             Dict with follower and following counts
         """
         try:
-            follower_count = UserFollow.query.filter_by(following_id=user_id).count()
-            following_count = UserFollow.query.filter_by(follower_id=user_id).count()
+            # Read the denormalized counters instead of counting user_follows
+            counts = db.session.query(User.follower_count, User.following_count).filter(
+                User.user_id == user_id
+            ).first()
+            follower_count = counts.follower_count if counts else 0
+            following_count = counts.following_count if counts else 0
             
             return {
                 'success': True,
@@ -320,6 +507,94 @@ class FollowService:
             self.logger.error(f"Error in is_following: {str(e)}")
             return False
     
+    def following_set(self, follower_id: str, candidate_ids: Iterable[Any]) -> Set[str]:
+        """
+        Resolve which of the candidate users a follower is following, in one query.
+        
+        Args:
+            follower_id: ID of the potential follower
+            candidate_ids: IDs of the potential followed users (e.g. the authors on a feed page)
+            
+        Returns:
+            Set of candidate IDs (as strings) that the follower is following
+        """
+        candidates = {str(candidate_id) for candidate_id in candidate_ids if candidate_id}
+        if not follower_id or not candidates:
+            return set()
+        
+        try:
+            rows = db.session.query(UserFollow.following_id).filter(
+                UserFollow.follower_id == follower_id,
+                UserFollow.following_id.in_(candidates)
+            ).all()
+            return {str(row.following_id) for row in rows}
+            
+        except Exception as e:
+            self.logger.error(f"Error in following_set: {str(e)}")
+            return set()
+    
+    def get_mutual_follows(self, user_id: str, limit: int = 50) -> Dict[str, Any]:
+        """
+        Get users that the user follows and who follow them back.
+        
+        Args:
+            user_id: ID of the user
+            limit: Maximum number of users to return
+            
+        Returns:
+            Dict with the users and the total number of mutual follows
+        """
+        try:
+            mutual_ids = follow_graph.mutual_follows(user_id)
+            return {
+                'success': True,
+                'users': self._users_by_ids(mutual_ids[:limit]),
+                'total': len(mutual_ids)
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error in get_mutual_follows: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Failed to get mutual follows: {str(e)}',
+                'error': 'get_mutuals_failed'
+            }
+    
+    def get_followed_by_following(self, viewer_id: str, user_id: str, limit: int = 3) -> Dict[str, Any]:
+        """
+        Get the followers of a user that the viewer follows ("Followed by A, B and 3 others").
+        
+        Args:
+            viewer_id: ID of the user viewing the profile
+            user_id: ID of the profile's user
+            limit: Maximum number of users to return
+            
+        Returns:
+            Dict with the users and the total number of such followers
+        """
+        try:
+            follower_ids = follow_graph.followed_by_following(viewer_id, user_id)
+            return {
+                'success': True,
+                'users': self._users_by_ids(follower_ids[:limit]),
+                'total': len(follower_ids)
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error in get_followed_by_following: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Failed to get followers you follow: {str(e)}',
+                'error': 'get_followed_by_failed'
+            }
+    
+    def _users_by_ids(self, user_ids: List[str]) -> List[Dict[str, Any]]:
+        """Load users with one IN query, keeping the order of user_ids."""
+        if not user_ids:
+            return []
+        users = {str(user.user_id): user for user in User.query.filter(User.user_id.in_(user_ids)).all()}
+        return [users[user_id].to_dict() for user_id in user_ids if user_id in users]
+    
     def update_notification_preference(self, follower_id: str, following_id: str, enabled: bool) -> Dict[str, Any]:
         """
         Update notification preference for a follow relationship.
@@ -366,73 +641,104 @@ class FollowService:
         """
         Send notifications to all followers of a user.
         
+        The fan-out runs on the background worker when it is running, so the
+        request that triggered it is not blocked by large follower lists.
+        
         Args:
             user_id: ID of the user whose followers should be notified
             event_type: Type of event (new_post, new_article, etc.)
             event_data: Additional data about the event
             
         Returns:
-            Number of notifications sent
+            Number of notifications created (0 when handed to the background worker)
+        """
+        if self.run_async and self.running:
+            self._jobs.put((str(user_id), event_type, event_data))
+            return 0
+        return self.fan_out_notifications(user_id, event_type, event_data)
+    
+    def fan_out_notifications(self, user_id: str, event_type: str, event_data: Dict[str, Any]) -> int:
+        """
+        Create and enqueue a notification for every follower with notifications enabled.
+        
+        Follower ids are streamed with yield_per on a dedicated connection and
+        notifications are inserted a chunk at a time with one executemany INSERT,
+        committed, and handed to notification_queue in bulk. No ORM objects are
+        kept per follower.
+        
+        Returns:
+            Number of notifications created
         """
         try:
-            # Get followers with notifications enabled
-            followers = db.session.query(UserFollow).filter_by(
-                following_id=user_id,
-                notification_enabled=True
-            ).all()
-            
-            if not followers:
-                return 0
-            
             # Get the user who triggered the event
             user = User.query.get(user_id)
             if not user:
                 self.logger.error(f"User {user_id} not found for follower notification")
                 return 0
             
-            notifications_sent = 0
+            notification_data = self._create_follower_notification_data(event_type, user, event_data)
+            if not notification_data:
+                return 0
             
-            for follow in followers:
-                try:
-                    # Create notification based on event type
-                    notification_data = self._create_follower_notification_data(
-                        event_type, user, event_data
-                    )
+            followers = select(UserFollow.follower_id).where(
+                UserFollow.following_id == user.user_id,
+                UserFollow.notification_enabled.is_(True)
+            ).order_by(UserFollow.follow_id)
+            
+            notifications_created = 0
+            with db.engine.connect() as stream_conn:
+                result = stream_conn.execution_options(yield_per=self.notify_chunk_size).execute(followers)
+                for partition in result.partitions():
+                    created_at = datetime.utcnow()
+                    rows = [
+                        {
+                            'notification_id': uuid.uuid4(),
+                            'user_id': row.follower_id,
+                            'type': event_type,
+                            'title': notification_data['title'],
+                            'message': notification_data['message'],
+                            'data': notification_data['data'],
+                            'channels': ['push', 'in_app'],
+                            'status': 'pending',
+                            'priority': 'normal',
+                            'created_at': created_at
+                        }
+                        for row in partition
+                    ]
+                    db.session.execute(insert(Notification), rows)
+                    db.session.commit()
                     
-                    if notification_data:
-                        notification = Notification(
-                            user_id=follow.follower_id,
-                            type=event_type,
-                            title=notification_data['title'],
-                            message=notification_data['message'],
-                            data=notification_data['data'],
-                            channels=['push', 'in_app']
-                        )
-                        
-                        db.session.add(notification)
-                        db.session.flush()
-                        
-                        # Send notification asynchronously
-                        import asyncio
-                        try:
-                            asyncio.run(notification_service.send_notification(notification))
-                            notifications_sent += 1
-                        except Exception as e:
-                            self.logger.error(f"Failed to send notification: {str(e)}")
-                        
-                except Exception as e:
-                    self.logger.error(f"Error creating notification for follower {follow.follower_id}: {str(e)}")
-                    continue
+                    notification_queue.enqueue_bulk_notifications(
+                        [str(row['notification_id']) for row in rows]
+                    )
+                    notifications_created += len(rows)
             
-            db.session.commit()
-            self.logger.info(f"Sent {notifications_sent} follower notifications for user {user_id}")
-            return notifications_sent
+            self.logger.info(f"Created {notifications_created} follower notifications for user {user_id}")
+            return notifications_created
             
         except Exception as e:
             db.session.rollback()
             self.logger.error(f"Error in notify_followers: {str(e)}")
             return 0
     
+    def _worker(self):
+        """Background thread running queued follower notification fan-outs."""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            user_id, event_type, event_data = job
+            try:
+                with self.app.app_context():
+                    try:
+                        self.fan_out_notifications(user_id, event_type, event_data)
+                    finally:
+                        db.session.remove()
+            except Exception as e:
+                self.logger.error(f"Follower notification fan-out error for user {user_id}: {str(e)}")
+            finally:
+                self._jobs.task_done()
+    
     def _send_follow_notification(self, follower: User, following: User):
         """Send notification when someone follows a user."""
         try:
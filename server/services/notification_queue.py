@@ -4,28 +4,256 @@ Handles notification queuing, batch processing, and retry logic.
 """
 
 import logging
+import os
+import socket
 import time
 import threading
-from datetime import datetime, timedelta
-from typing import List, Optional
-from queue import Queue, Empty
+from contextlib import contextmanager
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from queue import Empty
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
+from flask import has_app_context
+from sqlalchemy import func, or_, select, update
+
 from server.database import db
 from server.models.notifications import Notification, NotificationDelivery
 from server.services.notification_service import notification_service, NotificationStatus
 
 
+PRIORITIES = ('urgent', 'high', 'normal', 'low')
+DEFAULT_LANE_WEIGHTS = {'urgent': 8, 'high': 4, 'normal': 2, 'low': 1}
+
+
+class WeightedRoundRobin:
+    """Smooth weighted round robin over priority lanes. Not thread-safe; callers lock."""
+    
+    def __init__(self, weights: Dict[str, int]):
+        self.weights = weights
+        self._credit = {priority: 0 for priority in weights}
+    
+    def pick(self, busy: List[str]) -> str:
+        """Pick the next lane to serve among the lanes that have work."""
+        for lane in busy:
+            self._credit[lane] += self.weights[lane]
+        lane = max(busy, key=lambda name: self._credit[name])
+        self._credit[lane] -= sum(self.weights[name] for name in busy)
+        return lane
+    
+    def reset(self, lane: str):
+        """Forget the credit of a lane that ran empty."""
+        self._credit[lane] = 0
+
+
+class PriorityLanes:
+    """
+    Thread-safe queue with one FIFO lane per notification priority.
+    
+    Lanes are served by smooth weighted round robin: with weights 8/4/2/1 an
+    urgent item is picked up ahead of a backlog of normal ones, while low
+    priority work still gets one pick in every fifteen when all lanes are busy.
+    Exposes the subset of queue.Queue used by the workers (put, get, task_done,
+    qsize).
+    """
+    
+    PRIORITIES = PRIORITIES
+    
+    def __init__(self, weights: Optional[Dict[str, int]] = None):
+        self.weights = dict(DEFAULT_LANE_WEIGHTS, **(weights or {}))
+        self._lanes = {priority: deque() for priority in self.PRIORITIES}
+        self._scheduler = WeightedRoundRobin(self.weights)
+        self._cond = threading.Condition()
+        self._unfinished = 0
+        self._stats = {
+            priority: {'enqueued': 0, 'dequeued': 0, 'total_wait': 0.0, 'max_wait': 0.0}
+            for priority in self.PRIORITIES
+        }
+    
+    def lane_for(self, priority: Optional[str]) -> str:
+        """Lane serving a priority; unknown priorities go to the normal lane."""
+        return priority if priority in self._lanes else 'normal'
+    
+    def put(self, item: dict):
+        """Append an item to the lane of its 'priority'."""
+        lane = self.lane_for(item.get('priority'))
+        with self._cond:
+            self._lanes[lane].append((time.monotonic(), item))
+            self._stats[lane]['enqueued'] += 1
+            self._unfinished += 1
+            self._cond.notify()
+    
+    def get(self, timeout: Optional[float] = None) -> dict:
+        """Remove and return the next item by weighted fair order; raises Empty on timeout."""
+        with self._cond:
+            if not self._cond.wait_for(self.qsize, timeout):
+                raise Empty
+            
+            lane = self._scheduler.pick([lane for lane in self.PRIORITIES if self._lanes[lane]])
+            enqueued, item = self._lanes[lane].popleft()
+            if not self._lanes[lane]:
+                self._scheduler.reset(lane)
+            
+            wait = time.monotonic() - enqueued
+            stats = self._stats[lane]
+            stats['dequeued'] += 1
+            stats['total_wait'] += wait
+            stats['max_wait'] = max(stats['max_wait'], wait)
+            return item
+    
+    def task_done(self):
+        """Mark a previously fetched item as processed."""
+        with self._cond:
+            if self._unfinished <= 0:
+                raise ValueError('task_done() called too many times')
+            self._unfinished -= 1
+    
+    def qsize(self) -> int:
+        """Total number of items waiting across all lanes."""
+        return sum(len(lane) for lane in self._lanes.values())
+    
+    def lane_stats(self) -> Dict[str, dict]:
+        """Per-lane depth, throughput and wait times (seconds)."""
+        now = time.monotonic()
+        with self._cond:
+            result = {}
+            for lane in self.PRIORITIES:
+                stats = self._stats[lane]
+                items = self._lanes[lane]
+                result[lane] = {
+                    'depth': len(items),
+                    'weight': self.weights[lane],
+                    'enqueued': stats['enqueued'],
+                    'dequeued': stats['dequeued'],
+                    'avg_wait_seconds': (
+                        stats['total_wait'] / stats['dequeued'] if stats['dequeued'] else 0
+                    ),
+                    'max_wait_seconds': stats['max_wait'],
+                    'oldest_wait_seconds': now - items[0][0] if items else 0
+                }
+            return result
+
+
+def _utc_timestamp(value: datetime) -> float:
+    """Seconds since the epoch of a naive-UTC or timezone-aware datetime."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH).total_seconds()
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class TimingWheel:
+    """
+    Hashed timing wheel of scheduled notifications.
+    
+    Holds items due within slots * tick_seconds of the current tick, one slot
+    per tick. Adding and firing an item are O(1); advance() only visits the
+    slots of the ticks that elapsed. Items further out than the wheel spans are
+    refused and left for the scheduler's next refill.
+    """
+    
+    def __init__(self, tick_seconds: float = 1.0, slots: int = 600):
+        self.tick_seconds = tick_seconds
+        self._slots = [dict() for _ in range(slots)]
+        self._items = {}  # notification_id -> tick
+        self._current = None  # last tick fired
+        self._lock = threading.Lock()
+    
+    def _tick(self, timestamp: float) -> int:
+        return int(timestamp // self.tick_seconds)
+    
+    def add(self, notification_id: str, due: datetime, priority: str = 'normal') -> bool:
+        """
+        Schedule (or reschedule) an item. Overdue items fire on the next advance.
+        
+        Returns:
+            False if the item is due beyond the wheel's span
+        """
+        with self._lock:
+            if self._current is None:
+                self._current = self._tick(time.time()) - 1
+            tick = max(self._tick(_utc_timestamp(due)), self._current + 1)
+            if tick - self._current > len(self._slots):
+                return False
+            
+            self._discard(notification_id)
+            self._slots[tick % len(self._slots)][notification_id] = priority
+            self._items[notification_id] = tick
+            return True
+    
+    def discard(self, notification_id: str):
+        """Remove an item if it is scheduled."""
+        with self._lock:
+            self._discard(notification_id)
+    
+    def _discard(self, notification_id: str):
+        tick = self._items.pop(notification_id, None)
+        if tick is not None:
+            self._slots[tick % len(self._slots)].pop(notification_id, None)
+    
+    def advance(self, now: Optional[float] = None) -> List[tuple]:
+        """
+        Move the wheel to now and return the (notification_id, priority) items that came due.
+        """
+        target = self._tick(time.time() if now is None else now)
+        due = []
+        with self._lock:
+            if self._current is None:
+                self._current = target - 1
+            # After a long stall every slot has come due once
+            steps = min(target - self._current, len(self._slots))
+            for offset in range(1, steps + 1):
+                slot = self._slots[(self._current + offset) % len(self._slots)]
+                for notification_id, priority in slot.items():
+                    del self._items[notification_id]
+                    due.append((notification_id, priority))
+                slot.clear()
+            self._current = max(self._current, target)
+        return due
+    
+    def __len__(self):
+        return len(self._items)
+
+
 class NotificationQueue:
-    """Queue-based notification processor with retry logic."""
+    """
+    Queue-based notification processor with retry logic.
+    
+    With the default 'memory' backend, notification ids are queued in process
+    memory. With the 'database' backend, the pending rows of the notifications
+    table are the queue: workers in any number of processes claim batches with
+    SELECT ... FOR UPDATE SKIP LOCKED and hold them under a lease, so nothing
+    is lost on restart and no row is sent by two workers. A row whose worker
+    died is claimed again once its lease expires, up to max_attempts times.
+    """
     
-    def __init__(self, max_workers=5, batch_size=10, retry_delay=300):
-        self.queue = Queue()
+    BACKENDS = ('memory', 'database')
+    
+    def __init__(self, max_workers=5, batch_size=10, retry_delay=300,
+                 backend='memory', lease_seconds=300, poll_interval=2.0, max_attempts=5,
+                 scheduler_horizon=600, scheduler_refill_interval=60):
+        self.queue = PriorityLanes()
         self.max_workers = max_workers
         self.batch_size = batch_size
         self.retry_delay = retry_delay  # 5 minutes
+        self.backend = backend
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
         self.running = False
+        self.app = None
+        self._wakeup = threading.Event()
+        self.scheduler_horizon = scheduler_horizon
+        self.scheduler_refill_interval = scheduler_refill_interval
+        self.wheel = TimingWheel(slots=scheduler_horizon * 2)
+        self._scheduled_until = None  # scheduled_at up to which the wheel has been filled
+        self._claim_scheduler = WeightedRoundRobin(self.queue.weights)
+        self._claim_lock = threading.Lock()
         self.workers = []
         self.executor = ThreadPoolExecutor(max_workers=max_workers)
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -39,6 +267,24 @@ class NotificationQueue:
             'started_at': None
         }
     
+    def init_app(self, app):
+        """Bind the queue to the application its workers run in and start it."""
+        self.app = app
+        if not self.running:
+            backend = app.config.get('NOTIFICATION_QUEUE_BACKEND', self.backend)
+            if backend not in self.BACKENDS:
+                raise ValueError(f"Unknown notification queue backend: {backend}")
+            self.backend = backend
+            self.lease_seconds = app.config.get('NOTIFICATION_LEASE_SECONDS', self.lease_seconds)
+            self.poll_interval = app.config.get('NOTIFICATION_POLL_INTERVAL', self.poll_interval)
+            self.max_attempts = app.config.get('NOTIFICATION_MAX_ATTEMPTS', self.max_attempts)
+            self.scheduler_horizon = app.config.get('NOTIFICATION_SCHEDULER_HORIZON', self.scheduler_horizon)
+            self.scheduler_refill_interval = app.config.get(
+                'NOTIFICATION_SCHEDULER_REFILL_INTERVAL', self.scheduler_refill_interval
+            )
+            self.wheel = TimingWheel(slots=self.scheduler_horizon * 2)
+        self.start()
+    
     def start(self):
         """Start the notification queue processor."""
         if self.running:
@@ -49,9 +295,10 @@ class NotificationQueue:
         self.stats['started_at'] = datetime.utcnow()
         
         # Start worker threads
+        worker_target = self._claim_worker if self.backend == 'database' else self._worker
         for i in range(self.max_workers):
             worker = threading.Thread(
-                target=self._worker,
+                target=worker_target,
                 name=f"NotificationWorker-{i+1}",
                 daemon=True
             )
@@ -66,23 +313,54 @@ class NotificationQueue:
         )
         retry_thread.start()
         
-        # Start scheduled notification processor
-        scheduled_thread = threading.Thread(
-            target=self._scheduled_processor,
-            name="ScheduledNotificationProcessor",
-            daemon=True
-        )
-        scheduled_thread.start()
+        # Start scheduled notification processor; database workers claim due rows themselves
+        if self.backend == 'memory':
+            scheduled_thread = threading.Thread(
+                target=self._scheduled_processor,
+                name="ScheduledNotificationProcessor",
+                daemon=True
+            )
+            scheduled_thread.start()
         
-        self.logger.info(f"Notification queue started with {self.max_workers} workers")
+        self.logger.info(f"Notification queue started with {self.max_workers} workers ({self.backend} backend)")
     
     def stop(self):
         """Stop the notification queue processor."""
         self.running = False
+        self._wakeup.set()
         self.logger.info("Notification queue stopped")
     
+    @contextmanager
+    def _app_context(self):
+        """
+        Push an app context on the queue's long-lived app for one job.
+        
+        The app (and its engine and connection pool) is bound once by init_app;
+        each job only pushes a context and returns its session to the pool.
+        Callers already inside an app context (requests, CLI) use theirs.
+        """
+        if has_app_context():
+            yield
+            return
+        
+        if self.app is None:
+            # Import here to avoid circular imports
+            from server import create_app
+            self.app = create_app()
+        
+        with self.app.app_context():
+            try:
+                yield
+            finally:
+                db.session.remove()
+    
     def enqueue_notification(self, notification_id: str, priority: str = 'normal'):
         """Add a notification to the processing queue."""
+        if self.backend == 'database':
+            # The pending row already is the queue entry; just wake this process's workers
+            self._wakeup.set()
+            return
+        
         try:
             self.queue.put({
                 'notification_id': notification_id,
@@ -93,15 +371,24 @@ class NotificationQueue:
         except Exception as e:
             self.logger.error(f"Error enqueuing notification {notification_id}: {str(e)}")
     
-    def enqueue_bulk_notifications(self, notification_ids: List[str]):
+    def enqueue_bulk_notifications(self, notification_ids: List[str], priority: str = 'normal'):
         """Add multiple notifications to the processing queue."""
         for notification_id in notification_ids:
-            self.enqueue_notification(notification_id)
+            self.enqueue_notification(notification_id, priority)
         
         self.logger.info(f"Enqueued {len(notification_ids)} notifications for bulk processing")
     
     def _worker(self):
         """Worker thread for processing notifications."""
+        # One event loop per worker thread, reused for every notification
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self._work(loop)
+        finally:
+            loop.close()
+    
+    def _work(self, loop):
         while self.running:
             try:
                 # Get notification from queue with timeout
@@ -113,7 +400,7 @@ class NotificationQueue:
                 notification_id = item['notification_id']
                 
                 # Process the notification
-                success = self._process_notification(notification_id)
+                success = self._process_notification(notification_id, loop)
                 
                 # Update statistics
                 self.stats['processed'] += 1
@@ -128,29 +415,31 @@ class NotificationQueue:
                 self.logger.error(f"Worker error: {str(e)}")
                 time.sleep(1)
     
-    def _process_notification(self, notification_id: str) -> bool:
+    def _process_notification(self, notification_id: str, loop=None, lease_owner: Optional[str] = None) -> bool:
         """Process a single notification."""
         try:
-            # Import here to avoid circular imports
-            from server import create_app
-            
-            # Create app context for database operations
-            app = create_app()
-            with app.app_context():
+            with self._app_context():
                 # Get notification from database
                 notification = Notification.query.get(notification_id)
                 if not notification:
                     self.logger.warning(f"Notification {notification_id} not found")
                     return False
                 
+                if lease_owner and notification.lease_owner != lease_owner:
+                    # Lease expired and the row was claimed by another worker
+                    self.logger.warning(f"Lease on notification {notification_id} lost, skipping")
+                    return False
+                
                 # Skip if already processed
                 if notification.status in ['sent', 'read']:
                     self.logger.debug(f"Notification {notification_id} already processed")
                     return True
                 
                 # Send notification
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
+                own_loop = loop is None
+                if own_loop:
+                    loop = asyncio.new_event_loop()
+                    asyncio.set_event_loop(loop)
                 try:
                     results = loop.run_until_complete(
                         notification_service.send_notification(notification)
@@ -161,12 +450,144 @@ class NotificationQueue:
                     return success
                     
                 finally:
-                    loop.close()
+                    if own_loop:
+                        loop.close()
                 
         except Exception as e:
             self.logger.error(f"Error processing notification {notification_id}: {str(e)}")
             return False
     
+    def claim_batch(self, owner: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Claim up to limit due pending notifications for a worker.
+        
+        Slots are shared out between the priority lanes by the same weighted round
+        robin as the memory backend; slots a lane cannot fill go to the other lanes.
+        Rows are locked with FOR UPDATE SKIP LOCKED, so concurrent claimers never
+        wait for each other or get the same row, and leased to owner for
+        lease_seconds.
+        
+        Returns:
+            IDs of the claimed notifications
+        """
+        limit = limit or self.batch_size
+        with self._claim_lock:
+            slots = {}
+            for _ in range(limit):
+                lane = self._claim_scheduler.pick(list(PRIORITIES))
+                slots[lane] = slots.get(lane, 0) + 1
+        
+        claimable = (
+            Notification.status == NotificationStatus.PENDING.value,
+            or_(Notification.scheduled_at.is_(None), Notification.scheduled_at <= datetime.utcnow()),
+            or_(Notification.leased_until.is_(None), Notification.leased_until < func.now()),
+            Notification.attempts < self.max_attempts
+        )
+        
+        def claim_lane(lane, count, exclude):
+            query = select(Notification.notification_id).where(
+                Notification.priority == lane, *claimable
+            )
+            if exclude:
+                query = query.where(Notification.notification_id.notin_(exclude))
+            return db.session.scalars(
+                query.order_by(Notification.created_at).limit(count).with_for_update(skip_locked=True)
+            ).all()
+        
+        try:
+            claimed = []
+            for lane in PRIORITIES:
+                if slots.get(lane):
+                    claimed.extend(claim_lane(lane, slots[lane], None))
+            # Hand slots the lanes could not fill to the others, most urgent first
+            for lane in PRIORITIES:
+                if len(claimed) >= limit:
+                    break
+                claimed.extend(claim_lane(lane, limit - len(claimed), claimed))
+            
+            if claimed:
+                db.session.execute(
+                    update(Notification).where(Notification.notification_id.in_(claimed)).values(
+                        lease_owner=owner,
+                        leased_until=func.now() + timedelta(seconds=self.lease_seconds),
+                        attempts=Notification.attempts + 1
+                    ).execution_options(synchronize_session=False)
+                )
+            db.session.commit()
+            return [str(notification_id) for notification_id in claimed]
+            
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    def release_lease(self, notification_id: str, owner: str):
+        """Release a worker's lease on a notification once it has been processed."""
+        db.session.execute(
+            update(Notification).where(
+                Notification.notification_id == notification_id,
+                Notification.lease_owner == owner
+            ).values(lease_owner=None, leased_until=None).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    
+    def fail_exhausted(self) -> int:
+        """
+        Mark failed the pending notifications that used up max_attempts claims and
+        whose last lease expired, so they do not sit pending unclaimable forever.
+        
+        Returns:
+            Number of notifications marked failed
+        """
+        try:
+            result = db.session.execute(
+                update(Notification).where(
+                    Notification.status == NotificationStatus.PENDING.value,
+                    Notification.attempts >= self.max_attempts,
+                    or_(Notification.leased_until.is_(None), Notification.leased_until < func.now())
+                ).values(
+                    status=NotificationStatus.FAILED.value, lease_owner=None, leased_until=None
+                ).execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            return result.rowcount or 0
+            
+        except Exception:
+            db.session.rollback()
+            raise
+    
+    def _claim_worker(self):
+        """Worker thread draining the notifications table (database backend)."""
+        owner = f"{self.worker_id}:{threading.current_thread().name}"
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            while self.running:
+                try:
+                    with self._app_context():
+                        notification_ids = self.claim_batch(owner)
+                    
+                    if not notification_ids:
+                        self._wakeup.wait(self.poll_interval)
+                        self._wakeup.clear()
+                        continue
+                    
+                    for notification_id in notification_ids:
+                        success = self._process_notification(notification_id, loop, lease_owner=owner)
+                        with self._app_context():
+                            self.release_lease(notification_id, owner)
+                        
+                        self.stats['processed'] += 1
+                        if success:
+                            self.stats['successful'] += 1
+                        else:
+                            self.stats['failed'] += 1
+                    
+                except Exception as e:
+                    self.logger.error(f"Claim worker error: {str(e)}")
+                    time.sleep(1)
+        finally:
+            loop.close()
+    
     def _retry_processor(self):
         """Background processor for retrying failed notifications."""
         while self.running:
@@ -177,53 +598,115 @@ class NotificationQueue:
                 if not self.running:
                     break
                 
-                # Import here to avoid circular imports
-                from server import create_app
-                
-                # Create app context for database operations
-                app = create_app()
-                with app.app_context():
+                with self._app_context():
                     retry_count = notification_service.retry_failed_notifications()
                     if retry_count > 0:
                         self.stats['retried'] += retry_count
                         self.logger.info(f"Retried {retry_count} failed notifications")
+                    
+                    if self.backend == 'database':
+                        exhausted = self.fail_exhausted()
+                        if exhausted:
+                            self.logger.warning(f"Marked {exhausted} notifications failed after {self.max_attempts} attempts")
                 
             except Exception as e:
                 self.logger.error(f"Retry processor error: {str(e)}")
                 time.sleep(60)  # Wait a minute before retrying
     
+    # Full reload of the wheel's horizon, catching rows scheduled without schedule()
+    SCHEDULE_RESYNC_SECONDS = 900
+    SCHEDULE_LOAD_CHUNK = 1000
+    
+    def schedule(self, notification: Notification):
+        """
+        Hand a newly scheduled or deferred notification to the scheduler.
+        
+        Call after committing. Notifications due within the loaded horizon go
+        straight onto the timing wheel; later ones are picked up by the refill
+        that reaches their scheduled_at.
+        """
+        if self.backend == 'database' or not notification.scheduled_at:
+            # Database workers claim due scheduled rows themselves
+            return
+        if (self._scheduled_until is not None and
+                _utc_timestamp(notification.scheduled_at) <= _utc_timestamp(self._scheduled_until)):
+            self.wheel.add(str(notification.notification_id), notification.scheduled_at, notification.priority)
+    
+    def refill_schedule(self, full: bool = False) -> int:
+        """
+        Load pending notifications scheduled up to now + scheduler_horizon onto the wheel.
+        
+        Only rows after the previous refill's horizon are read, in keyset chunks
+        over the (status, scheduled_at) index; full reloads the whole window,
+        including overdue rows.
+        
+        Returns:
+            Number of notifications added to the wheel
+        """
+        horizon = datetime.utcnow() + timedelta(seconds=self.scheduler_horizon)
+        after = None if full else self._scheduled_until
+        
+        loaded = 0
+        last = None
+        while True:
+            query = db.session.query(
+                Notification.notification_id, Notification.scheduled_at, Notification.priority
+            ).filter(
+                Notification.status == NotificationStatus.PENDING.value,
+                Notification.scheduled_at.isnot(None),
+                Notification.scheduled_at <= horizon
+            )
+            if after is not None:
+                query = query.filter(Notification.scheduled_at > after)
+            if last is not None:
+                query = query.filter(
+                    (Notification.scheduled_at > last[0])
+                    | ((Notification.scheduled_at == last[0]) & (Notification.notification_id > last[1]))
+                )
+            rows = query.order_by(
+                Notification.scheduled_at, Notification.notification_id
+            ).limit(self.SCHEDULE_LOAD_CHUNK).all()
+            
+            for row in rows:
+                if self.wheel.add(str(row.notification_id), row.scheduled_at, row.priority):
+                    loaded += 1
+            if len(rows) < self.SCHEDULE_LOAD_CHUNK:
+                break
+            last = (rows[-1].scheduled_at, rows[-1].notification_id)
+        
+        self._scheduled_until = horizon
+        return loaded
+    
     def _scheduled_processor(self):
-        """Background processor for scheduled notifications."""
+        """
+        Background processor for scheduled notifications.
+        
+        Fires notifications from the timing wheel at their due second, refilling
+        the wheel every scheduler_refill_interval seconds.
+        """
+        last_refill = None
+        last_resync = None
         while self.running:
             try:
-                # Check for scheduled notifications every minute
-                time.sleep(60)
-                
-                if not self.running:
-                    break
-                
-                # Import here to avoid circular imports
-                from server import create_app
+                now = time.monotonic()
+                if last_refill is None or now - last_refill >= self.scheduler_refill_interval:
+                    full = last_resync is None or now - last_resync >= self.SCHEDULE_RESYNC_SECONDS
+                    with self._app_context():
+                        loaded = self.refill_schedule(full=full)
+                    last_refill = now
+                    if full:
+                        last_resync = now
+                    if loaded:
+                        self.logger.info(f"Loaded {loaded} scheduled notifications")
                 
-                # Create app context for database operations
-                app = create_app()
-                with app.app_context():
-                    # Find notifications that should be sent now
-                    now = datetime.utcnow()
-                    scheduled_notifications = Notification.query.filter(
-                        Notification.scheduled_at <= now,
-                        Notification.status == 'pending'
-                    ).all()
-                    
-                    for notification in scheduled_notifications:
-                        self.enqueue_notification(str(notification.notification_id))
-                    
-                    if scheduled_notifications:
-                        self.logger.info(f"Enqueued {len(scheduled_notifications)} scheduled notifications")
+                for notification_id, priority in self.wheel.advance():
+                    self.enqueue_notification(notification_id, priority)
                 
             except Exception as e:
                 self.logger.error(f"Scheduled processor error: {str(e)}")
-                time.sleep(60)
+                last_refill = time.monotonic()  # Back off a refill interval before querying again
+            
+            time.sleep(self.wheel.tick_seconds)
     
     def get_queue_stats(self) -> dict:
         """Get queue processing statistics."""
@@ -240,6 +723,9 @@ class NotificationQueue:
             'successful': self.stats['successful'],
             'failed': self.stats['failed'],
             'retried': self.stats['retried'],
+            'backend': self.backend,
+            'lanes': self.queue.lane_stats(),
+            'scheduled': len(self.wheel),
             'success_rate': (
                 (self.stats['successful'] / self.stats['processed'] * 100) 
                 if self.stats['processed'] > 0 else 0
@@ -249,12 +735,7 @@ class NotificationQueue:
     def get_pending_notifications_count(self) -> int:
         """Get count of pending notifications in database."""
         try:
-            # Import here to avoid circular imports
-            from server import create_app
-            
-            # Create app context for database operations
-            app = create_app()
-            with app.app_context():
+            with self._app_context():
                 return Notification.query.filter_by(status='pending').count()
         except Exception as e:
             self.logger.error(f"Error getting pending notifications count: {str(e)}")
@@ -263,12 +744,7 @@ class NotificationQueue:
     def process_pending_notifications(self) -> int:
         """Process all pending notifications in the database."""
         try:
-            # Import here to avoid circular imports
-            from server import create_app
-            
-            # Create app context for database operations
-            app = create_app()
-            with app.app_context():
+            with self._app_context():
                 pending_notifications = Notification.query.filter_by(status='pending').all()
                 
                 for notification in pending_notifications:
@@ -276,7 +752,7 @@ class NotificationQueue:
                     if notification.scheduled_at and notification.scheduled_at > datetime.utcnow():
                         continue
                     
-                    self.enqueue_notification(str(notification.notification_id))
+                    self.enqueue_notification(str(notification.notification_id), notification.priority)
                 
                 count = len([n for n in pending_notifications 
                             if not n.scheduled_at or n.scheduled_at <= datetime.utcnow()])
@@ -351,11 +351,28 @@ class NotificationService:
         
         if not user:
             self.logger.error(f"User not found for notification {notification.notification_id}")
+            # Nothing will ever deliver it; don't leave it pending for the queue to pick up again
+            notification.status = NotificationStatus.FAILED.value
+            db.session.commit()
             return results
         
         # Check user preferences and quiet hours
         if not self._should_send_notification(notification, user):
+            if notification.scheduled_at and notification.scheduled_at > datetime.utcnow():
+                # Deferred past quiet hours: keep it pending and hand it to the scheduler.
+                # A deferral is not a failed delivery, so it does not use up queue attempts.
+                notification.attempts = 0
+                db.session.commit()
+                
+                # Import here to avoid circular imports
+                from server.services.notification_queue import notification_queue
+                notification_queue.schedule(notification)
+                self.logger.info(f"Notification {notification.notification_id} deferred to {notification.scheduled_at}")
+                return results
+            
             self.logger.info(f"Notification {notification.notification_id} blocked by user preferences")
+            notification.status = NotificationStatus.FAILED.value
+            db.session.commit()
             return results
         
         # Send through each specified channel
@@ -0,0 +1,116 @@
+"""
+Post counter service for maintaining the denormalized like/comment counters on posts.
+"""
+
+import logging
+from typing import Dict, List, Optional, Any
+
+from sqlalchemy import func, update
+
+from server.database import db
+from server.models.post import Post, Comment, ArticlePostLike
+
+
+class PostCounterService:
+    """Service for keeping Post.comment_count and Post.like_count in step with their rows."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def adjust(self, post_id, comments: int = 0, likes: int = 0) -> Optional[Dict[str, int]]:
+        """
+        Atomically shift the counters of a post by the given deltas.
+
+        The UPDATE runs inside the caller's transaction, so the counter change is
+        committed (or rolled back) together with the comment/like row it mirrors.
+
+        Args:
+            post_id: ID of the post
+            comments: Delta to apply to comment_count
+            likes: Delta to apply to like_count
+
+        Returns:
+            Dict with the new counter values, or None if the post does not exist
+        """
+        values = {}
+        if comments:
+            values['comment_count'] = func.greatest(Post.comment_count + comments, 0)
+        if likes:
+            values['like_count'] = func.greatest(Post.like_count + likes, 0)
+
+        if values:
+            # Counter changes feed the incremental trending refresh; they are not
+            # content edits, so keep updated_at from being bumped by its onupdate
+            values['activity_at'] = func.now()
+            values['updated_at'] = Post.updated_at
+        
+        if not values:
+            row = db.session.query(Post.comment_count, Post.like_count).filter(Post.post_id == post_id).first()
+        else:
+            row = db.session.execute(
+                update(Post).where(Post.post_id == post_id).values(**values)
+                .returning(Post.comment_count, Post.like_count)
+                .execution_options(synchronize_session=False)
+            ).first()
+
+        if row is None:
+            return None
+        return {'comment_count': row.comment_count, 'like_count': row.like_count}
+
+    def reconcile(self, post_ids: Optional[List[Any]] = None, batch_size: int = 1000) -> Dict[str, int]:
+        """
+        Recompute counters from the comments and likes tables and repair any drift.
+
+        Args:
+            post_ids: Restrict the run to these posts (default: all posts)
+            batch_size: Number of posts to recompute per statement
+
+        Returns:
+            Dict with the number of posts checked and repaired
+        """
+        comment_count_sq = db.session.query(
+            func.count(Comment.comment_id)
+        ).filter(
+            Comment.post_id == Post.post_id,
+            Comment.is_deleted.is_(False)
+        ).scalar_subquery()
+
+        like_count_sq = db.session.query(
+            func.count(ArticlePostLike.user_id)
+        ).filter(
+            ArticlePostLike.post_id == Post.post_id
+        ).scalar_subquery()
+
+        if post_ids is None:
+            post_ids = [row.post_id for row in db.session.query(Post.post_id).all()]
+
+        checked = 0
+        repaired = 0
+        try:
+            for i in range(0, len(post_ids), batch_size):
+                batch = post_ids[i:i + batch_size]
+                result = db.session.execute(
+                    update(Post).where(
+                        Post.post_id.in_(batch),
+                        (Post.comment_count != comment_count_sq) | (Post.like_count != like_count_sq)
+                    ).values(
+                        comment_count=comment_count_sq,
+                        like_count=like_count_sq,
+                        updated_at=Post.updated_at
+                    ).execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+                checked += len(batch)
+                repaired += result.rowcount or 0
+
+            self.logger.info(f"Reconciled post counters: {repaired} of {checked} posts repaired")
+            return {'checked': checked, 'repaired': repaired}
+
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Error in reconcile: {str(e)}")
+            raise
+
+
+# Global post counter service instance
+post_counter_service = PostCounterService()
@@ -0,0 +1,402 @@
+"""
+"Who to follow" suggestions.
+
+Candidate features (crops and expert specializations, location, city, country,
+popularity) are loaded for every active farmer and expert into a snapshot of
+compact arrays with inverted postings per interest term and per place. A
+caller is scored against every candidate in one pass over an array('d') of
+scores: start from the popularity prior, add the postings of the caller's
+terms and places, and add second-degree follow paths from the in-memory
+follow graph. Ranked results are cached per user for cache_ttl seconds.
+"""
+
+import atexit
+import heapq
+import logging
+import math
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from server.database import db
+from server.models.user import User
+from server.models.crop import Crop, UserCrop
+from server.models.expert import ExpertProfile
+from server.services.follow_graph import follow_graph
+
+
+class _CandidateFeatures:
+    """Immutable snapshot of candidate features; replaced wholesale on refresh."""
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.base = array('d')  # popularity prior, -1 for users that cannot be suggested
+        self.location = array('i')  # location_id, -1 when unknown
+        self.city = array('i')  # interned lowercase city, -1 when unknown
+        self.country = array('i')  # interned lowercase country, -1 when unknown
+        self.terms: List[array] = []  # sorted interest term ids per user
+        self.term_ids: Dict[str, int] = {}
+        self.term_names: List[str] = []
+        self.place_ids: Dict[str, int] = {}
+        # term / place id -> array of candidate positions
+        self.term_postings: Dict[int, array] = {}
+        self.location_postings: Dict[int, array] = {}
+        self.city_postings: Dict[int, array] = {}
+        self.country_postings: Dict[int, array] = {}
+        self.built_at = None
+        self.loaded_from = None  # time.monotonic() when the load started
+
+
+def _normalize(value) -> Optional[str]:
+    value = (value or '').strip().lower()
+    return value or None
+
+
+class SuggestionService:
+    """Service ranking farmers and experts for a user to follow."""
+
+    CANDIDATE_ROLES = ('farmer', 'expert')
+
+    CROP_WEIGHT = 3.0  # per shared crop / specialization
+    LOCATION_WEIGHT = 4.0
+    CITY_WEIGHT = 2.0
+    COUNTRY_WEIGHT = 1.0
+    GRAPH_WEIGHT = 2.5  # times log(1 + follow paths through people the user follows)
+    POPULARITY_WEIGHT = 0.25  # times log(1 + follower_count)
+
+    # Second-degree users considered per caller
+    SECOND_DEGREE_LIMIT = 500
+    # Ranked suggestions kept per cached user
+    MAX_RESULTS = 100
+    MAX_CACHE_ENTRIES = 10000
+
+    def __init__(self, refresh_interval=3600, cache_ttl=10800):
+        self.refresh_interval = refresh_interval
+        self.cache_ttl = cache_ttl
+        self.app = None
+        self.running = False
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._features = None
+        self._build_lock = threading.Lock()
+        self._cache = OrderedDict()  # user_id -> (expires_at, ranked suggestions)
+        self._cache_lock = threading.Lock()
+        # user_id -> time.monotonic() of their last crop/profile change
+        self._changed = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        """Bind the service to an app and start the periodic feature refresh."""
+        self._features = None
+        self.clear_cache()
+
+        self.app = app
+        self.refresh_interval = app.config.get('SUGGESTION_FEATURES_REFRESH_INTERVAL', self.refresh_interval)
+        self.cache_ttl = app.config.get('SUGGESTION_CACHE_TTL', self.cache_ttl)
+        if self.running or not self.refresh_interval:
+            return
+
+        self.running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._worker,
+            name="SuggestionFeatures",
+            daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+        self.logger.info(f"Suggestion feature refresher started (every {self.refresh_interval}s)")
+
+    def stop(self):
+        """Stop the periodic feature refresh."""
+        if not self.running:
+            return
+        self.running = False
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def refresh_features(self) -> Dict[str, int]:
+        """
+        Load candidate features for all active users with three queries.
+
+        Returns:
+            Dict with the number of users and interest terms loaded
+        """
+        with self._build_lock:
+            features = _CandidateFeatures()
+            features.loaded_from = time.monotonic()
+
+            def place_id(value):
+                value = _normalize(value)
+                if value is None:
+                    return -1
+                return features.place_ids.setdefault(value, len(features.place_ids))
+
+            def term_id(value):
+                value = _normalize(value)
+                if value is None:
+                    return None
+                if value not in features.term_ids:
+                    features.term_ids[value] = len(features.term_names)
+                    features.term_names.append(value)
+                return features.term_ids[value]
+
+            users = db.session.query(
+                User.user_id, User.role, User.location_id, User.country, User.city, User.follower_count
+            ).filter(User.is_active.is_(True)).all()
+
+            for row in users:
+                position = len(features.ids)
+                key = str(row.user_id)
+                features.ids.append(key)
+                features.index[key] = position
+                if row.role in self.CANDIDATE_ROLES:
+                    features.base.append(self.POPULARITY_WEIGHT * math.log1p(row.follower_count or 0))
+                else:
+                    features.base.append(-1.0)
+                features.location.append(row.location_id if row.location_id is not None else -1)
+                features.city.append(place_id(row.city))
+                features.country.append(place_id(row.country))
+                features.terms.append(array('i'))
+
+            user_terms: Dict[int, set] = {}
+            crop_rows = db.session.query(UserCrop.user_id, Crop.name).join(
+                Crop, Crop.crop_id == UserCrop.crop_id
+            ).all()
+            profile_rows = db.session.query(ExpertProfile.user_id, ExpertProfile.specializations).all()
+
+            for user_id, name in crop_rows:
+                position = features.index.get(str(user_id))
+                term = term_id(name)
+                if position is not None and term is not None:
+                    user_terms.setdefault(position, set()).add(term)
+            for user_id, specializations in profile_rows:
+                position = features.index.get(str(user_id))
+                if position is None:
+                    continue
+                for specialization in specializations or []:
+                    term = term_id(specialization)
+                    if term is not None:
+                        user_terms.setdefault(position, set()).add(term)
+
+            for position, terms in user_terms.items():
+                features.terms[position] = array('i', sorted(terms))
+
+            # Postings only list candidates; non-candidates are never scored
+            def post(postings, key, position):
+                if key >= 0:
+                    postings.setdefault(key, array('i')).append(position)
+
+            for position in range(len(features.ids)):
+                if features.base[position] < 0:
+                    continue
+                for term in features.terms[position]:
+                    post(features.term_postings, term, position)
+                post(features.location_postings, features.location[position], position)
+                post(features.city_postings, features.city[position], position)
+                post(features.country_postings, features.country[position], position)
+
+            features.built_at = datetime.utcnow()
+            self._features = features
+            with self._cache_lock:
+                self._changed = {
+                    user_id: changed_at for user_id, changed_at in self._changed.items()
+                    if changed_at >= features.loaded_from
+                }
+            self.logger.info(f"Suggestion features loaded: {len(features.ids)} users, {len(features.term_names)} terms")
+            return {'users': len(features.ids), 'terms': len(features.term_names)}
+
+    def _get_features(self) -> _CandidateFeatures:
+        if self._features is None:
+            self.refresh_features()
+        return self._features
+
+    def _caller_profile(self, features: _CandidateFeatures, user_id: str) -> Tuple[List[int], int, int, int]:
+        """
+        The caller's interest terms and places, from the snapshot or the database.
+
+        The database is used for users missing from the snapshot and for users
+        whose crops or expert profile changed after the snapshot was loaded.
+        """
+        position = features.index.get(user_id)
+        with self._cache_lock:
+            changed_at = self._changed.get(user_id)
+        if changed_at is not None and changed_at >= features.loaded_from:
+            position = None
+        if position is not None:
+            return (list(features.terms[position]), features.location[position],
+                    features.city[position], features.country[position])
+
+        user = User.query.get(user_id)
+        if not user:
+            return [], -1, -1, -1
+        names = [row.name for row in db.session.query(Crop.name).join(
+            UserCrop, UserCrop.crop_id == Crop.crop_id
+        ).filter(UserCrop.user_id == user.user_id).all()]
+        profile = ExpertProfile.query.filter_by(user_id=user.user_id).first()
+        if profile:
+            names.extend(profile.specializations or [])
+
+        terms = sorted({features.term_ids[n] for n in map(_normalize, names) if n in features.term_ids})
+        return (terms, user.location_id if user.location_id is not None else -1,
+                features.place_ids.get(_normalize(user.city), -1),
+                features.place_ids.get(_normalize(user.country), -1))
+
+    def _rank(self, user_id: str) -> List[Dict[str, Any]]:
+        """Score every candidate for the user and return the best MAX_RESULTS with their reasons."""
+        features = self._get_features()
+        terms, location, city, country = self._caller_profile(features, user_id)
+
+        scores = array('d', features.base)
+        for term in terms:
+            for position in features.term_postings.get(term, ()):
+                scores[position] += self.CROP_WEIGHT
+        for postings, key, weight in (
+            (features.location_postings, location, self.LOCATION_WEIGHT),
+            (features.city_postings, city, self.CITY_WEIGHT),
+            (features.country_postings, country, self.COUNTRY_WEIGHT)
+        ):
+            for position in postings.get(key, ()):
+                scores[position] += weight
+
+        paths = {}
+        for other_id, count in follow_graph.second_degree(user_id, limit=self.SECOND_DEGREE_LIMIT):
+            position = features.index.get(other_id)
+            if position is not None and features.base[position] >= 0:
+                scores[position] += self.GRAPH_WEIGHT * math.log1p(count)
+                paths[position] = count
+
+        # Never suggest the user themselves or people they already follow
+        for excluded in [user_id] + follow_graph.following(user_id):
+            position = features.index.get(excluded)
+            if position is not None:
+                scores[position] = -1.0
+
+        best = heapq.nlargest(self.MAX_RESULTS, range(len(scores)), key=scores.__getitem__)
+
+        term_set = set(terms)
+        ranked = []
+        for position in best:
+            if scores[position] < 0:
+                break
+            shared = [features.term_names[t] for t in features.terms[position] if t in term_set]
+            reasons = []
+            if shared:
+                reasons.append('shared_interests')
+            if location >= 0 and features.location[position] == location:
+                reasons.append('same_location')
+            elif city >= 0 and features.city[position] == city:
+                reasons.append('same_city')
+            elif country >= 0 and features.country[position] == country:
+                reasons.append('same_country')
+            if position in paths:
+                reasons.append('followed_by_following')
+            ranked.append({
+                'user_id': features.ids[position],
+                'score': round(scores[position], 3),
+                'reasons': reasons,
+                'shared_interests': shared,
+                'mutual_connections': paths.get(position, 0)
+            })
+        return ranked
+
+    def get_suggestions(self, user_id: str, limit: int = 20, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Get users suggested for the user to follow, best first.
+
+        Args:
+            user_id: ID of the user asking for suggestions
+            limit: Maximum number of suggestions to return
+            refresh: Recompute instead of using the cached ranking
+
+        Returns:
+            Dict with success status and the suggestions (user plus score and reasons)
+        """
+        try:
+            user_id = str(user_id)
+            ranked = None
+            if not refresh and self.cache_ttl > 0:
+                with self._cache_lock:
+                    entry = self._cache.get(user_id)
+                    if entry and entry[0] > time.monotonic():
+                        self._cache.move_to_end(user_id)
+                        ranked = entry[1]
+
+            if ranked is None:
+                ranked = self._rank(user_id)
+                if self.cache_ttl > 0:
+                    with self._cache_lock:
+                        self._cache[user_id] = (time.monotonic() + self.cache_ttl, ranked)
+                        self._cache.move_to_end(user_id)
+                        while len(self._cache) > self.MAX_CACHE_ENTRIES:
+                            self._cache.popitem(last=False)
+
+            # Cached rankings may predate follows made since; drop those users at read time
+            followed = set(follow_graph.following(user_id))
+            page = [item for item in ranked if item['user_id'] not in followed][:limit]
+
+            users = {
+                str(user.user_id): user
+                for user in User.query.filter(User.user_id.in_([item['user_id'] for item in page])).all()
+            } if page else {}
+
+            suggestions = []
+            for item in page:
+                user = users.get(item['user_id'])
+                if user and user.is_active:
+                    suggestions.append(dict(item, user=user.to_dict()))
+
+            return {
+                'success': True,
+                'suggestions': suggestions
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error in get_suggestions: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Failed to get suggestions: {str(e)}',
+                'error': 'get_suggestions_failed'
+            }
+
+    def invalidate(self, user_id):
+        """
+        Drop the cached suggestions for a user after their crops or expert profile change.
+
+        Until the next feature refresh, their own interests are read from the
+        database when ranking for them.
+        """
+        user_id = str(user_id)
+        with self._cache_lock:
+            self._cache.pop(user_id, None)
+            self._changed[user_id] = time.monotonic()
+
+    def clear_cache(self):
+        """Drop all cached suggestions."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._changed.clear()
+
+    def _worker(self):
+        """Background thread loading features at start and refreshing them periodically."""
+        while True:
+            try:
+                with self.app.app_context():
+                    try:
+                        self.refresh_features()
+                    finally:
+                        db.session.remove()
+            except Exception as e:
+                self.logger.error(f"Suggestion feature refresh error: {str(e)}")
+            if self._stop_event.wait(self.refresh_interval):
+                break
+
+
+# Global suggestion service instance
+suggestion_service = SuggestionService()
@@ -0,0 +1,85 @@
+"""
+Tag service for resolving submitted tag names to Tag rows in bulk.
+"""
+
+import logging
+from typing import Iterable, List
+
+from sqlalchemy.dialects.postgresql import insert
+
+from server.database import db
+from server.models.post import Tag
+
+
+class TagService:
+    """Service for looking up and creating tags."""
+
+    # Matches the length of Tag.name
+    MAX_TAG_LENGTH = 50
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def normalize_tag_names(self, names: Iterable[str]) -> List[str]:
+        """
+        Clean submitted tag names.
+
+        Whitespace is trimmed and collapsed, names are cut to the column length,
+        and empty names and duplicates are dropped. Order and case are preserved
+        because tag names are unique case-sensitively.
+        """
+        normalized = []
+        seen = set()
+        for name in names or []:
+            if not isinstance(name, str):
+                continue
+            name = ' '.join(name.split())[:self.MAX_TAG_LENGTH].strip()
+            if name and name not in seen:
+                seen.add(name)
+                normalized.append(name)
+        return normalized
+
+    def resolve_tags(self, names: Iterable[str]) -> List[Tag]:
+        """
+        Return Tag rows for the given names, creating any that do not exist.
+
+        Existing tags are fetched with one IN query and missing ones are created
+        with one INSERT ... ON CONFLICT DO NOTHING RETURNING, so concurrent writers
+        adding the same new tag cannot fail on the unique constraint. Runs inside
+        the caller's transaction.
+
+        Args:
+            names: Submitted tag names
+
+        Returns:
+            List of Tag objects in the order the names were submitted
+        """
+        names = self.normalize_tag_names(names)
+        if not names:
+            return []
+
+        tags_by_name = {
+            tag.name: tag for tag in Tag.query.filter(Tag.name.in_(names)).all()
+        }
+
+        missing = [name for name in names if name not in tags_by_name]
+        if missing:
+            created = db.session.scalars(
+                insert(Tag).values([{'name': name} for name in missing])
+                .on_conflict_do_nothing(index_elements=['name'])
+                .returning(Tag)
+            ).all()
+            tags_by_name.update({tag.name: tag for tag in created})
+
+            # Rows inserted by a concurrent writer are skipped by ON CONFLICT; pick them up
+            raced = [name for name in missing if name not in tags_by_name]
+            if raced:
+                tags_by_name.update({
+                    tag.name: tag for tag in Tag.query.filter(Tag.name.in_(raced)).all()
+                })
+
+        return [tags_by_name[name] for name in names if name in tags_by_name]
+
+
+# Global tag service instance
+tag_service = TagService()
@@ -0,0 +1,369 @@
+"""
+Home timeline service for the "following" feed.
+
+Publishing a post fans it out in the background into the home timeline of every
+follower of its author, a chunk of followers at a time. Authors with more than
+fanout_max_followers followers are not fanned out: their posts are flagged with
+Post.timeline_pull and merged into each reader's timeline at read time instead.
+
+Post.fanned_out_at is set once a fan-out completes. Jobs only live in the
+worker's in-process queue, so the worker also sweeps published posts still
+missing fanned_out_at, re-running fan-outs lost to a restart or crash.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+from server.database import db
+from server.models.post import Post
+from server.models.timeline import HomeTimelineEntry
+from server.models.user import UserFollow
+from server.utils.pagination import encode_cursor, decode_cursor, InvalidCursorError
+
+
+class TimelineService:
+    """Service maintaining and reading per-user home timelines."""
+
+    def __init__(self, fanout_max_followers=10000, chunk_size=1000, backfill_limit=50,
+                 sweep_interval=300, sweep_grace=timedelta(minutes=5)):
+        self.fanout_max_followers = fanout_max_followers
+        self.chunk_size = chunk_size
+        self.backfill_limit = backfill_limit
+        self.sweep_interval = sweep_interval
+        # Posts published more recently than this are left to their queued job
+        self.sweep_grace = sweep_grace
+        self.app = None
+        self.run_async = True
+        self.running = False
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._jobs = queue.Queue()
+        self._thread = None
+
+    def init_app(self, app):
+        """Bind the service to an app and start the background fan-out worker."""
+        if self.running:
+            return
+
+        self.app = app
+        self.fanout_max_followers = app.config.get('TIMELINE_FANOUT_MAX_FOLLOWERS', self.fanout_max_followers)
+        self.run_async = app.config.get('TIMELINE_FANOUT_ASYNC', True)
+        self.sweep_interval = app.config.get('TIMELINE_FANOUT_SWEEP_INTERVAL', self.sweep_interval)
+        if not self.run_async:
+            return
+
+        self.running = True
+        self._thread = threading.Thread(
+            target=self._worker,
+            name="TimelineFanout",
+            daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+        self.logger.info("Timeline fan-out worker started")
+
+    def stop(self):
+        """Stop the fan-out worker after it finishes the queued posts."""
+        if not self.running:
+            return
+        self.running = False
+        self._jobs.put(None)
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=10)
+
+    def publish(self, post_id):
+        """Schedule fan-out of a newly published post to its author's followers."""
+        if self.run_async and self.running:
+            self._jobs.put(str(post_id))
+        else:
+            self.fan_out(post_id)
+
+    def fan_out(self, post_id) -> Dict[str, Any]:
+        """
+        Write a published post into the home timelines of its author's followers.
+
+        Args:
+            post_id: ID of the published post
+
+        Returns:
+            Dict with the number of timelines written and whether the author was
+            switched to fan-out-on-read
+        """
+        try:
+            post = db.session.query(
+                Post.post_id, Post.author_id, Post.status, Post.published_at
+            ).filter(Post.post_id == post_id).first()
+            if not post or post.status != 'published' or not post.published_at:
+                return {'written': 0, 'pull': False}
+
+            # Authors with huge audiences are merged at read time rather than copied
+            sample = db.session.query(UserFollow.follow_id).filter(
+                UserFollow.following_id == post.author_id
+            ).limit(self.fanout_max_followers + 1).subquery()
+            follower_count = db.session.query(func.count()).select_from(sample).scalar()
+
+            if follower_count > self.fanout_max_followers:
+                db.session.query(Post).filter(Post.post_id == post.post_id).update(
+                    {Post.timeline_pull: True, Post.updated_at: Post.updated_at}, synchronize_session=False
+                )
+                db.session.commit()
+                self._insert_entries([post.author_id], post)
+                self._mark_fanned_out(post.post_id)
+                return {'written': 1, 'pull': True}
+
+            # The author sees their own posts in their timeline too
+            written = self._insert_entries([post.author_id], post)
+
+            last_follow_id = 0
+            while True:
+                chunk = db.session.query(
+                    UserFollow.follow_id, UserFollow.follower_id
+                ).filter(
+                    UserFollow.following_id == post.author_id,
+                    UserFollow.follow_id > last_follow_id
+                ).order_by(UserFollow.follow_id).limit(self.chunk_size).all()
+
+                if not chunk:
+                    break
+
+                written += self._insert_entries([row.follower_id for row in chunk], post)
+                last_follow_id = chunk[-1].follow_id
+
+            self._mark_fanned_out(post.post_id)
+            self.logger.info(f"Fanned out post {post_id} to {written} timelines")
+            return {'written': written, 'pull': False}
+
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Error in fan_out: {str(e)}")
+            raise
+
+    def _mark_fanned_out(self, post_id):
+        db.session.query(Post).filter(Post.post_id == post_id).update(
+            {Post.fanned_out_at: func.now(), Post.updated_at: Post.updated_at},
+            synchronize_session=False
+        )
+        db.session.commit()
+
+    def fan_out_pending(self, grace: Optional[timedelta] = None, limit: Optional[int] = None) -> Dict[str, int]:
+        """
+        Fan out published posts whose fan-out never completed.
+
+        Args:
+            grace: Skip posts published less than this long ago (default: sweep_grace)
+            limit: Maximum number of posts to fan out (default: all pending)
+
+        Returns:
+            Dict with the number of posts fanned out and failed
+        """
+        grace = self.sweep_grace if grace is None else grace
+        query = db.session.query(Post.post_id).filter(
+            Post.fanned_out_at.is_(None),
+            Post.status == 'published',
+            Post.published_at.isnot(None),
+            Post.published_at <= datetime.utcnow() - grace
+        ).order_by(Post.published_at)
+        if limit:
+            query = query.limit(limit)
+        post_ids = [row.post_id for row in query.all()]
+
+        fanned_out = failed = 0
+        for post_id in post_ids:
+            try:
+                self.fan_out(post_id)
+                fanned_out += 1
+            except Exception:
+                failed += 1
+        if post_ids:
+            self.logger.info(f"Swept {fanned_out} pending fan-outs ({failed} failed)")
+        return {'fanned_out': fanned_out, 'failed': failed}
+
+    def _insert_entries(self, user_ids: List[Any], post) -> int:
+        """Bulk insert one post into the given users' timelines, skipping existing entries."""
+        if not user_ids:
+            return 0
+        result = db.session.execute(
+            insert(HomeTimelineEntry).values([
+                {
+                    'user_id': user_id,
+                    'post_id': post.post_id,
+                    'author_id': post.author_id,
+                    'published_at': post.published_at
+                }
+                for user_id in user_ids
+            ]).on_conflict_do_nothing(index_elements=['user_id', 'post_id'])
+        )
+        db.session.commit()
+        return result.rowcount or 0
+
+    def on_follow(self, follower_id, following_id):
+        """Backfill a new follower's timeline with the author's most recent posts."""
+        try:
+            recent = db.session.query(
+                Post.post_id, Post.author_id, Post.published_at
+            ).filter(
+                Post.author_id == following_id,
+                Post.status == 'published',
+                Post.published_at.isnot(None),
+                Post.timeline_pull.is_(False)
+            ).order_by(Post.published_at.desc()).limit(self.backfill_limit).all()
+
+            if recent:
+                db.session.execute(
+                    insert(HomeTimelineEntry).values([
+                        {
+                            'user_id': follower_id,
+                            'post_id': post.post_id,
+                            'author_id': post.author_id,
+                            'published_at': post.published_at
+                        }
+                        for post in recent
+                    ]).on_conflict_do_nothing(index_elements=['user_id', 'post_id'])
+                )
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Error in on_follow: {str(e)}")
+
+    def on_unfollow(self, follower_id, following_id):
+        """Drop an author's posts from a former follower's timeline."""
+        try:
+            HomeTimelineEntry.query.filter_by(
+                user_id=follower_id,
+                author_id=following_id
+            ).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Error in on_unfollow: {str(e)}")
+
+    def get_timeline(self, user_id, cursor: Optional[str] = None, limit: int = 20) -> Dict[str, Any]:
+        """
+        Read one page of a user's home timeline, newest first.
+
+        Fanned-out entries and posts of followed fan-out-on-read authors are each
+        keyset paginated on (published_at, post_id) and merged.
+
+        Args:
+            user_id: ID of the reading user
+            cursor: next_cursor returned with the previous page
+            limit: Number of posts per page
+
+        Returns:
+            Dict with rows (post_id, comment_count, like_count), next_cursor and has_next
+        """
+        try:
+            after = decode_cursor(cursor, 'timeline', [datetime, uuid.UUID]) if cursor else None
+        except InvalidCursorError as e:
+            return {
+                'success': False,
+                'message': str(e),
+                'error': 'invalid_cursor'
+            }
+
+        try:
+            # Fan-out-on-write entries
+            pushed = db.session.query(
+                HomeTimelineEntry.published_at,
+                Post.post_id,
+                Post.comment_count,
+                Post.like_count
+            ).join(
+                Post, Post.post_id == HomeTimelineEntry.post_id
+            ).filter(
+                HomeTimelineEntry.user_id == user_id,
+                Post.status == 'published'
+            )
+            if after:
+                pushed = pushed.filter(tuple_(HomeTimelineEntry.published_at, HomeTimelineEntry.post_id) < tuple(after))
+            pushed = pushed.order_by(
+                HomeTimelineEntry.published_at.desc(), HomeTimelineEntry.post_id.desc()
+            ).limit(limit + 1).all()
+
+            # Fan-out-on-read posts of widely followed authors
+            pulled = db.session.query(
+                Post.published_at,
+                Post.post_id,
+                Post.comment_count,
+                Post.like_count
+            ).join(
+                UserFollow, UserFollow.following_id == Post.author_id
+            ).filter(
+                UserFollow.follower_id == user_id,
+                Post.timeline_pull.is_(True),
+                Post.status == 'published',
+                Post.published_at.isnot(None)
+            )
+            if after:
+                pulled = pulled.filter(tuple_(Post.published_at, Post.post_id) < tuple(after))
+            pulled = pulled.order_by(Post.published_at.desc(), Post.post_id.desc()).limit(limit + 1).all()
+
+            merged = {row.post_id: row for row in pushed + pulled}
+            rows = sorted(merged.values(), key=lambda row: (row.published_at, row.post_id), reverse=True)
+
+            has_next = len(rows) > limit
+            rows = rows[:limit]
+
+            next_cursor = None
+            if has_next:
+                last = rows[-1]
+                next_cursor = encode_cursor('timeline', [last.published_at, last.post_id])
+
+            return {
+                'success': True,
+                'rows': rows,
+                'next_cursor': next_cursor,
+                'has_next': has_next
+            }
+
+        except Exception as e:
+            self.logger.error(f"Error in get_timeline: {str(e)}")
+            return {
+                'success': False,
+                'message': f'Failed to load timeline: {str(e)}',
+                'error': 'get_timeline_failed'
+            }
+
+    def _sweep(self):
+        try:
+            with self.app.app_context():
+                try:
+                    self.fan_out_pending()
+                finally:
+                    db.session.remove()
+        except Exception as e:
+            self.logger.error(f"Timeline fan-out sweep error: {str(e)}")
+
+    def _worker(self):
+        """Background thread fanning out queued posts and sweeping pending ones when idle."""
+        self._sweep()
+        while True:
+            try:
+                post_id = self._jobs.get(timeout=self.sweep_interval)
+            except queue.Empty:
+                self._sweep()
+                continue
+            if post_id is None:
+                break
+            try:
+                with self.app.app_context():
+                    try:
+                        self.fan_out(post_id)
+                    finally:
+                        db.session.remove()
+            except Exception as e:
+                self.logger.error(f"Timeline fan-out error for post {post_id}: {str(e)}")
+            finally:
+                self._jobs.task_done()
+
+
+# Global timeline service instance
+timeline_service = TimelineService()
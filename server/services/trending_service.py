@@ -0,0 +1,161 @@
+"""
+Trending score service for ranking posts by time-decayed engagement.
+
+The score is log10(weighted engagement) + publish time / DECAY_SECONDS, so the
+decay is anchored to the publish date rather than to "now": an untouched post
+keeps a constant score while newer posts are born with higher ones. That lets
+the background refresh recompute only posts whose counters changed since the
+last run instead of rescoring the whole table.
+"""
+
+import atexit
+import logging
+import threading
+from datetime import timedelta
+from typing import Dict
+
+from sqlalchemy import func, cast, extract, update, Float
+
+from server.database import db
+from server.models.post import Post
+
+
+class TrendingService:
+    """Service maintaining Post.trending_score for sort_by=trending."""
+
+    VIEW_WEIGHT = 1
+    LIKE_WEIGHT = 5
+    COMMENT_WEIGHT = 10
+    # Every DECAY_SECONDS of recency is worth 10x the engagement
+    DECAY_SECONDS = 45000
+    # Re-scan a little before the previous run to catch transactions committed late
+    WATERMARK_OVERLAP = timedelta(minutes=1)
+
+    def __init__(self, refresh_interval=300, batch_size=1000):
+        self.refresh_interval = refresh_interval
+        self.batch_size = batch_size
+        self.app = None
+        self.running = False
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._watermark = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def score_expression(self):
+        """SQL expression computing a post's trending score from its stored counters."""
+        engagement = (
+            func.coalesce(Post.view_count, 0) * self.VIEW_WEIGHT
+            + Post.like_count * self.LIKE_WEIGHT
+            + Post.comment_count * self.COMMENT_WEIGHT
+        )
+        published_epoch = extract('epoch', func.coalesce(Post.published_at, Post.created_at))
+        return cast(
+            func.log(func.greatest(engagement, 1)) + published_epoch / self.DECAY_SECONDS,
+            Float
+        )
+
+    def seed_score(self, post_id):
+        """
+        Score a post as it is published, in the caller's transaction.
+
+        Uses the same expression as refresh(), so the post ranks under
+        sort_by=trending right away instead of at 0 until the next run.
+        """
+        db.session.flush()
+        db.session.execute(
+            update(Post).where(Post.post_id == post_id).values(
+                trending_score=self.score_expression(),
+                trending_updated_at=func.now(),
+                updated_at=Post.updated_at
+            ).execution_options(synchronize_session=False)
+        )
+
+    def refresh(self, full: bool = False) -> Dict[str, int]:
+        """
+        Recompute trending scores for published posts touched since the last run.
+
+        Args:
+            full: Rescore every published post regardless of activity
+
+        Returns:
+            Dict with the number of posts refreshed
+        """
+        try:
+            run_started = db.session.query(func.now()).scalar()
+
+            since = None
+            if not full:
+                since = self._watermark
+                if since is None:
+                    since = db.session.query(func.max(Post.trending_updated_at)).scalar()
+
+            query = db.session.query(Post.post_id).filter(Post.status == 'published')
+            if since is not None:
+                query = query.filter(Post.activity_at > since - self.WATERMARK_OVERLAP)
+            post_ids = [row.post_id for row in query.all()]
+
+            score = self.score_expression()
+            for i in range(0, len(post_ids), self.batch_size):
+                batch = post_ids[i:i + self.batch_size]
+                db.session.execute(
+                    update(Post).where(Post.post_id.in_(batch)).values(
+                        trending_score=score,
+                        trending_updated_at=func.now(),
+                        updated_at=Post.updated_at
+                    ).execution_options(synchronize_session=False)
+                )
+                db.session.commit()
+
+            self._watermark = run_started
+            if post_ids:
+                self.logger.info(f"Refreshed trending scores for {len(post_ids)} posts")
+            return {'refreshed': len(post_ids)}
+
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"Error in refresh: {str(e)}")
+            raise
+
+    def init_app(self, app):
+        """Bind the service to an app and start the periodic refresh."""
+        if self.running:
+            return
+
+        self.app = app
+        self.refresh_interval = app.config.get('TRENDING_REFRESH_INTERVAL', self.refresh_interval)
+        self.running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._worker,
+            name="TrendingRefresher",
+            daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+        self.logger.info(f"Trending refresher started (every {self.refresh_interval}s)")
+
+    def stop(self):
+        """Stop the periodic refresh."""
+        if not self.running:
+            return
+        self.running = False
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def _worker(self):
+        """Background thread refreshing scores every refresh_interval seconds."""
+        while not self._stop_event.wait(self.refresh_interval):
+            try:
+                with self.app.app_context():
+                    try:
+                        self.refresh()
+                    finally:
+                        db.session.remove()
+            except Exception as e:
+                self.logger.error(f"Trending refresher error: {str(e)}")
+
+
+# Global trending service instance
+trending_service = TrendingService()
@@ -0,0 +1,234 @@
+"""
+Write-behind view counter for posts and articles.
+
+Reads record a view increment in a buffer instead of updating the row, and a
+background thread flushes the accumulated increments to the database every
+few seconds with one batched UPDATE ... FROM (VALUES ...) per table.
+"""
+
+import atexit
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from typing import Dict
+
+from sqlalchemy import Integer, column, func, update, values
+from sqlalchemy.dialects.postgresql import UUID
+
+from server.database import db
+
+
+class ViewCounterBuffer:
+    """Buffers view increments in Redis (shared by all workers) or in process memory."""
+
+    REDIS_KEY_PREFIX = 'view_counts'
+    TABLES = ('posts', 'articles')
+
+    def __init__(self, flush_interval=5, chunk_size=1000, redis_client=None):
+        self.flush_interval = flush_interval
+        self.chunk_size = chunk_size
+        self.redis_client = redis_client
+        self.app = None
+        self.running = False
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._counts = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _get_redis_client(self):
+        """Get Redis client. Falls back to in-memory buffering if Redis unavailable."""
+        try:
+            import redis
+            client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
+            client.ping()  # Test connection
+            return client
+        except:
+            # Fallback to a per-process buffer
+            return None
+
+    def _targets(self):
+        """Tables whose view_count can be buffered: (model, id column, activity timestamp column)."""
+        from server.models.post import Post
+        from server.models.article import Article
+
+        return {
+            'posts': (Post, Post.post_id, Post.activity_at),
+            'articles': (Article, Article.article_id, None)
+        }
+
+    def init_app(self, app):
+        """Bind the buffer to an app and start the background flusher."""
+        if self.running:
+            return
+
+        self.app = app
+        self.flush_interval = app.config.get('VIEW_COUNT_FLUSH_INTERVAL', self.flush_interval)
+        if self.redis_client is None:
+            self.redis_client = self._get_redis_client()
+
+        self.running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._flusher,
+            name="ViewCounterFlusher",
+            daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+
+        backend = 'redis' if self.redis_client else 'memory'
+        self.logger.info(f"View counter started ({backend}, flushing every {self.flush_interval}s)")
+
+    def stop(self):
+        """Stop the background flusher and write out everything still buffered."""
+        if not self.running:
+            return
+        self.running = False
+        self._stop_event.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.flush_interval + 5)
+        self.flush()
+
+    def increment(self, table: str, row_id, amount: int = 1):
+        """Record views for a row; they reach the database on the next flush."""
+        key = str(row_id)
+        try:
+            if self.redis_client:
+                self.redis_client.hincrby(f"{self.REDIS_KEY_PREFIX}:{table}", key, amount)
+                return
+        except Exception as e:
+            self.logger.error(f"Redis view counter error, buffering in memory: {str(e)}")
+
+        with self._lock:
+            self._counts[table][key] += amount
+
+    def pending(self, table: str, row_id) -> int:
+        """Number of views recorded for a row that have not been flushed yet."""
+        key = str(row_id)
+        count = 0
+        try:
+            if self.redis_client:
+                count += int(self.redis_client.hget(f"{self.REDIS_KEY_PREFIX}:{table}", key) or 0)
+        except Exception as e:
+            self.logger.error(f"Redis view counter error: {str(e)}")
+
+        with self._lock:
+            count += self._counts.get(table, {}).get(key, 0)
+        return count
+
+    def flush(self) -> int:
+        """
+        Write buffered increments to the database.
+
+        Returns:
+            Number of rows updated
+        """
+        batches = self._drain()
+        if not batches:
+            return 0
+
+        if self.app is None:
+            self.logger.warning("View counter flushed before init_app; keeping increments buffered")
+            self._restore(batches)
+            return 0
+
+        updated = 0
+        with self.app.app_context():
+            targets = self._targets()
+            for table, counts in batches.items():
+                if table not in targets:
+                    self.logger.warning(f"Dropping view counts for unknown table {table}")
+                    continue
+                try:
+                    updated += self._write(targets[table], counts)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    self.logger.error(f"Error flushing view counts for {table}: {str(e)}")
+                    self._restore({table: counts})
+                finally:
+                    db.session.remove()
+
+        return updated
+
+    def _write(self, target, counts: Dict[str, int]) -> int:
+        """Apply one table's increments with UPDATE ... FROM (VALUES ...) in chunks."""
+        model, id_column, activity_column = target
+        items = [(uuid.UUID(row_id), delta) for row_id, delta in counts.items() if delta]
+        updated = 0
+
+        for i in range(0, len(items), self.chunk_size):
+            chunk = items[i:i + self.chunk_size]
+            increments = values(
+                column('row_id', UUID(as_uuid=True)),
+                column('delta', Integer),
+                name='increments'
+            ).data(chunk)
+
+            # Views are not edits: keep updated_at from being bumped by its onupdate
+            new_values = {
+                'view_count': func.coalesce(model.view_count, 0) + increments.c.delta,
+                'updated_at': model.updated_at
+            }
+            if activity_column is not None:
+                new_values[activity_column.key] = func.now()
+            
+            result = db.session.execute(
+                update(model)
+                .where(id_column == increments.c.row_id)
+                .values(**new_values)
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount or 0
+
+        return updated
+
+    def _drain(self) -> Dict[str, Dict[str, int]]:
+        """Atomically take everything buffered so far, leaving the buffer empty."""
+        batches = defaultdict(dict)
+
+        with self._lock:
+            for table, counts in self._counts.items():
+                if counts:
+                    batches[table].update(counts)
+            self._counts = defaultdict(lambda: defaultdict(int))
+
+        if self.redis_client:
+            try:
+                for table in self.TABLES:
+                    key = f"{self.REDIS_KEY_PREFIX}:{table}"
+                    flushing_key = f"{key}:flushing:{uuid.uuid4().hex}"
+                    # RENAME is atomic, so concurrent HINCRBYs land in a fresh hash
+                    try:
+                        self.redis_client.rename(key, flushing_key)
+                    except Exception:
+                        continue  # Nothing buffered for this table
+                    for row_id, delta in self.redis_client.hgetall(flushing_key).items():
+                        batches[table][row_id] = batches[table].get(row_id, 0) + int(delta)
+                    self.redis_client.delete(flushing_key)
+            except Exception as e:
+                self.logger.error(f"Error draining Redis view counts: {str(e)}")
+
+        return {table: counts for table, counts in batches.items() if counts}
+
+    def _restore(self, batches: Dict[str, Dict[str, int]]):
+        """Put increments back into the in-memory buffer after a failed flush."""
+        with self._lock:
+            for table, counts in batches.items():
+                for row_id, delta in counts.items():
+                    self._counts[table][row_id] += delta
+
+    def _flusher(self):
+        """Background thread flushing the buffer every flush_interval seconds."""
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.error(f"View counter flusher error: {str(e)}")
+
+
+# Global view counter instance
+view_counter = ViewCounterBuffer()
@@ -237,4 +237,23 @@ def test_delete_article_unauthorized(client, auth_tokens, app):
             headers={'Authorization': f'Bearer {auth_tokens["expert"]}'}  # Different user
         )
         
-        assert response.status_code == 403
\ No newline at end of file
+        assert response.status_code == 403
+
+
+def test_get_articles_full_text_search(client, app):
+    """Test that article search matches stemmed words in title and content."""
+    with app.app_context():
+        user = User.query.filter_by(email='farmer@example.com').first()
+        db.session.add_all([
+            Article(title='Composting at home', content='<p>Turn the pile weekly</p>',
+                    author_id=user.user_id, status='published'),
+            Article(title='Crop rotation', content='<p>Rotating crops restores soil nutrients</p>',
+                    author_id=user.user_id, status='published')
+        ])
+        db.session.commit()
+        
+        response = client.get('/api/articles?search=rotate&sort_by=relevance')
+        
+        assert response.status_code == 200
+        json_data = json.loads(response.data)
+        assert [a['title'] for a in json_data['articles']] == ['Crop rotation']
@@ -134,6 +134,132 @@ def test_join_community(client, auth_tokens, test_community):
     json_data = json.loads(response.data)
     assert json_data['is_member'] == True
 
+def test_join_and_leave_maintain_member_count(app, client, auth_tokens, test_community):
+    """Test that joining and leaving keep the denormalized member count in step."""
+    from server.services.community_service import community_service
+
+    # Fixture rows are inserted directly, so bring the counter in line first
+    with app.app_context():
+        community_service.reconcile_member_counts()
+
+    url = f'/api/communities/{test_community["community_id"]}'
+    response = client.get(url, headers={'Authorization': f'Bearer {auth_tokens["admin"]}'})
+    before = json.loads(response.data)['member_count']
+
+    response = client.post(f'{url}/join', headers={'Authorization': f'Bearer {auth_tokens["admin"]}'})
+    assert response.status_code == 200
+    assert json.loads(response.data)['member_count'] == before + 1
+
+    response = client.get('/api/communities', headers={'Authorization': f'Bearer {auth_tokens["admin"]}'})
+    listed = next(
+        c for c in json.loads(response.data)['communities']
+        if c['community_id'] == test_community['community_id']
+    )
+    assert listed['member_count'] == before + 1
+    assert listed['is_member'] == True
+    assert listed['member_role'] == 'member'
+
+    response = client.post(f'{url}/leave', headers={'Authorization': f'Bearer {auth_tokens["admin"]}'})
+    assert response.status_code == 200
+    assert json.loads(response.data)['member_count'] == before
+
+    # Leaving twice is rejected and does not drift the count
+    response = client.post(f'{url}/leave', headers={'Authorization': f'Bearer {auth_tokens["admin"]}'})
+    assert response.status_code == 400
+
+    with app.app_context():
+        assert community_service.reconcile_member_counts()['repaired'] == 0
+
+def test_member_ban_invalidates_cached_access(app, client, auth_tokens, test_community):
+    """Test that a role/status change takes effect despite the membership cache."""
+    from server.models.user import User
+
+    with app.app_context():
+        admin_id = str(User.query.filter_by(email='admin@example.com').first().user_id)
+
+    url = f'/api/communities/{test_community["community_id"]}'
+    post_data = json.dumps({'content': 'Posting before the ban'})
+
+    client.post(f'{url}/join', headers={'Authorization': f'Bearer {auth_tokens["admin"]}'})
+
+    # Warm the access cache as the member
+    response = client.post(
+        f'{url}/posts', data=post_data, content_type='application/json',
+        headers={'Authorization': f'Bearer {auth_tokens["admin"]}'}
+    )
+    assert response.status_code == 201
+
+    # The farmer is the community admin
+    response = client.put(
+        f'{url}/members/{admin_id}', data=json.dumps({'status': 'banned'}), content_type='application/json',
+        headers={'Authorization': f'Bearer {auth_tokens["farmer"]}'}
+    )
+    assert response.status_code == 200
+    assert json.loads(response.data)['member']['status'] == 'banned'
+
+    response = client.post(
+        f'{url}/posts', data=post_data, content_type='application/json',
+        headers={'Authorization': f'Bearer {auth_tokens["admin"]}'}
+    )
+    assert response.status_code == 403
+
+    # Only community admins may change members
+    response = client.put(
+        f'{url}/members/{admin_id}', data=json.dumps({'status': 'active'}), content_type='application/json',
+        headers={'Authorization': f'Bearer {auth_tokens["expert"]}'}
+    )
+    assert response.status_code == 403
+
+def test_banned_member_loses_private_access_and_count(app, client, auth_tokens, test_community, test_post):
+    """Test that a ban blocks reads and likes in a private community and is excluded from member_count."""
+    from server.models.user import User
+    from server.services.community_service import community_service
+
+    with app.app_context():
+        admin_id = str(User.query.filter_by(email='admin@example.com').first().user_id)
+
+    url = f'/api/communities/{test_community["community_id"]}'
+    farmer_headers = {'Authorization': f'Bearer {auth_tokens["farmer"]}'}
+    admin_headers = {'Authorization': f'Bearer {auth_tokens["admin"]}'}
+
+    # The farmer is the community admin; make the community private and approve the join request
+    response = client.put(url, data=json.dumps({'is_private': True}), content_type='application/json',
+                          headers=farmer_headers)
+    assert response.status_code == 200
+    response = client.post(f'{url}/join', headers=admin_headers)
+    assert json.loads(response.data)['status'] == 'pending'
+    member_count = json.loads(response.data)['member_count']
+    client.put(f'{url}/members/{admin_id}', data=json.dumps({'status': 'active'}),
+               content_type='application/json', headers=farmer_headers)
+
+    response = client.get(f'{url}/posts', headers=admin_headers)
+    assert response.status_code == 200
+
+    response = client.put(f'{url}/members/{admin_id}', data=json.dumps({'status': 'banned'}),
+                          content_type='application/json', headers=farmer_headers)
+    assert response.status_code == 200
+
+    response = client.get(f'{url}/posts', headers=admin_headers)
+    assert response.status_code == 403
+    response = client.get(f'{url}/posts/{test_post["post_id"]}', headers=admin_headers)
+    assert response.status_code == 403
+    response = client.post(f'{url}/posts/{test_post["post_id"]}/like', headers=admin_headers)
+    assert response.status_code == 403
+
+    response = client.get(url, headers=admin_headers)
+    assert json.loads(response.data)['recent_posts'] == []
+    response = client.get(url, headers=farmer_headers)
+    assert json.loads(response.data)['member_count'] == member_count - 1
+
+    # Lifting the ban counts the member again
+    client.put(f'{url}/members/{admin_id}', data=json.dumps({'status': 'active'}),
+               content_type='application/json', headers=farmer_headers)
+    response = client.get(url, headers=farmer_headers)
+    assert json.loads(response.data)['member_count'] == member_count
+
+    with app.app_context():
+        assert community_service.reconcile_member_counts()['repaired'] == 0
+
 def test_get_community_posts(client, auth_tokens, test_community):
     """Test getting posts for a community."""
     # Send request
@@ -150,6 +276,87 @@ def test_get_community_posts(client, auth_tokens, test_community):
     assert len(json_data['posts']) > 0
     assert 'pagination' in json_data
 
+def test_get_community_posts_cursor_and_compact(app, client, auth_tokens, test_community):
+    """Test keyset paging, the compact representation and include_total=false."""
+    from server.database import db
+    from server.models.community import CommunityPost
+    from server.models.user import User
+
+    with app.app_context():
+        farmer = User.query.filter_by(email='farmer@example.com').first()
+        for i in range(3):
+            db.session.add(CommunityPost(
+                community_id=test_community['community_id'], user_id=farmer.user_id, content='x' * 300 + str(i)
+            ))
+        db.session.commit()
+        total = CommunityPost.query.filter_by(community_id=test_community['community_id']).count()
+
+    url = f'/api/communities/{test_community["community_id"]}/posts'
+    headers = {'Authorization': f'Bearer {auth_tokens["farmer"]}'}
+
+    seen = []
+    response = client.get(f'{url}?cursor=&per_page=2&compact=true', headers=headers)
+    while True:
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert 'total_items' not in data['pagination']
+        seen.extend(post['post_id'] for post in data['posts'])
+        if not data['pagination']['next_cursor']:
+            break
+        response = client.get(f"{url}?cursor={data['pagination']['next_cursor']}&per_page=2&compact=true", headers=headers)
+
+    assert len(seen) == total
+    assert len(set(seen)) == total
+
+    response = client.get(f'{url}?cursor=&per_page=1&compact=true', headers=headers)
+    post = json.loads(response.data)['posts'][0]
+    assert post['content_truncated'] == True
+    assert len(post['content']) <= 281
+    assert 'like_count' in post and 'updated_at' not in post
+
+    response = client.get(f'{url}?per_page=2&include_total=false', headers=headers)
+    data = json.loads(response.data)
+    assert 'total_items' not in data['pagination']
+    assert data['pagination']['has_next'] == True
+
+    response = client.get(f'{url}?cursor=not-a-cursor', headers=headers)
+    assert response.status_code == 400
+
+def test_serialize_posts_batches_counts_and_likes(app, test_post):
+    """Test that the batch serializer resolves counts and the viewer's likes per post."""
+    from server.database import db
+    from server.models.community import CommunityPost, PostLike, PostComment
+    from server.models.user import User
+    from server.services.community_service import community_service
+
+    with app.app_context():
+        post = CommunityPost.query.get(test_post['post_id'])
+        farmer = User.query.filter_by(email='farmer@example.com').first()
+        expert = User.query.filter_by(email='expert@example.com').first()
+
+        if not PostLike.query.filter_by(post_id=post.post_id, user_id=expert.user_id).first():
+            db.session.add(PostLike(post_id=post.post_id, user_id=expert.user_id))
+        db.session.add(PostComment(post_id=post.post_id, user_id=expert.user_id, content='Batch comment'))
+        db.session.commit()
+
+        expected_likes = PostLike.query.filter_by(post_id=post.post_id).count()
+        expected_comments = PostComment.query.filter_by(post_id=post.post_id).count()
+
+        as_expert = community_service.serialize_posts([post], viewer_id=expert.user_id, include_comments=True)[0]
+        assert as_expert['like_count'] == expected_likes
+        assert as_expert['comment_count'] == expected_comments
+        assert as_expert['user_has_liked'] == True
+        assert len(as_expert['comments']) == expected_comments
+        assert as_expert['user']['user_id'] == str(post.user_id)
+
+        as_farmer = community_service.serialize_posts([post], viewer_id=farmer.user_id)[0]
+        assert as_farmer['user_has_liked'] == (
+            PostLike.query.filter_by(post_id=post.post_id, user_id=farmer.user_id).count() > 0
+        )
+        assert 'comments' not in as_farmer
+
+        assert community_service.serialize_posts([]) == []
+
 def test_create_community_post(client, auth_tokens, test_community):
     """Test creating a post in a community."""
     # Create test data
@@ -255,4 +462,84 @@ def test_post_interactions(client, auth_tokens, test_community, test_post):
     assert response.status_code == 200
     json_data = json.loads(response.data)
     assert 'message' in json_data
-    assert json_data['message'] == 'Comment updated successfully'
\ No newline at end of file
+    assert json_data['message'] == 'Comment updated successfully'
+
+
+def test_delete_community_sync_and_chunked_job(app, client, auth_tokens):
+    """Test set-based community deletion, inline and through a chunked deletion job."""
+    from server.database import db
+    from server.models.community import (
+        Community, CommunityMember, CommunityPost, PostLike, PostComment, CommunityDeletionJob
+    )
+    from server.models.user import User
+    from server.services.community_deletion_service import community_deletion_service
+
+    def make_community(name, posts):
+        farmer = User.query.filter_by(email='farmer@example.com').first()
+        community = Community(
+            name=name, community_type='Regional', location_country='Test Country',
+            created_by=farmer.user_id, member_count=1
+        )
+        db.session.add(community)
+        db.session.flush()
+        db.session.add(CommunityMember(
+            community_id=community.community_id, user_id=farmer.user_id, role='admin', status='active'
+        ))
+        for i in range(posts):
+            post = CommunityPost(community_id=community.community_id, user_id=farmer.user_id, content=f'Post {i}')
+            db.session.add(post)
+            db.session.flush()
+            db.session.add(PostLike(post_id=post.post_id, user_id=farmer.user_id))
+            db.session.add(PostComment(post_id=post.post_id, user_id=farmer.user_id, content='Comment'))
+        db.session.commit()
+        return community.community_id
+
+    with app.app_context():
+        small_id = make_community('Small Community', 3)
+
+    response = client.delete(
+        f'/api/communities/{small_id}',
+        headers={'Authorization': f'Bearer {auth_tokens["farmer"]}'}
+    )
+    assert response.status_code == 200
+
+    with app.app_context():
+        assert Community.query.get(small_id) is None
+        assert CommunityPost.query.filter_by(community_id=small_id).count() == 0
+
+        large_id = make_community('Large Community', 5)
+        Community.query.get(large_id).deleting = True
+        job = CommunityDeletionJob(community_id=large_id, total_posts=5)
+        db.session.add(job)
+        db.session.commit()
+        job_id = job.job_id
+        post_ids = [p.post_id for p in CommunityPost.query.filter_by(community_id=large_id).all()]
+
+        # Communities being deleted are hidden from readers
+        assert client.get(
+            f'/api/communities/{large_id}/posts',
+            headers={'Authorization': f'Bearer {auth_tokens["farmer"]}'}
+        ).status_code == 404
+
+        batch_size = community_deletion_service.batch_size
+        community_deletion_service.batch_size = 2
+        try:
+            result = community_deletion_service.run_job(job_id)
+        finally:
+            community_deletion_service.batch_size = batch_size
+
+        assert result['success']
+        assert result['job']['status'] == 'completed'
+        assert result['job']['deleted_posts'] == 5
+        assert result['job']['progress'] == 1.0
+        assert Community.query.get(large_id) is None
+        assert CommunityMember.query.filter_by(community_id=large_id).count() == 0
+        assert PostLike.query.filter(PostLike.post_id.in_(post_ids)).count() == 0
+        assert PostComment.query.filter(PostComment.post_id.in_(post_ids)).count() == 0
+
+    response = client.get(
+        f'/api/communities/deletions/{job_id}',
+        headers={'Authorization': f'Bearer {auth_tokens["admin"]}'}
+    )
+    assert response.status_code == 200
+    assert json.loads(response.data)['data']['job']['status'] == 'completed'
@@ -0,0 +1,315 @@
+import pytest
+
+from server.database import db
+from server.models.user import User, UserFollow
+from server.services.follow_service import follow_service
+
+
+@pytest.fixture(scope='function')
+def follow_users(app):
+    """Get the farmer, expert and admin users created by the shared test data."""
+    with app.app_context():
+        return {
+            'farmer': User.query.filter_by(email='farmer@example.com').first(),
+            'expert': User.query.filter_by(email='expert@example.com').first(),
+            'admin': User.query.filter_by(email='admin@example.com').first()
+        }
+
+
+def test_following_set_resolves_page_in_one_call(app, follow_users):
+    """Test that following_set returns only the followed candidates."""
+    farmer = follow_users['farmer']
+    expert = follow_users['expert']
+    admin = follow_users['admin']
+    
+    db.session.add(UserFollow(follower_id=farmer.user_id, following_id=expert.user_id))
+    db.session.commit()
+    
+    result = follow_service.following_set(
+        str(farmer.user_id),
+        [expert.user_id, admin.user_id, expert.user_id]
+    )
+    
+    assert result == {str(expert.user_id)}
+    assert follow_service.following_set(str(farmer.user_id), []) == set()
+
+
+def test_following_feed_merges_pushed_and_pulled_posts(client, app, follow_users, auth_tokens):
+    """Test the following feed returns fanned-out posts and fan-out-on-read posts newest first."""
+    from datetime import datetime, timedelta
+    from server.models.post import Post
+    from server.services.timeline_service import timeline_service
+    
+    farmer = follow_users['farmer']
+    expert = follow_users['expert']
+    admin = follow_users['admin']
+    
+    follow_service.follow_user(str(farmer.user_id), str(expert.user_id))
+    follow_service.follow_user(str(farmer.user_id), str(admin.user_id))
+    
+    now = datetime.utcnow()
+    expert_post = Post(title='Expert tip', content='Rotate crops', author_id=expert.user_id,
+                       status='published', published_at=now - timedelta(minutes=10))
+    admin_post = Post(title='Admin notice', content='Maintenance window', author_id=admin.user_id,
+                      status='published', published_at=now - timedelta(minutes=5))
+    db.session.add_all([expert_post, admin_post])
+    db.session.commit()
+    
+    assert timeline_service.fan_out(expert_post.post_id)['pull'] is False
+    
+    # Pretend the admin is too widely followed to fan out
+    previous_limit = timeline_service.fanout_max_followers
+    timeline_service.fanout_max_followers = 0
+    try:
+        assert timeline_service.fan_out(admin_post.post_id)['pull'] is True
+    finally:
+        timeline_service.fanout_max_followers = previous_limit
+    
+    headers = {'Authorization': f"Bearer {auth_tokens['farmer']}"}
+    response = client.get('/api/posts/following?per_page=1', headers=headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [p['title'] for p in data['data']] == ['Admin notice']
+    assert data['pagination']['has_next'] is True
+    
+    response = client.get(f"/api/posts/following?per_page=1&cursor={data['pagination']['next_cursor']}", headers=headers)
+    data = response.get_json()
+    assert [p['title'] for p in data['data']] == ['Expert tip']
+    assert data['pagination']['has_next'] is False
+    
+    # Unfollowing removes the author's fanned-out posts
+    follow_service.unfollow_user(str(farmer.user_id), str(expert.user_id))
+    response = client.get('/api/posts/following', headers=headers)
+    assert [p['title'] for p in response.get_json()['data']] == ['Admin notice']
+
+
+def test_pending_fan_outs_are_swept(app, follow_users):
+    """Test a post whose queued fan-out was lost reaches follower timelines on the next sweep."""
+    from datetime import datetime, timedelta
+    from server.models.post import Post
+    from server.models.timeline import HomeTimelineEntry
+    from server.services.timeline_service import timeline_service
+    
+    farmer = follow_users['farmer']
+    expert = follow_users['expert']
+    
+    follow_service.follow_user(str(farmer.user_id), str(expert.user_id))
+    
+    # Published, but the worker never got to it
+    post = Post(title='Lost fan-out', content='Queued before a restart', author_id=expert.user_id,
+                status='published', published_at=datetime.utcnow() - timedelta(minutes=10))
+    db.session.add(post)
+    db.session.commit()
+    assert post.fanned_out_at is None
+    
+    assert timeline_service.fan_out_pending() == {'fanned_out': 1, 'failed': 0}
+    assert HomeTimelineEntry.query.filter_by(user_id=farmer.user_id, post_id=post.post_id).count() == 1
+    assert db.session.get(Post, post.post_id).fanned_out_at is not None
+    
+    # Nothing is left pending
+    assert timeline_service.fan_out_pending() == {'fanned_out': 0, 'failed': 0}
+
+
+def test_followers_listing_joins_follow_rows_and_pages_by_cursor(app, follow_users):
+    """Test followers come with their follow row data and can be keyset-paged."""
+    farmer = follow_users['farmer']
+    expert = follow_users['expert']
+    admin = follow_users['admin']
+    
+    follow_service.follow_user(str(farmer.user_id), str(expert.user_id))
+    follow_service.follow_user(str(admin.user_id), str(expert.user_id), notification_enabled=False)
+    
+    result = follow_service.get_followers(str(expert.user_id), per_page=1, cursor='')
+    assert result['success']
+    assert 'total' not in result['pagination']
+    assert result['pagination']['has_next'] is True
+    first = result['followers'][0]
+    assert first['followed_at'] is not None
+    
+    result = follow_service.get_followers(
+        str(expert.user_id), per_page=1, cursor=result['pagination']['next_cursor'], include_total=True
+    )
+    second = result['followers'][0]
+    assert result['pagination']['total'] == 2
+    assert result['pagination']['has_next'] is False
+    assert {first['user_id'], second['user_id']} == {str(farmer.user_id), str(admin.user_id)}
+    
+    by_id = {f['user_id']: f for f in (first, second)}
+    assert by_id[str(admin.user_id)]['notification_enabled'] is False
+    
+    result = follow_service.get_following(str(admin.user_id))
+    assert [u['user_id'] for u in result['following']] == [str(expert.user_id)]
+    assert result['pagination']['total'] == 1
+    
+    assert follow_service.get_followers(str(expert.user_id), cursor='bogus')['error'] == 'invalid_cursor'
+
+
+def test_notify_followers_inserts_in_chunks_and_enqueues(app, follow_users):
+    """Test follower notifications are bulk-inserted per chunk and enqueued for delivery."""
+    from unittest.mock import patch
+    from server.models.notifications import Notification
+    from server.services.notification_queue import notification_queue
+    
+    farmer = follow_users['farmer']
+    expert = follow_users['expert']
+    admin = follow_users['admin']
+    
+    follow_service.follow_user(str(farmer.user_id), str(expert.user_id))
+    follow_service.follow_user(str(admin.user_id), str(expert.user_id))
+    enabled = UserFollow.query.filter_by(following_id=expert.user_id, notification_enabled=True).count()
+    
+    # The queue's workers drain it concurrently, so record what is enqueued instead of its depth
+    chunk_size = follow_service.notify_chunk_size
+    follow_service.notify_chunk_size = 1
+    try:
+        with patch.object(notification_queue, 'enqueue_bulk_notifications') as enqueue:
+            created = follow_service.notify_followers(
+                str(expert.user_id), 'new_post', {'post_id': 'p1', 'title': 'Soil health'}
+            )
+    finally:
+        follow_service.notify_chunk_size = chunk_size
+    
+    assert created == enabled
+    # One bulk enqueue per chunk of one
+    assert enqueue.call_count == enabled
+    enqueued_ids = {notification_id for call in enqueue.call_args_list for notification_id in call.args[0]}
+    
+    notifications = Notification.query.filter(
+        Notification.type == 'new_post',
+        Notification.user_id.in_([farmer.user_id, admin.user_id])
+    ).all()
+    assert len(notifications) >= 2
+    assert all(n.status == 'pending' and 'Soil health' in n.message for n in notifications)
+    assert {str(n.notification_id) for n in notifications} <= enqueued_ids
+    assert len(enqueued_ids) == enabled
+
+
+def test_follow_counts_track_follow_and_unfollow(app, follow_users):
+    """Test follower/following counters move with follows and reconcile finds no drift."""
+    farmer = follow_users['farmer']
+    admin = follow_users['admin']
+    
+    # Shared test data inserts rows directly, so start from reconciled counters
+    follow_service.reconcile_counts()
+    before = follow_service.get_follow_stats(str(admin.user_id))['stats']
+    following_before = follow_service.get_follow_stats(str(farmer.user_id))['stats']['following']
+    
+    follow_service.unfollow_user(str(farmer.user_id), str(admin.user_id))
+    assert follow_service.follow_user(str(farmer.user_id), str(admin.user_id))['success']
+    stats = follow_service.get_follow_stats(str(admin.user_id))['stats']
+    assert stats['followers'] == UserFollow.query.filter_by(following_id=admin.user_id).count()
+    
+    assert follow_service.unfollow_user(str(farmer.user_id), str(admin.user_id))['success']
+    stats = follow_service.get_follow_stats(str(admin.user_id))['stats']
+    assert stats['followers'] == UserFollow.query.filter_by(following_id=admin.user_id).count()
+    assert stats['following'] == before['following']
+    assert follow_service.get_follow_stats(str(farmer.user_id))['stats']['following'] <= following_before
+    
+    assert follow_service.reconcile_counts()['repaired'] == 0
+
+
+def test_follow_graph_answers_two_hop_queries(app, follow_users):
+    """Test the in-memory follow graph tracks follows and answers mutual/two-hop queries."""
+    from server.services.follow_graph import follow_graph
+    
+    farmer = follow_users['farmer']
+    expert = follow_users['expert']
+    admin = follow_users['admin']
+    
+    # Start from a known graph: drop whatever the shared test data created
+    UserFollow.query.delete()
+    db.session.commit()
+    follow_graph.rebuild()
+    
+    follow_service.follow_user(str(farmer.user_id), str(expert.user_id))
+    follow_service.follow_user(str(expert.user_id), str(farmer.user_id))
+    follow_service.follow_user(str(expert.user_id), str(admin.user_id))
+    
+    assert follow_graph.mutual_follows(farmer.user_id) == [str(expert.user_id)]
+    assert follow_graph.followed_by_following(farmer.user_id, admin.user_id) == [str(expert.user_id)]
+    assert follow_graph.second_degree(farmer.user_id) == [(str(admin.user_id), 1)]
+    
+    result = follow_service.get_mutual_follows(str(expert.user_id))
+    assert result['total'] == 1
+    assert result['users'][0]['user_id'] == str(farmer.user_id)
+    
+    follow_service.unfollow_user(str(expert.user_id), str(farmer.user_id))
+    assert follow_graph.mutual_follows(farmer.user_id) == []
+    
+    # A rebuild from the table agrees with the incrementally maintained graph
+    assert follow_graph.rebuild() == {'users': 3, 'edges': 2}
+    assert follow_graph.second_degree(farmer.user_id) == [(str(admin.user_id), 1)]
+
+
+def test_suggestions_rank_by_shared_crops_location_and_graph(app, follow_users):
+    """Test suggestions score shared crops/specializations, location and follow paths."""
+    from server.models.crop import Crop, UserCrop
+    from server.services.follow_graph import follow_graph
+    from server.services.suggestion_service import suggestion_service
+    
+    farmer = follow_users['farmer']
+    expert = follow_users['expert']
+    admin = follow_users['admin']
+    
+    UserFollow.query.delete()
+    corn = Crop(name='Corn')
+    neighbour = User(email='neighbour@example.com', password='securepassword', first_name='Near',
+                     last_name='Farmer', role='farmer', location_id=farmer.location_id)
+    db.session.add_all([corn, neighbour])
+    db.session.flush()
+    db.session.add(UserCrop(user_id=farmer.user_id, crop_id=corn.crop_id))
+    db.session.commit()
+    follow_graph.rebuild()
+    suggestion_service.refresh_features()
+    
+    result = suggestion_service.get_suggestions(str(farmer.user_id))
+    assert result['success']
+    by_id = {s['user_id']: s for s in result['suggestions']}
+    # Admins are not suggested, nor is the caller
+    assert set(by_id) == {str(expert.user_id), str(neighbour.user_id)}
+    assert by_id[str(expert.user_id)]['shared_interests'] == ['corn']
+    assert by_id[str(neighbour.user_id)]['reasons'] == ['same_location']
+    
+    # The admin follows the expert, so the neighbour following the admin gets the expert via the graph
+    follow_service.follow_user(str(neighbour.user_id), str(admin.user_id))
+    follow_service.follow_user(str(admin.user_id), str(expert.user_id))
+    result = suggestion_service.get_suggestions(str(neighbour.user_id))
+    expert_suggestion = next(s for s in result['suggestions'] if s['user_id'] == str(expert.user_id))
+    assert 'followed_by_following' in expert_suggestion['reasons']
+    assert expert_suggestion['mutual_connections'] == 1
+    
+    # Followed users drop out of the suggestions
+    follow_service.follow_user(str(farmer.user_id), str(expert.user_id))
+    result = suggestion_service.get_suggestions(str(farmer.user_id))
+    assert [s['user_id'] for s in result['suggestions']] == [str(neighbour.user_id)]
+
+
+def test_crop_change_invalidates_cached_suggestions(client, app, follow_users, auth_tokens):
+    """Test adding a crop drops the cached ranking and uses the new crop before the next refresh."""
+    from server.models.crop import Crop
+    from server.services.suggestion_service import suggestion_service
+    
+    farmer = follow_users['farmer']
+    expert = follow_users['expert']
+    
+    corn = Crop(name='Corn')
+    db.session.add(corn)
+    db.session.commit()
+    suggestion_service.refresh_features()
+    
+    suggestion_service.cache_ttl = 600
+    try:
+        result = suggestion_service.get_suggestions(str(farmer.user_id))
+        by_id = {s['user_id']: s for s in result['suggestions']}
+        assert by_id[str(expert.user_id)]['shared_interests'] == []
+        
+        headers = {'Authorization': f"Bearer {auth_tokens['farmer']}"}
+        response = client.post('/api/user-crops', json={'crop_id': corn.crop_id}, headers=headers)
+        assert response.status_code == 201
+        
+        result = suggestion_service.get_suggestions(str(farmer.user_id))
+        by_id = {s['user_id']: s for s in result['suggestions']}
+        assert by_id[str(expert.user_id)]['shared_interests'] == ['corn']
+    finally:
+        suggestion_service.cache_ttl = 0
+        suggestion_service.clear_cache()
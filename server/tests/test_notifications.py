@@ -16,7 +16,7 @@ from server.models.notifications import Notification, NotificationPreferences, N
 from server.services.notification_service import (
     notification_service, NotificationChannel, NotificationStatus, NotificationPriority
 )
-from server.services.notification_queue import notification_queue, batch_processor
+from server.services.notification_queue import notification_queue, batch_processor, PriorityLanes, TimingWheel
 from server.controllers.notifications_controller import notification_controller
 
 
@@ -271,6 +271,133 @@ class TestNotificationQueue:
         assert 'failed' in stats
         assert 'success_rate' in stats
     
+    def test_process_notification_reuses_bound_app(self, app, test_notification):
+        """Test workers push a context on the queue's app instead of creating one per job."""
+        import threading
+        
+        assert notification_queue.app is app
+        results = []
+        
+        def process():
+            # Worker threads have no app context of their own
+            results.append(notification_queue._process_notification(str(test_notification.notification_id)))
+        
+        with patch('server.create_app', side_effect=AssertionError('create_app called per job')), \
+                patch.object(notification_service, 'send_notification',
+                             new=AsyncMock(return_value=[Mock(success=True)])):
+            worker = threading.Thread(target=process)
+            worker.start()
+            worker.join()
+        
+        assert results == [True]
+    
+    def test_priority_lanes_serve_urgent_first_without_starving_low(self):
+        """Test urgent items jump the backlog and low priority items still get picked."""
+        lanes = PriorityLanes()
+        for i in range(20):
+            lanes.put({'notification_id': f'normal-{i}', 'priority': 'normal'})
+            lanes.put({'notification_id': f'low-{i}', 'priority': 'low'})
+        lanes.put({'notification_id': 'urgent-0', 'priority': 'urgent'})
+        
+        picked = [lanes.get(timeout=0)['notification_id'] for _ in range(9)]
+        
+        # Urgent first, then normal and low share the workers 2:1
+        assert picked[0] == 'urgent-0'
+        assert [item.split('-')[0] for item in picked[1:]] == ['normal', 'normal', 'low'] * 2 + ['normal', 'normal']
+        stats = lanes.lane_stats()
+        assert stats['urgent']['dequeued'] == 1
+        assert stats['low']['depth'] == 18
+        assert lanes.qsize() == 32
+    
+    def test_claim_batch_leases_rows_to_one_worker(self, app, test_user):
+        """Test database claims skip leased and future rows and reclaim expired leases."""
+        due = [
+            Notification(user_id=test_user.user_id, type='claim_test', title=f'Claim {priority}',
+                         message='Claim me', channels=['in_app'], priority=priority)
+            for priority in ('urgent', 'normal', 'low')
+        ]
+        later = Notification(user_id=test_user.user_id, type='claim_test', title='Later', message='Not yet',
+                             channels=['in_app'], scheduled_at=datetime.utcnow() + timedelta(hours=1))
+        db.session.add_all(due + [later])
+        db.session.commit()
+        
+        claimed = notification_queue.claim_batch('worker-a', limit=10)
+        assert set(claimed) == {str(n.notification_id) for n in due}
+        assert notification_queue.claim_batch('worker-b', limit=10) == []
+        
+        # worker-a finishes one notification and dies holding the others
+        notification_queue.release_lease(str(due[0].notification_id), 'worker-a')
+        Notification.query.filter_by(notification_id=due[0].notification_id).update({'status': 'sent'})
+        Notification.query.filter(Notification.lease_owner == 'worker-a').update(
+            {'leased_until': db.func.now() - timedelta(hours=1)}, synchronize_session=False
+        )
+        db.session.commit()
+        
+        reclaimed = notification_queue.claim_batch('worker-b', limit=10)
+        assert set(reclaimed) == {str(due[1].notification_id), str(due[2].notification_id)}
+        db.session.expire_all()
+        assert Notification.query.get(due[1].notification_id).attempts == 2
+        assert Notification.query.get(due[1].notification_id).lease_owner == 'worker-b'
+    
+    def test_blocked_and_exhausted_claims_are_not_reclaimed(self, app, test_user):
+        """Test notifications blocked by preferences or out of attempts leave the pending queue."""
+        db.session.add(NotificationPreferences(user_id=test_user.user_id, notification_types={'muted_test': False}))
+        muted = Notification(user_id=test_user.user_id, type='muted_test', title='Muted', message='Muted',
+                             channels=['in_app'])
+        db.session.add(muted)
+        db.session.commit()
+        
+        assert notification_queue.claim_batch('worker-a', limit=10) == [str(muted.notification_id)]
+        assert notification_queue._process_notification(str(muted.notification_id), lease_owner='worker-a') is False
+        notification_queue.release_lease(str(muted.notification_id), 'worker-a')
+        
+        db.session.expire_all()
+        assert Notification.query.get(muted.notification_id).status == NotificationStatus.FAILED.value
+        assert notification_queue.claim_batch('worker-b', limit=10) == []
+        
+        # A row whose worker kept dying is failed once its attempts are used up
+        stuck = Notification(user_id=test_user.user_id, type='stuck_test', title='Stuck', message='Stuck',
+                             channels=['in_app'], attempts=notification_queue.max_attempts)
+        db.session.add(stuck)
+        db.session.commit()
+        
+        assert notification_queue.claim_batch('worker-b', limit=10) == []
+        assert notification_queue.fail_exhausted() == 1
+        db.session.expire_all()
+        assert Notification.query.get(stuck.notification_id).status == NotificationStatus.FAILED.value
+    
+    def test_refill_schedule_loads_horizon_onto_timing_wheel(self, app, test_user):
+        """Test scheduled notifications inside the horizon fire from the wheel at their due time."""
+        import time
+        
+        now = datetime.utcnow()
+        soon = Notification(user_id=test_user.user_id, type='scheduled_test', title='Soon', message='Soon',
+                            channels=['in_app'], priority='high', scheduled_at=now + timedelta(seconds=30))
+        later = Notification(user_id=test_user.user_id, type='scheduled_test', title='Later', message='Later',
+                             channels=['in_app'], scheduled_at=now + timedelta(hours=2))
+        db.session.add_all([soon, later])
+        db.session.commit()
+        
+        wheel = notification_queue.wheel
+        notification_queue.wheel = TimingWheel(slots=notification_queue.scheduler_horizon * 2)
+        try:
+            assert notification_queue.refill_schedule(full=True) == 1
+            
+            # A deferral inside the loaded horizon goes straight onto the wheel
+            deferred = Notification(user_id=test_user.user_id, type='scheduled_test', title='Deferred',
+                                    message='Deferred', channels=['in_app'],
+                                    scheduled_at=now + timedelta(seconds=60))
+            db.session.add(deferred)
+            db.session.commit()
+            notification_queue.schedule(deferred)
+            assert len(notification_queue.wheel) == 2
+            
+            assert notification_queue.wheel.advance(time.time() + 10) == []
+            assert notification_queue.wheel.advance(time.time() + 31) == [(str(soon.notification_id), 'high')]
+            assert notification_queue.wheel.advance(time.time() + 61) == [(str(deferred.notification_id), 'normal')]
+        finally:
+            notification_queue.wheel = wheel
+    
     def test_get_pending_notifications_count(self, app, test_user):
         """Test getting count of pending notifications."""
         # Create a pending notification
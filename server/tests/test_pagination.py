@@ -0,0 +1,39 @@
+import uuid
+import pytest
+from datetime import datetime
+
+from server.utils.pagination import encode_cursor, decode_cursor, parse_bool_arg, InvalidCursorError
+
+
+def test_cursor_round_trip():
+    """Test that cursor values survive encoding with their types intact."""
+    published_at = datetime(2024, 5, 1, 12, 30, 15)
+    post_id = uuid.uuid4()
+    
+    cursor = encode_cursor('date', [published_at, post_id])
+    
+    assert '=' not in cursor
+    assert decode_cursor(cursor, 'date', [datetime, uuid.UUID]) == [published_at, post_id]
+
+
+def test_cursor_rejects_other_ordering():
+    """Test that a cursor issued for one sort order cannot be replayed on another."""
+    cursor = encode_cursor('popularity', [10, 2, uuid.uuid4()])
+    
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, 'date', [datetime, uuid.UUID])
+
+
+def test_cursor_rejects_garbage():
+    """Test that malformed cursors raise InvalidCursorError."""
+    with pytest.raises(InvalidCursorError):
+        decode_cursor('not-a-cursor', 'date', [datetime, uuid.UUID])
+
+
+def test_parse_bool_arg():
+    """Test query string flag parsing."""
+    assert parse_bool_arg('true') is True
+    assert parse_bool_arg('1') is True
+    assert parse_bool_arg('false') is False
+    assert parse_bool_arg(None) is False
+    assert parse_bool_arg(None, default=True) is True
@@ -104,4 +104,282 @@ def test_get_posts_without_tag_filter(client, auth_headers):
     assert response.status_code == 200
     data = json.loads(response.data)
     assert 'posts' in data
-    # Should return all published posts
\ No newline at end of file
+    # Should return all published posts
+
+def test_get_posts_cursor_pagination(client, app):
+    """Test keyset pagination walks every published post exactly once."""
+    from datetime import datetime, timedelta
+    
+    author = User.query.filter_by(email='farmer@example.com').first()
+    base_time = datetime.utcnow()
+    for i in range(3):
+        db.session.add(Post(
+            title=f'Cursor Post {i}',
+            content='Cursor content',
+            author_id=author.user_id,
+            status='published',
+            published_at=base_time - timedelta(minutes=i)
+        ))
+    db.session.commit()
+    
+    response = client.get('/api/posts?cursor=&per_page=2&include_total=true')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [p['title'] for p in data['data']] == ['Cursor Post 0', 'Cursor Post 1']
+    assert data['pagination']['has_next'] is True
+    assert data['pagination']['total_items'] == 3
+    
+    next_cursor = data['pagination']['next_cursor']
+    response = client.get(f'/api/posts?cursor={next_cursor}&per_page=2')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [p['title'] for p in data['data']] == ['Cursor Post 2']
+    assert data['pagination']['has_next'] is False
+    assert data['pagination']['next_cursor'] is None
+    assert 'total_items' not in data['pagination']
+    
+    response = client.get('/api/posts?cursor=not-a-cursor')
+    assert response.status_code == 400
+
+
+def test_get_posts_feed_cache_invalidated_by_write(client, app, auth_tokens):
+    """Test anonymous feed pages are cached and a post write invalidates them."""
+    from server.utils.response_cache import feed_cache
+    
+    author = User.query.filter_by(email='farmer@example.com').first()
+    kept = Post(title='Cached Kept', content='Stays', author_id=author.user_id, status='published')
+    archived = Post(title='Cached Archived', content='Goes', author_id=author.user_id, status='published')
+    db.session.add_all([kept, archived])
+    db.session.commit()
+    
+    app.config['FEED_CACHE_TTL'] = 60
+    feed_cache.clear()
+    try:
+        def titles():
+            response = client.get('/api/posts?per_page=50')
+            assert response.status_code == 200
+            return {p['title'] for p in json.loads(response.data)['data']}
+        
+        assert {'Cached Kept', 'Cached Archived'} <= titles()
+        
+        # A row inserted behind the controllers' back is not seen while the page is cached
+        db.session.add(Post(title='Cached Unseen', content='Hidden', author_id=author.user_id, status='published'))
+        db.session.commit()
+        assert 'Cached Unseen' not in titles()
+        
+        headers = {'Authorization': f"Bearer {auth_tokens['farmer']}"}
+        response = client.delete(f'/api/posts/{archived.post_id}', headers=headers)
+        assert response.status_code == 200
+        
+        current = titles()
+        assert 'Cached Archived' not in current
+        assert {'Cached Kept', 'Cached Unseen'} <= current
+    finally:
+        feed_cache.clear()
+
+
+def test_post_counters_adjust_and_reconcile(app):
+    """Test that denormalized post counters move with adjust and are repaired by reconcile."""
+    from server.models.post import Comment, ArticlePostLike
+    from server.services.post_counter_service import post_counter_service
+    
+    author = User.query.filter_by(email='farmer@example.com').first()
+    post = Post(title='Counter Post', content='Counter content', author_id=author.user_id, status='published')
+    db.session.add(post)
+    db.session.flush()
+    
+    db.session.add(Comment(post_id=post.post_id, user_id=author.user_id, content='First!'))
+    db.session.add(ArticlePostLike(post_id=post.post_id, user_id=author.user_id))
+    db.session.commit()
+    
+    # Rows were inserted behind the service's back, so reconcile must repair them
+    result = post_counter_service.reconcile(post_ids=[post.post_id])
+    assert result['repaired'] == 1
+    db.session.refresh(post)
+    assert post.comment_count == 1
+    assert post.like_count == 1
+    
+    counters = post_counter_service.adjust(post.post_id, likes=-1)
+    db.session.commit()
+    assert counters == {'comment_count': 1, 'like_count': 0}
+    
+    # Counters never go negative
+    counters = post_counter_service.adjust(post.post_id, likes=-1)
+    db.session.commit()
+    assert counters['like_count'] == 0
+
+
+def test_view_counter_flushes_batched_increments(app):
+    """Test that buffered views reach the database in one flush and stay visible until then."""
+    from server.services.view_counter import ViewCounterBuffer
+    
+    author = User.query.filter_by(email='farmer@example.com').first()
+    post = Post(title='Viewed Post', content='Viewed content', author_id=author.user_id, status='published')
+    db.session.add(post)
+    db.session.commit()
+    
+    # Fresh in-memory buffer bound to the test app, without the background flusher
+    counter = ViewCounterBuffer()
+    counter.app = app
+    for _ in range(3):
+        counter.increment('posts', post.post_id)
+    
+    assert counter.pending('posts', post.post_id) == 3
+    db.session.refresh(post)
+    assert post.view_count == 0
+    
+    assert counter.flush() == 1
+    assert counter.pending('posts', post.post_id) == 0
+    db.session.refresh(post)
+    assert post.view_count == 3
+
+
+def test_get_posts_search_relevance(client, app):
+    """Test full-text search ranks title matches above body matches."""
+    author = User.query.filter_by(email='farmer@example.com').first()
+    db.session.add_all([
+        Post(
+            title='Water storage basics',
+            content='Drip irrigation saves water during dry seasons',
+            author_id=author.user_id,
+            status='published'
+        ),
+        Post(
+            title='Irrigation scheduling for maize',
+            content='How often to water maize',
+            author_id=author.user_id,
+            status='published'
+        ),
+        Post(
+            title='Soil testing',
+            content='Measure soil pH before planting',
+            author_id=author.user_id,
+            status='published'
+        )
+    ])
+    db.session.commit()
+    
+    response = client.get('/api/posts?search=irrigation&sort_by=relevance')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    titles = [p['title'] for p in data['data']]
+    assert titles == ['Irrigation scheduling for maize', 'Water storage basics']
+
+
+def test_get_comments_paginated_tree(client, app):
+    """Test comments come back a page at a time with reply previews and counts."""
+    from datetime import datetime, timedelta
+    from server.models.post import Comment
+    
+    author = User.query.filter_by(email='farmer@example.com').first()
+    post = Post(title='Busy Thread', content='Lots of discussion', author_id=author.user_id, status='published')
+    db.session.add(post)
+    db.session.flush()
+    
+    start = datetime(2024, 1, 1)
+    top_level = []
+    for i in range(3):
+        comment = Comment(post_id=post.post_id, user_id=author.user_id, content=f'Top {i}',
+                          created_at=start + timedelta(minutes=i))
+        db.session.add(comment)
+        top_level.append(comment)
+    db.session.flush()
+    
+    replies = []
+    for i in range(4):
+        reply = Comment(post_id=post.post_id, user_id=author.user_id, content=f'Reply {i}',
+                        parent_comment_id=top_level[0].comment_id, created_at=start + timedelta(hours=1, minutes=i))
+        db.session.add(reply)
+        replies.append(reply)
+    db.session.flush()
+    db.session.add(Comment(post_id=post.post_id, user_id=author.user_id, content='Nested',
+                           parent_comment_id=replies[0].comment_id, created_at=start + timedelta(hours=2)))
+    db.session.commit()
+    
+    response = client.get(f'/api/posts/{post.post_id}/comments?per_page=2&replies=2')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert [c['content'] for c in data['data']] == ['Top 0', 'Top 1']
+    assert data['pagination']['has_next'] is True
+    
+    first = data['data'][0]
+    assert [r['content'] for r in first['replies']] == ['Reply 0', 'Reply 1']
+    assert first['reply_count'] == 5
+    assert first['has_more_replies'] is True
+    assert first['replies'][0]['reply_count'] == 1
+    
+    response = client.get(f"/api/posts/{post.post_id}/comments?per_page=2&cursor={data['pagination']['next_cursor']}")
+    data = json.loads(response.data)
+    assert [c['content'] for c in data['data']] == ['Top 2']
+    assert data['pagination']['has_next'] is False
+    
+    # Expanding a thread pages through its direct replies
+    response = client.get(f'/api/posts/{post.post_id}/comments?parent_id={top_level[0].comment_id}&per_page=10')
+    data = json.loads(response.data)
+    assert [c['content'] for c in data['data']] == ['Reply 0', 'Reply 1', 'Reply 2', 'Reply 3']
+
+
+def test_get_posts_sort_by_trending(client, app):
+    """Test trending ranks engaged posts above idle ones and supports cursor paging."""
+    from datetime import datetime, timedelta
+    from server.services.trending_service import trending_service
+    
+    author = User.query.filter_by(email='farmer@example.com').first()
+    published_at = datetime.utcnow() - timedelta(hours=1)
+    db.session.add_all([
+        Post(title='Quiet Post', content='Nobody reads this', author_id=author.user_id,
+             status='published', published_at=published_at),
+        Post(title='Hot Post', content='Everybody reads this', author_id=author.user_id,
+             status='published', published_at=published_at, view_count=500, like_count=40, comment_count=12)
+    ])
+    db.session.commit()
+    
+    assert trending_service.refresh()['refreshed'] >= 2
+    
+    response = client.get('/api/posts?sort_by=trending&per_page=1&cursor=')
+    assert response.status_code == 200
+    data = json.loads(response.data)
+    assert data['data'][0]['title'] == 'Hot Post'
+    
+    response = client.get(f"/api/posts?sort_by=trending&per_page=1&cursor={data['pagination']['next_cursor']}")
+    data = json.loads(response.data)
+    assert data['data'][0]['title'] == 'Quiet Post'
+
+
+def test_trending_score_seeded_at_publish(app):
+    """Test a post is scored when published, with the same value the refresh computes."""
+    from server.services.trending_service import trending_service
+    
+    author = User.query.filter_by(email='farmer@example.com').first()
+    post = Post(title='Fresh Post', content='Just published', author_id=author.user_id, status='published')
+    db.session.add(post)
+    db.session.flush()
+    trending_service.seed_score(post.post_id)
+    db.session.commit()
+    
+    seeded = db.session.get(Post, post.post_id).trending_score
+    assert seeded > 0
+    
+    trending_service.refresh(full=True)
+    db.session.expire_all()
+    assert db.session.get(Post, post.post_id).trending_score == pytest.approx(seeded)
+
+
+def test_resolve_tags_reuses_and_creates_in_bulk(app):
+    """Test tag names are normalized, existing tags reused and missing ones created once."""
+    from server.services.tag_service import tag_service
+    
+    existing = Tag(name='Irrigation')
+    db.session.add(existing)
+    db.session.commit()
+    
+    tags = tag_service.resolve_tags(['  Irrigation ', 'dry   season', '', 'dry season', 'Maize'])
+    db.session.commit()
+    
+    assert [tag.name for tag in tags] == ['Irrigation', 'dry season', 'Maize']
+    assert tags[0].tag_id == existing.tag_id
+    assert Tag.query.filter(Tag.name.in_(['dry season', 'Maize'])).count() == 2
+    
+    # Resolving again creates nothing new
+    again = tag_service.resolve_tags(['Maize', 'dry season'])
+    assert [tag.tag_id for tag in again] == [tags[2].tag_id, tags[1].tag_id]
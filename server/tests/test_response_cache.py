@@ -0,0 +1,92 @@
+import threading
+import time
+import uuid
+
+from werkzeug.datastructures import MultiDict
+
+from server.utils.response_cache import ResponseCache, make_query_key
+
+
+def _cache(**kwargs):
+    """Cache with a unique name so a shared Redis generation never leaks between tests."""
+    return ResponseCache(f'test_{uuid.uuid4().hex}', **kwargs)
+
+
+def test_cache_hit_and_generation_bump():
+    cache = _cache()
+    calls = []
+
+    def build():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_build('page=1', build) == 1
+    assert cache.get_or_build('page=1', build) == 1
+    assert len(calls) == 1
+
+    cache.bump()
+    assert cache.get_or_build('page=1', build) == 2
+
+
+def test_cache_expiry_and_lru_eviction():
+    cache = _cache(max_entries=2)
+
+    cache.get_or_build('a', lambda: 'a1', ttl=0)
+    assert cache.get_or_build('a', lambda: 'a2') == 'a2'
+
+    cache.get_or_build('b', lambda: 'b1')
+    cache.get_or_build('a', lambda: 'unused')  # Touch 'a' so 'b' is least recently used
+    cache.get_or_build('c', lambda: 'c1')
+    assert cache.get_or_build('b', lambda: 'b2') == 'b2'
+
+
+def test_cache_skips_uncacheable_values():
+    cache = _cache()
+    cache.get_or_build('bad', lambda: ('error', 400), should_cache=lambda page: page[1] == 200)
+    assert cache.get_or_build('bad', lambda: ('ok', 200)) == ('ok', 200)
+
+
+def test_cache_rebuilds_once_under_concurrency():
+    cache = _cache()
+    calls = []
+
+    def slow_build():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'page'
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_build('hot', slow_build)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['page'] * 5
+    assert len(calls) == 1
+
+
+def test_make_query_key_is_order_insensitive():
+    first = MultiDict([('page', '1'), ('category', 'Crops ')])
+    second = MultiDict([('category', 'Crops'), ('page', '1')])
+    assert make_query_key(first) == make_query_key(second)
+    assert make_query_key(MultiDict([('cursor', '')])) != make_query_key(MultiDict())
+
+
+def test_fragment_cache_lru_and_owner_invalidation():
+    from server.utils.fragment_cache import FragmentCache
+
+    cache = FragmentCache(max_entries=2)
+    cache.set(('p1', 1), {'title': 'one'}, owner='alice')
+    cache.set(('p2', 1), {'title': 'two'}, owner='bob')
+    cache.get_many([('p1', 1)])  # Touch p1 so p2 is least recently used
+    cache.set(('p3', 1), {'title': 'three'}, owner='alice')
+
+    assert set(cache.get_many([('p1', 1), ('p2', 1), ('p3', 1)])) == {('p1', 1), ('p3', 1)}
+
+    assert cache.invalidate_owner('alice') == 2
+    assert len(cache) == 0
+    assert cache.invalidate_owner('bob') == 0
@@ -0,0 +1,75 @@
+"""
+Bounded LRU cache of serialized JSON fragments.
+
+Fragments are cached under a caller-chosen versioned key (e.g. a row's
+updated_at) and grouped by an owner so everything derived from one owner,
+such as all posts of an author, can be dropped at once.
+"""
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+
+class FragmentCache:
+    """Thread-safe LRU cache of serialized fragments with per-owner invalidation."""
+
+    def __init__(self, max_entries: int = 5000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (owner, fragment)
+        self._keys_by_owner = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """Return the cached fragments for the given keys, skipping misses."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = entry[1]
+        return found
+
+    def set(self, key: Hashable, fragment: Any, owner: Optional[Hashable] = None):
+        """Store a fragment, evicting the least recently used entries beyond max_entries."""
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (owner, fragment)
+            if owner is not None:
+                self._keys_by_owner[owner].add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate_owner(self, owner: Hashable) -> int:
+        """Drop every fragment stored for owner. Returns the number of fragments dropped."""
+        with self._lock:
+            keys = list(self._keys_by_owner.get(owner, ()))
+            for key in keys:
+                self._discard(key)
+            return len(keys)
+
+    def clear(self):
+        """Drop all fragments."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_owner.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _discard(self, key: Hashable):
+        """Remove one entry and its owner index record. Caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        owner = entry[0]
+        if owner is not None:
+            owner_keys = self._keys_by_owner.get(owner)
+            if owner_keys is not None:
+                owner_keys.discard(key)
+                if not owner_keys:
+                    del self._keys_by_owner[owner]
+
+
+# Global cache of post list-view fragments, keyed by (post_id, updated_at, author updated_at)
+post_fragment_cache = FragmentCache()
@@ -0,0 +1,128 @@
+"""
+Cursor (keyset) pagination helpers.
+
+Cursors are opaque to clients: they are URL-safe base64 encoded JSON documents
+holding the sort key of the last row on the previous page.
+"""
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a client supplies a cursor that cannot be decoded."""
+    pass
+
+
+def _encode_value(value: Any) -> Any:
+    """Convert a sort key value into a JSON-serializable form."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(kind: str, values: List[Any]) -> str:
+    """
+    Build an opaque cursor for a keyset page.
+
+    Args:
+        kind: Name of the ordering the cursor belongs to (e.g. 'date', 'popularity')
+        values: Sort key values of the last row on the page
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps({'k': kind, 'v': [_encode_value(v) for v in values]}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, kind: str, types: List[type]) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string received from the client
+        kind: Ordering the cursor is expected to belong to
+        types: Expected type of each sort key value (datetime, uuid.UUID, int, ...)
+
+    Returns:
+        List of typed sort key values
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or belongs to another ordering
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        if payload.get('k') != kind:
+            raise InvalidCursorError('Cursor does not match the requested ordering')
+
+        raw_values = payload.get('v')
+        if not isinstance(raw_values, list) or len(raw_values) != len(types):
+            raise InvalidCursorError('Cursor has an unexpected shape')
+
+        values = []
+        for raw, expected in zip(raw_values, types):
+            if raw is None:
+                values.append(None)
+            elif expected is datetime:
+                values.append(datetime.fromisoformat(raw))
+            elif expected is uuid.UUID:
+                values.append(uuid.UUID(raw))
+            else:
+                values.append(expected(raw))
+        return values
+    except InvalidCursorError:
+        raise
+    except (ValueError, TypeError, AttributeError) as e:
+        raise InvalidCursorError(f'Malformed cursor: {str(e)}')
+
+
+def parse_bool_arg(value: Optional[str], default: bool = False) -> bool:
+    """Interpret a query string flag such as include_total=true."""
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def keyset_page(query, kind: str, sort_columns: List[Any], key_types: List[type], cursor: Optional[str],
+                limit: int, key_of: Callable[[Any], List[Any]], descending: bool = True) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one keyset page of a query ordered by sort_columns.
+
+    Args:
+        query: Filtered SQLAlchemy query, without ORDER BY / LIMIT
+        kind: Cursor kind (see encode_cursor)
+        sort_columns: Columns forming a unique sort key, most significant first
+        key_types: Type of each sort key value, for decode_cursor
+        cursor: Cursor from the previous page; None or empty for the first page
+        limit: Page size
+        key_of: Returns the sort key values of a row, used to build next_cursor
+        descending: Sort direction applied to every column
+
+    Returns:
+        Tuple of (rows, next_cursor); next_cursor is None on the last page
+
+    Raises:
+        InvalidCursorError: If the cursor cannot be decoded
+    """
+    if cursor:
+        after = tuple(decode_cursor(cursor, kind, key_types))
+        key = tuple_(*sort_columns)
+        query = query.filter(key < after if descending else key > after)
+
+    # Fetch one extra row to know whether another page exists
+    order_by = [column.desc() if descending else column.asc() for column in sort_columns]
+    rows = query.order_by(*order_by).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(kind, key_of(rows[-1]))
+    return rows, next_cursor
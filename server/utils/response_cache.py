@@ -0,0 +1,139 @@
+"""
+In-process response cache for hot, anonymous read endpoints.
+
+Entries expire after a TTL and are evicted least-recently-used once the cache is
+full. Writes invalidate a cache by bumping its generation counter: the current
+generation is part of every key, so older pages simply stop being reachable.
+The generation lives in Redis when available so a write on one worker
+invalidates every worker, and falls back to a per-process counter otherwise.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+from urllib.parse import urlencode
+
+
+class ResponseCache:
+    """TTL + LRU cache with generation-based invalidation and stampede protection."""
+
+    def __init__(self, name: str, ttl: int = 30, max_entries: int = 256, build_timeout: float = 10.0,
+                 redis_client=None):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.build_timeout = build_timeout
+        self.redis_client = redis_client if redis_client is not None else self._get_redis_client()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._entries = OrderedDict()  # (generation, key) -> (expires_at, value)
+        self._building = {}  # (generation, key) -> threading.Event
+        self._local_generation = 0
+        self._lock = threading.Lock()
+
+    def _get_redis_client(self):
+        """Get Redis client. Falls back to a per-process generation if Redis unavailable."""
+        try:
+            import redis
+            client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=True)
+            client.ping()  # Test connection
+            return client
+        except:
+            return None
+
+    @property
+    def _generation_key(self) -> str:
+        return f"response_cache:{self.name}:generation"
+
+    def generation(self) -> int:
+        """Current generation; pages built under older generations are never served."""
+        if self.redis_client:
+            try:
+                return int(self.redis_client.get(self._generation_key) or 0)
+            except Exception as e:
+                self.logger.error(f"Redis generation lookup failed: {str(e)}")
+        return self._local_generation
+
+    def bump(self):
+        """Invalidate every cached page. Call after a write that changes what readers see."""
+        with self._lock:
+            self._local_generation += 1
+            self._entries.clear()
+        if self.redis_client:
+            try:
+                self.redis_client.incr(self._generation_key)
+            except Exception as e:
+                self.logger.error(f"Redis generation bump failed: {str(e)}")
+
+    def clear(self):
+        """Drop all cached pages without changing the generation."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_build(self, key: str, builder: Callable[[], Any], ttl: Optional[int] = None,
+                     should_cache: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Return the cached value for key, building it with builder() on a miss.
+
+        Only one caller per key rebuilds an expired page. Concurrent callers get the
+        expired page while the rebuild is in flight, or wait for it when there is
+        nothing to fall back to.
+
+        Args:
+            key: Cache key (see make_query_key)
+            builder: Callable producing the value on a miss
+            ttl: Seconds the value stays fresh (default: the cache's ttl)
+            should_cache: Predicate deciding whether a built value may be stored
+
+        Returns:
+            Cached or freshly built value
+        """
+        ttl = self.ttl if ttl is None else ttl
+        full_key = (self.generation(), key)
+
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(full_key)
+                return entry[1]
+
+            event = self._building.get(full_key)
+            is_builder = event is None
+            if is_builder:
+                event = threading.Event()
+                self._building[full_key] = event
+
+        if not is_builder:
+            if entry:
+                return entry[1]  # Serve the expired page while another request rebuilds it
+            event.wait(self.build_timeout)
+            with self._lock:
+                entry = self._entries.get(full_key)
+            if entry:
+                return entry[1]
+            return builder()  # The rebuild failed or produced an uncacheable value
+
+        try:
+            value = builder()
+            if should_cache is None or should_cache(value):
+                with self._lock:
+                    self._entries[full_key] = (time.monotonic() + ttl, value)
+                    self._entries.move_to_end(full_key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            return value
+        finally:
+            with self._lock:
+                self._building.pop(full_key, None)
+            event.set()
+
+
+def make_query_key(args) -> str:
+    """Normalize request query arguments (a werkzeug MultiDict) into a cache key."""
+    items = sorted((name, value.strip()) for name, values in args.lists() for value in values)
+    return urlencode(items)
+
+
+# Global cache for anonymous GET /api/posts pages
+feed_cache = ResponseCache('posts_feed')
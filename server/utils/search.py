@@ -0,0 +1,85 @@
+"""
+PostgreSQL full-text search helpers for posts and articles.
+
+Searchable models carry a stored, generated `search_vector` tsvector column
+(title weighted 'A', body weighted 'B') backed by a GIN index. The helpers
+below build that column expression and the matching tsquery/rank expressions.
+"""
+from typing import Optional
+
+from sqlalchemy import cast, func, literal, Double
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+# Map of Post.language codes to PostgreSQL text search configurations
+SEARCH_LANGUAGE_CONFIGS = {
+    'en': 'english',
+    'es': 'spanish',
+    'fr': 'french',
+    'pt': 'portuguese',
+    'de': 'german',
+    'it': 'italian',
+    'nl': 'dutch',
+}
+DEFAULT_SEARCH_CONFIG = 'english'
+
+
+def _regconfig_sql(language_column: Optional[str]) -> str:
+    """SQL selecting the text search configuration for a row's language column."""
+    if not language_column:
+        return f"'{DEFAULT_SEARCH_CONFIG}'::regconfig"
+
+    branches = ' '.join(
+        f"WHEN '{code}' THEN '{config}'::regconfig"
+        for code, config in SEARCH_LANGUAGE_CONFIGS.items()
+    )
+    return f"CASE {language_column} {branches} ELSE '{DEFAULT_SEARCH_CONFIG}'::regconfig END"
+
+
+def search_vector_sql(title_column: str, body_column: str, language_column: Optional[str] = None) -> str:
+    """
+    Build the generated column expression for a weighted search vector.
+
+    Args:
+        title_column: Column holding the title (weighted 'A')
+        body_column: Column holding the body text (weighted 'B')
+        language_column: Optional column holding a language code from SEARCH_LANGUAGE_CONFIGS
+
+    Returns:
+        SQL expression usable in GENERATED ALWAYS AS (...) STORED
+    """
+    config = _regconfig_sql(language_column)
+    return (
+        f"setweight(to_tsvector({config}, coalesce({title_column}, '')), 'A') || "
+        f"setweight(to_tsvector({config}, coalesce({body_column}, '')), 'B')"
+    )
+
+
+def build_tsquery(search: str):
+    """
+    Build a tsquery for user input that matches documents in any supported language.
+
+    The query is parsed once per configuration and OR-ed together, so it stays a
+    constant expression and the GIN index on search_vector can be used.
+    """
+    configs = sorted(set(SEARCH_LANGUAGE_CONFIGS.values()) | {DEFAULT_SEARCH_CONFIG})
+    tsquery = None
+    for config in configs:
+        parsed = func.websearch_to_tsquery(literal(config, type_=REGCONFIG), search)
+        tsquery = parsed if tsquery is None else tsquery.op('||')(parsed)
+    return tsquery
+
+
+def search_filter(search_vector_column, tsquery):
+    """WHERE clause matching rows whose search vector satisfies the tsquery."""
+    return search_vector_column.op('@@')(tsquery)
+
+
+def search_rank(search_vector_column, tsquery):
+    """
+    Relevance score for sort_by=relevance.
+    
+    ts_rank returns real; it is cast to double precision so the value sorted on,
+    the value stored in a cursor (a JSON double) and the value compared against
+    that cursor are all the same float8.
+    """
+    return cast(func.ts_rank(search_vector_column, tsquery), Double)